@@ -18,10 +18,24 @@ if config.config_file_name is not None:
 # for 'autogenerate' support
 # from myapp import mymodel
 # target_metadata = mymodel.Base.metadata
+from app.core.config import settings
 from app.models.models import Base
 
 target_metadata = Base.metadata
 
+# URL do banco vem das configurações da aplicação (DATABASE_URL)
+config.set_main_option("sqlalchemy.url", settings.database_url.replace("%", "%%"))
+
+# Objetos da busca textual criados por DDL próprio (ver models.FULLTEXT_DDL),
+# ignorados pelo autogenerate
+FULLTEXT_OBJECTS = {"search_vector", "ix_tasks_search_vector", "tasks_fts", "fts_rowid", "ix_tasks_fts_rowid"}
+
+
+def include_object(object, name, type_, reflected, compare_to):
+    if name in FULLTEXT_OBJECTS or (name or "").startswith("tasks_fts_"):
+        return False
+    return True
+
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
 # my_important_option = config.get_main_option("my_important_option")
@@ -45,6 +59,7 @@ def run_migrations_offline() -> None:
         target_metadata=target_metadata,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
+        include_object=include_object,
     )
 
     with context.begin_transaction():
@@ -66,7 +81,10 @@ def run_migrations_online() -> None:
 
     with connectable.connect() as connection:
         context.configure(
-            connection=connection, target_metadata=target_metadata
+            connection=connection,
+            target_metadata=target_metadata,
+            include_object=include_object,
+            render_as_batch=connection.dialect.name == "sqlite",
         )
 
         with context.begin_transaction():
@@ -0,0 +1,43 @@
+"""cache persistente de análises e embeddings das tarefas
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "ai_analysis_cache",
+        sa.Column("key", sa.String(length=64), nullable=False),
+        sa.Column("model", sa.String(), nullable=False),
+        sa.Column("result", sa.Text(), nullable=False),
+        sa.Column("expires_at", sa.DateTime(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("(CURRENT_TIMESTAMP)"), nullable=True),
+        sa.PrimaryKeyConstraint("key"),
+    )
+
+    # Tarefas existentes ficam sem embedding; o índice vetorial os calcula na construção
+    with op.batch_alter_table("tasks") as batch_op:
+        batch_op.add_column(sa.Column("embedding", sa.LargeBinary(), nullable=True))
+        batch_op.add_column(sa.Column("embedding_model", sa.String(), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("tasks") as batch_op:
+        batch_op.drop_column("embedding_model")
+        batch_op.drop_column("embedding")
+
+    op.drop_table("ai_analysis_cache")
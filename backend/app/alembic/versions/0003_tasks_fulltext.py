@@ -0,0 +1,82 @@
+"""busca textual das tarefas (tsvector + GIN / FTS5)
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17 00:00:00
+
+PostgreSQL: coluna gerada `search_vector` (configuração 'portuguese') e índice
+GIN, criado com CONCURRENTLY para não bloquear escritas em tabelas grandes.
+SQLite: tabela FTS5 de conteúdo externo sobre tasks, triggers de sincronização
+e carga inicial com 'rebuild'.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+FTS_COLUMNS = "title, description, raw_message, ai_title, ai_summary"
+FTS_NEW = "new.title, new.description, new.raw_message, new.ai_title, new.ai_summary"
+FTS_OLD = "old.title, old.description, old.raw_message, old.ai_title, old.ai_summary"
+
+
+def upgrade() -> None:
+    dialect = op.get_bind().dialect.name
+
+    if dialect == "postgresql":
+        op.execute("""
+            ALTER TABLE tasks ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS (
+                setweight(to_tsvector('portuguese', coalesce(title, '') || ' ' || coalesce(ai_title, '')), 'A') ||
+                setweight(to_tsvector('portuguese', coalesce(description, '') || ' ' || coalesce(ai_summary, '')), 'B') ||
+                setweight(to_tsvector('portuguese', coalesce(raw_message, '')), 'C')
+            ) STORED
+        """)
+        with op.get_context().autocommit_block():
+            op.execute(
+                "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_tasks_search_vector "
+                "ON tasks USING gin (search_vector)"
+            )
+
+    elif dialect == "sqlite":
+        op.execute(f"""
+            CREATE VIRTUAL TABLE IF NOT EXISTS tasks_fts USING fts5(
+                {FTS_COLUMNS}, content='tasks', content_rowid='rowid',
+                tokenize='unicode61 remove_diacritics 2'
+            )
+        """)
+        op.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS tasks_fts_insert AFTER INSERT ON tasks BEGIN
+                INSERT INTO tasks_fts(rowid, {FTS_COLUMNS}) VALUES (new.rowid, {FTS_NEW});
+            END
+        """)
+        op.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS tasks_fts_delete AFTER DELETE ON tasks BEGIN
+                INSERT INTO tasks_fts(tasks_fts, rowid, {FTS_COLUMNS}) VALUES ('delete', old.rowid, {FTS_OLD});
+            END
+        """)
+        op.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS tasks_fts_update AFTER UPDATE OF {FTS_COLUMNS} ON tasks BEGIN
+                INSERT INTO tasks_fts(tasks_fts, rowid, {FTS_COLUMNS}) VALUES ('delete', old.rowid, {FTS_OLD});
+                INSERT INTO tasks_fts(rowid, {FTS_COLUMNS}) VALUES (new.rowid, {FTS_NEW});
+            END
+        """)
+        op.execute("INSERT INTO tasks_fts(tasks_fts) VALUES ('rebuild')")
+
+
+def downgrade() -> None:
+    dialect = op.get_bind().dialect.name
+
+    if dialect == "postgresql":
+        with op.get_context().autocommit_block():
+            op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_tasks_search_vector")
+        op.execute("ALTER TABLE tasks DROP COLUMN IF EXISTS search_vector")
+
+    elif dialect == "sqlite":
+        for trigger in ("tasks_fts_insert", "tasks_fts_delete", "tasks_fts_update"):
+            op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        op.execute("DROP TABLE IF EXISTS tasks_fts")
@@ -0,0 +1,54 @@
+"""índices compostos para a paginação por cursor
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17 00:00:00
+
+tasks(user_id, created_at, id) e chat_messages(user_id, created_at, id), na
+ordem do keyset. No SQLite, os created_at gravados por CURRENT_TIMESTAMP
+('AAAA-MM-DD HH:MM:SS') ganham o sufixo de microssegundos usado pela
+aplicação, para que a comparação (texto) com o cursor seja consistente.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0004'
+down_revision: Union[str, None] = '0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = (
+    ("ix_tasks_user_id_created_at_id", "tasks"),
+    ("ix_chat_messages_user_id_created_at_id", "chat_messages"),
+)
+
+
+def upgrade() -> None:
+    dialect = op.get_bind().dialect.name
+
+    if dialect == "sqlite":
+        for _, table in INDEXES:
+            op.execute(f"UPDATE {table} SET created_at = created_at || '.000000' WHERE length(created_at) = 19")
+
+    if dialect == "postgresql":
+        with op.get_context().autocommit_block():
+            for name, table in INDEXES:
+                op.create_index(name, table, ["user_id", "created_at", "id"], postgresql_concurrently=True)
+    else:
+        for name, table in INDEXES:
+            op.create_index(name, table, ["user_id", "created_at", "id"])
+
+
+def downgrade() -> None:
+    dialect = op.get_bind().dialect.name
+
+    if dialect == "postgresql":
+        with op.get_context().autocommit_block():
+            for name, table in INDEXES:
+                op.drop_index(name, table_name=table, postgresql_concurrently=True)
+    else:
+        for name, table in INDEXES:
+            op.drop_index(name, table_name=table)
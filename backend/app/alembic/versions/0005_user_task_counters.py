@@ -0,0 +1,51 @@
+"""contadores de tarefas por usuário
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17 00:00:00
+
+Cria user_task_counters e a preenche a partir de tasks para todos os
+usuários existentes (scripts/reconcile_task_counters.py verifica depois).
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0005'
+down_revision: Union[str, None] = '0004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+STATUS_COLUMNS = ("pending", "in_progress", "completed", "cancelled")
+PRIORITY_COLUMNS = ("low", "medium", "high", "urgent")
+
+
+def upgrade() -> None:
+    counter_columns = [
+        sa.Column(name, sa.Integer(), server_default="0", nullable=False)
+        for name in ("total", *STATUS_COLUMNS, *PRIORITY_COLUMNS)
+    ]
+    op.create_table(
+        "user_task_counters",
+        sa.Column("user_id", sa.String(), nullable=False),
+        *counter_columns,
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("user_id"),
+    )
+
+    sums = [f"SUM(CASE WHEN t.status = '{name.upper()}' THEN 1 ELSE 0 END)" for name in STATUS_COLUMNS]
+    sums += [f"SUM(CASE WHEN t.priority = '{name.upper()}' THEN 1 ELSE 0 END)" for name in PRIORITY_COLUMNS]
+    op.execute(f"""
+        INSERT INTO user_task_counters (user_id, total, {", ".join(STATUS_COLUMNS + PRIORITY_COLUMNS)}, updated_at)
+        SELECT u.id, COUNT(t.id), {", ".join(f"COALESCE({expr}, 0)" for expr in sums)}, CURRENT_TIMESTAMP
+        FROM users u LEFT JOIN tasks t ON t.user_id = u.id
+        GROUP BY u.id
+    """)
+
+
+def downgrade() -> None:
+    op.drop_table("user_task_counters")
@@ -0,0 +1,46 @@
+"""fila durável do webhook
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-17 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0006'
+down_revision: Union[str, None] = '0005'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+webhook_job_status = sa.Enum("PENDING", "PROCESSING", "DONE", "FAILED", name="webhookjobstatus")
+
+
+def upgrade() -> None:
+    op.create_table(
+        "webhook_jobs",
+        sa.Column("id", sa.String(), nullable=False),
+        sa.Column("user_id", sa.String(), nullable=False),
+        sa.Column("payload", sa.Text(), nullable=False),
+        sa.Column("status", webhook_job_status, nullable=False),
+        sa.Column("attempts", sa.Integer(), nullable=False),
+        sa.Column("next_attempt_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("locked_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("last_error", sa.Text(), nullable=True),
+        sa.Column("task_id", sa.String(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("finished_at", sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_webhook_jobs_status_next_attempt_at", "webhook_jobs", ["status", "next_attempt_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_webhook_jobs_status_next_attempt_at", table_name="webhook_jobs")
+    op.drop_table("webhook_jobs")
+    webhook_job_status.drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,33 @@
+"""chave de idempotência dos jobs do webhook
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-17 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0007'
+down_revision: Union[str, None] = '0006'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Jobs existentes ficam sem chave (NULLs não conflitam no índice único)
+    with op.batch_alter_table("webhook_jobs") as batch_op:
+        batch_op.add_column(sa.Column("idempotency_key", sa.String(length=64), nullable=True))
+        batch_op.create_unique_constraint(
+            "uq_webhook_jobs_user_id_idempotency_key", ["user_id", "idempotency_key"]
+        )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("webhook_jobs") as batch_op:
+        batch_op.drop_constraint("uq_webhook_jobs_user_id_idempotency_key", type_="unique")
+        batch_op.drop_column("idempotency_key")
@@ -0,0 +1,84 @@
+"""tasks_fts indexada por uma coluna inteira estável (SQLite)
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-17 00:00:00
+
+A tabela FTS5 de conteúdo externo usava o rowid implícito de tasks, que tem
+chave primária texto: o VACUUM pode renumerar esse rowid e desalinhar o
+índice das linhas. Passa a usar `tasks.fts_rowid`, preenchida com o rowid
+atual e depois atribuída pelo trigger de inserção. No PostgreSQL, nada muda.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0009'
+down_revision: Union[str, None] = '0008'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+FTS_COLUMNS = "title, description, raw_message, ai_title, ai_summary"
+FTS_NEW = "new.title, new.description, new.raw_message, new.ai_title, new.ai_summary"
+FTS_OLD = "old.title, old.description, old.raw_message, old.ai_title, old.ai_summary"
+TRIGGERS = ("tasks_fts_insert", "tasks_fts_delete", "tasks_fts_update")
+
+
+def _drop_fts() -> None:
+    for trigger in TRIGGERS:
+        op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+    op.execute("DROP TABLE IF EXISTS tasks_fts")
+
+
+def _create_fts(rowid: str, insert_trigger: str) -> None:
+    op.execute(f"""
+        CREATE VIRTUAL TABLE tasks_fts USING fts5(
+            {FTS_COLUMNS}, content='tasks', content_rowid='{rowid}',
+            tokenize='unicode61 remove_diacritics 2'
+        )
+    """)
+    op.execute(f"""
+        CREATE TRIGGER tasks_fts_insert AFTER INSERT ON tasks BEGIN
+            {insert_trigger}
+        END
+    """)
+    op.execute(f"""
+        CREATE TRIGGER tasks_fts_delete AFTER DELETE ON tasks BEGIN
+            INSERT INTO tasks_fts(tasks_fts, rowid, {FTS_COLUMNS}) VALUES ('delete', old.{rowid}, {FTS_OLD});
+        END
+    """)
+    op.execute(f"""
+        CREATE TRIGGER tasks_fts_update AFTER UPDATE OF {FTS_COLUMNS} ON tasks BEGIN
+            INSERT INTO tasks_fts(tasks_fts, rowid, {FTS_COLUMNS}) VALUES ('delete', old.{rowid}, {FTS_OLD});
+            INSERT INTO tasks_fts(rowid, {FTS_COLUMNS}) VALUES (new.{rowid}, {FTS_NEW});
+        END
+    """)
+    op.execute("INSERT INTO tasks_fts(tasks_fts) VALUES ('rebuild')")
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name != "sqlite":
+        return
+
+    _drop_fts()
+    op.execute("ALTER TABLE tasks ADD COLUMN fts_rowid INTEGER")
+    op.execute("UPDATE tasks SET fts_rowid = rowid")
+    op.execute("CREATE UNIQUE INDEX ix_tasks_fts_rowid ON tasks (fts_rowid)")
+    _create_fts("fts_rowid", f"""
+            UPDATE tasks SET fts_rowid = (SELECT coalesce(max(fts_rowid), 0) + 1 FROM tasks)
+                WHERE rowid = new.rowid;
+            INSERT INTO tasks_fts(rowid, {FTS_COLUMNS})
+                SELECT fts_rowid, {FTS_COLUMNS} FROM tasks WHERE rowid = new.rowid;
+    """)
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != "sqlite":
+        return
+
+    _drop_fts()
+    op.execute("DROP INDEX IF EXISTS ix_tasks_fts_rowid")
+    op.execute("ALTER TABLE tasks DROP COLUMN fts_rowid")
+    _create_fts("rowid", f"INSERT INTO tasks_fts(rowid, {FTS_COLUMNS}) VALUES (new.rowid, {FTS_NEW});")
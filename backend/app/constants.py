@@ -60,3 +60,8 @@ ACTION_KEYWORDS = [
     'agendar', 'marcar', 'ligar', 'falar com'
 ]
 
+# Mensagens curtas (< SHORT_MESSAGE_MAX_LENGTH) sem estas palavras são tratadas como conversa
+SHORT_MESSAGE_MAX_LENGTH = 15
+SHORT_MESSAGE_ACTION_KEYWORDS = [
+    'preciso', 'fazer', 'criar', 'comprar', 'enviar', 'revisar'
+]
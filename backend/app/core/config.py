@@ -6,19 +6,96 @@ import os
 class Settings(BaseSettings):
     # Database (usa SQLite em memória se DATABASE_URL não estiver definida)
     database_url: str = os.getenv("DATABASE_URL", "sqlite:///./leggal.db")
+    database_pool_size: int = 10
+    database_max_overflow: int = 20
+    # Group commit: turnos do chat concorrentes gravados numa única transação
+    chat_group_commit: Optional[bool] = None  # sem valor: ligado só no SQLite
+    group_commit_window_ms: float = 5.0  # espera máxima desde a primeira escrita pendente
+    group_commit_max_batch: int = 64
 
     # JWT
     secret_key: str = "your-secret-key-here-make-it-long-and-random-at-least-32-characters"
     algorithm: str = "HS256"
     access_token_expire_minutes: int = 10080  # 7 dias
+    principal_cache_size: int = 10000  # tokens já verificados mantidos em memória
+    principal_cache_ttl_seconds: int = 300  # limitado também pelo `exp` do token
+
+    # Hash de senhas (PBKDF2-SHA256) em executor próprio, fora do threadpool compartilhado
+    password_hash_iterations: int = 100000  # ao mudar, senhas são regravadas no login
+    password_hash_workers: int = 2
+    password_hash_max_pending: int = 64  # acima disso login/registro respondem 503
+    password_hash_use_processes: bool = False
 
     # OpenAI
     openai_api_key: Optional[str] = None
     openai_model_name: str = "gpt-4o-mini"
+    openai_timeout_seconds: float = 30.0
+    openai_analyze_timeout_seconds: float = 15.0
+    openai_answer_timeout_seconds: float = 30.0
+    openai_max_concurrency: int = 20  # chamadas simultâneas ao provedor; acima disso as requisições esperam no semáforo
+    openai_base_url: Optional[str] = None
+    openai_max_connections: int = 50
+    openai_max_keepalive_connections: int = 20
+    openai_keepalive_expiry_seconds: float = 60.0
+    openai_http2: bool = True
+    # Resiliência: os timeouts acima são o prazo total de cada operação; acima do SLO conta como falha
+    openai_analyze_slo_seconds: float = 5.0
+    openai_answer_slo_seconds: float = 10.0  # no stream, até o primeiro token
+    llm_breaker_failure_threshold: int = 5  # falhas seguidas para abrir o circuito
+    llm_breaker_reset_seconds: float = 30.0  # tempo aberto antes da chamada de teste
+    llm_hedging: bool = False  # segunda requisição quando a primeira passa do p95
+    llm_hedge_min_samples: int = 20
+
+    # Contexto das respostas do chat: tarefas mais relevantes até o orçamento de tokens
+    chat_context_token_budget: int = 1500
+    chat_context_candidates: int = 50  # por fonte: similares à pergunta e mais recentes
+    chat_context_recency_half_life_days: float = 7.0
+    # Cache de respostas do chat: pergunta normalizada + versão das tarefas do usuário
+    chat_answer_cache_size: int = 5000
+    chat_answer_cache_ttl_seconds: float = 600.0
+    chat_answer_cache_similarity: float = 0.0  # > 0: reaproveita perguntas quase iguais (cosseno); só com embedder semântico
+
+    # Micro-batching das análises de IA: mensagens concorrentes numa única chamada ao modelo
+    ai_analysis_batching: bool = False
+    ai_analysis_batch_window_ms: float = 10.0  # espera máxima desde a primeira análise pendente
+    ai_analysis_batch_max_size: int = 8
+
+    # Cache de análises de IA
+    analysis_cache_size: int = 1024
+    analysis_cache_ttl_seconds: int = 3600
+    analysis_cache_persistent: bool = False
+    analysis_cache_persistent_ttl_seconds: int = 604800  # 7 dias
+
+    # Índice de busca de tarefas similares (por processo)
+    search_index_max_users: int = 1000
+    search_index_ttl_seconds: int = 300
+
+    # Busca vetorial (embeddings)
+    embedding_backend: str = "hashing"  # hashing | sentence-transformers
+    embedding_model: str = "paraphrase-multilingual-MiniLM-L12-v2"
+    embedding_dimensions: int = 256  # apenas para o backend hashing
+    faiss_min_vectors: int = 200000  # abaixo disso a busca exata com NumPy custa poucos ms por consulta
+
+    # Lote do webhook (POST /webhook/messages:batch)
+    webhook_batch_max_size: int = 500
+    webhook_batch_concurrency: int = 8  # análises de IA simultâneas por lote
+
+    # Fila durável do webhook (tabela webhook_jobs)
+    webhook_workers: int = 2  # workers no processo da API; 0 = só scripts/webhook_worker.py
+    webhook_poll_interval_seconds: float = 1.0
+    webhook_job_max_attempts: int = 5
+    webhook_retry_base_seconds: float = 2.0
+    webhook_retry_max_seconds: float = 300.0
+    webhook_job_visibility_timeout_seconds: float = 300.0  # job em processamento há mais que isso é retomado
+
+    # Idempotência do webhook: cache em memória na frente do índice único de webhook_jobs
+    webhook_idempotency_cache_size: int = 10000
+    webhook_idempotency_cache_ttl_seconds: float = 600.0
 
     # Server
     host: str = "0.0.0.0"
     port: int = 8000
+    rate_limit_enabled: bool = True  # desligar só em testes de carga (todo o tráfego vem de um IP)
 
     # Redis
     redis_url: str = "redis://localhost:6379"
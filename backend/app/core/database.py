@@ -1,7 +1,11 @@
-from sqlalchemy import create_engine, text
+import time
+
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from .config import settings
+from .metrics import db_pool_in_use, db_pool_wait
 
 # Configuração da engine do SQLAlchemy
 connect_args = {}
@@ -15,9 +19,102 @@ engine = create_engine(
     connect_args=connect_args
 )
 
-# SessionLocal para operações de banco
+
+
+def _configure_sqlite(dbapi_connection, connection_record):
+    """WAL permite leituras concorrentes a uma escrita; busy_timeout evita erros de lock"""
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA busy_timeout=5000")
+    cursor.close()
+
+
+def _begin_before_savepoint(conn, name):
+    """
+    O driver do SQLite só emite BEGIN antes de INSERT/UPDATE/DELETE. Um
+    SAVEPOINT (begin_nested) enviado antes disso abriria a transação, e o
+    RELEASE a confirmaria no meio da transação da sessão. Aqui o BEGIN vem
+    antes, e o savepoint fica aninhado.
+
+    Não usamos a receita da documentação (BEGIN em toda transação): as
+    leituras passariam a segurar um snapshot do WAL até o commit, e a
+    primeira escrita depois de um commit concorrente falharia na hora com
+    "database is locked", sem esperar o busy_timeout
+    """
+    if not conn.connection.driver_connection.in_transaction:
+        conn.exec_driver_sql("BEGIN")
+
+
+if "sqlite" in settings.database_url:
+    event.listen(engine, "connect", _configure_sqlite)
+    event.listen(engine, "savepoint", _begin_before_savepoint)
+
+# SessionLocal para operações de banco (scripts, seed e migrações)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+
+def get_async_database_url(database_url: str) -> str:
+    """Converte a URL do banco para o driver assíncrono equivalente"""
+    if database_url.startswith("sqlite:///"):
+        return database_url.replace("sqlite:///", "sqlite+aiosqlite:///", 1)
+    for prefix in ("postgresql+psycopg2://", "postgresql://", "postgres://"):
+        if database_url.startswith(prefix):
+            return database_url.replace(prefix, "postgresql+asyncpg://", 1)
+    return database_url
+
+
+# Engine assíncrona (aiosqlite localmente, asyncpg em produção) usada pela API
+async_engine_options = {}
+if "sqlite" not in settings.database_url:
+    async_engine_options = {
+        "pool_size": settings.database_pool_size,
+        "max_overflow": settings.database_max_overflow
+    }
+
+async_engine = create_async_engine(
+    get_async_database_url(settings.database_url),
+    pool_pre_ping=True,
+    echo=settings.environment == "development",
+    **async_engine_options
+)
+
+if "sqlite" in settings.database_url:
+    event.listen(async_engine.sync_engine, "connect", _configure_sqlite)
+    event.listen(async_engine.sync_engine, "savepoint", _begin_before_savepoint)
+
+
+def _instrument_pool(pool) -> None:
+    """
+    Mede a espera por uma conexão e as conexões em uso (GET /metrics); a
+    subclasse sobrevive ao pool.recreate(), que usa a mesma classe
+    """
+    base = type(pool)
+
+    class TimedPool(base):
+        def _do_get(self):
+            start = time.perf_counter()
+            try:
+                return super()._do_get()
+            finally:
+                db_pool_wait.observe(time.perf_counter() - start)
+
+    TimedPool.__name__ = f"Timed{base.__name__}"
+    pool.__class__ = TimedPool
+    event.listen(pool, "checkout", lambda *args: db_pool_in_use.inc())
+    event.listen(pool, "checkin", lambda *args: db_pool_in_use.dec())
+
+
+_instrument_pool(async_engine.sync_engine.pool)
+
+# expire_on_commit=False: objetos continuam legíveis após o commit sem novo SELECT implícito
+AsyncSessionLocal = async_sessionmaker(
+    async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False
+)
+
 # Base para modelos
 Base = declarative_base()
 
@@ -33,6 +130,14 @@ def get_db():
         db.close()
 
 
+async def get_async_db():
+    """
+    Dependency para obter sessão assíncrona do banco de dados
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
 def create_tables():
     """
     Cria todas as tabelas no banco de dados
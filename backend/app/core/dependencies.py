@@ -1,11 +1,12 @@
-from typing import Generator
+from typing import AsyncGenerator, Generator
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
-from .database import SessionLocal
-from .security import verify_token
+from sqlalchemy.ext.asyncio import AsyncSession
+from .database import SessionLocal, AsyncSessionLocal
+from .security import decode_access_token
 from ..models.models import User
 from ..services.auth_service import AuthService
+from ..services.principal_cache import principal_cache
 
 security = HTTPBearer()
 
@@ -19,21 +20,31 @@ def get_db() -> Generator:
         db.close()
 
 
-def get_current_user(
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    """Dependency para obter sessão assíncrona do banco de dados"""
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> User:
     """Dependency para obter usuário autenticado"""
     token = credentials.credentials
-    email = verify_token(token)
-    if not email:
+    user = principal_cache.get(token)
+    if user is not None:
+        return user
+
+    payload = decode_access_token(token)
+    if payload is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Token inválido ou expirado",
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    user = AuthService.get_current_user(db, token)
+    user = await AuthService.get_user_from_claims(db, payload)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -41,24 +52,21 @@ def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
+    # Desanexa da sessão da requisição antes de compartilhar pelo cache
+    db.expunge(user)
+    principal_cache.set(token, user, payload.get("exp"))
     return user
 
 
-def get_current_user_optional(
+async def get_current_user_optional(
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> User | None:
     """Dependency opcional para obter usuário autenticado"""
     if not credentials:
         return None
 
     try:
-        token = credentials.credentials
-        email = verify_token(token)
-        if not email:
-            return None
-
-        user = AuthService.get_current_user(db, token)
-        return user
-    except:
+        return await get_current_user(credentials, db)
+    except HTTPException:
         return None
@@ -0,0 +1,123 @@
+"""
+Group commit: escritas de requisições concorrentes confirmadas numa única
+transação
+
+Cada unidade é uma corrotina que recebe a sessão e só adiciona/flusha (sem
+commit). O committer espera até `window` segundos desde a primeira unidade
+pendente (ou até juntar `max_batch`), roda cada unidade no seu savepoint e faz
+um único commit: um fsync para o lote inteiro. Uma unidade que falha é
+desfeita sozinha e o erro volta para quem a enviou; se o commit falhar, todas
+recebem o erro.
+"""
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .config import settings
+from .database import AsyncSessionLocal
+
+logger = logging.getLogger(__name__)
+
+Unit = Callable[[AsyncSession], Awaitable[Any]]
+
+
+def group_commit_enabled() -> bool:
+    """
+    CHAT_GROUP_COMMIT; sem valor, ligado no SQLite. Lá só um escritor grava por
+    vez, e com muitas transações concorrentes a espera pelo lock passa do
+    busy_timeout ("database is locked"); o lote usa uma única conexão
+    """
+    if settings.chat_group_commit is not None:
+        return settings.chat_group_commit
+    return "sqlite" in settings.database_url
+
+
+class GroupCommitter:
+    def __init__(self, window: float, max_batch: int):
+        self.window = window
+        self.max_batch = max_batch
+        self._pending: List[Tuple[Unit, asyncio.Future]] = []
+        self._full = asyncio.Event()
+        self._runner: Optional[asyncio.Task] = None
+
+        # Métricas
+        self.commits = 0
+        self.units = 0
+        self.largest_batch = 0
+
+    async def submit(self, unit: Unit) -> Any:
+        """Executa `unit` no próximo lote; retorna o resultado dela depois do commit"""
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((unit, future))
+        if self._runner is None:
+            self._full = asyncio.Event()
+            self._runner = asyncio.create_task(self._run())
+        if len(self._pending) >= self.max_batch:
+            self._full.set()
+        return await future
+
+    async def _run(self) -> None:
+        try:
+            while self._pending:
+                if len(self._pending) < self.max_batch:
+                    self._full.clear()
+                    try:
+                        await asyncio.wait_for(self._full.wait(), timeout=self.window)
+                    except asyncio.TimeoutError:
+                        pass
+                batch = self._pending[:self.max_batch]
+                del self._pending[:self.max_batch]
+                await self._commit(batch)
+        finally:
+            self._runner = None
+
+    async def _commit(self, batch: List[Tuple[Unit, asyncio.Future]]) -> None:
+        # Quem desistiu de esperar (requisição cancelada) não é gravado
+        batch = [(unit, future) for unit, future in batch if not future.done()]
+        if not batch:
+            return
+
+        outcomes = []
+        try:
+            async with AsyncSessionLocal() as db:
+                for unit, future in batch:
+                    try:
+                        async with db.begin_nested():
+                            outcomes.append((future, await unit(db), None))
+                    except Exception as e:
+                        outcomes.append((future, None, e))
+                await db.commit()
+        except Exception as e:
+            logger.exception("Falha no commit em grupo")
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        self.commits += 1
+        self.units += len(batch)
+        self.largest_batch = max(self.largest_batch, len(batch))
+        for future, result, error in outcomes:
+            if future.done():
+                continue
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "commits": self.commits,
+            "units": self.units,
+            "avg_batch": self.units / self.commits if self.commits else 0.0,
+            "largest_batch": self.largest_batch,
+            "pending": len(self._pending)
+        }
+
+
+group_committer = GroupCommitter(
+    window=settings.group_commit_window_ms / 1000,
+    max_batch=settings.group_commit_max_batch
+)
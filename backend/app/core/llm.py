@@ -0,0 +1,170 @@
+"""
+Registro do cliente de LLM (OpenAI) com escopo de aplicação
+
+Um único AsyncOpenAI, sobre um pool httpx com keep-alive (e HTTP/2 quando o
+pacote h2 estiver instalado), é criado no lifespan do FastAPI e compartilhado
+pela análise de tarefas e pelo chat.
+"""
+import asyncio
+import logging
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+import httpx
+
+from .config import settings
+from .metrics import llm_tokens
+
+logger = logging.getLogger(__name__)
+
+# Tentar importar OpenAI
+try:
+    from openai import AsyncOpenAI
+    OPENAI_AVAILABLE = True
+except ImportError:
+    OPENAI_AVAILABLE = False
+
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+
+class LLMClientRegistry:
+    """
+    Mantém o cliente AsyncOpenAI compartilhado e limita as chamadas
+    simultâneas ao provedor
+    """
+
+    def __init__(self):
+        self._client: Optional["AsyncOpenAI"] = None
+        self._http_client: Optional[httpx.AsyncClient] = None
+        self._transport: Optional[httpx.AsyncBaseTransport] = None
+        self.api_key = settings.openai_api_key
+        self.base_url = settings.openai_base_url
+        self.model = settings.openai_model_name
+        self.timeout = settings.openai_timeout_seconds
+        self._semaphore = asyncio.Semaphore(settings.openai_max_concurrency)
+
+    @property
+    def available(self) -> bool:
+        return OPENAI_AVAILABLE and bool(self.api_key)
+
+    @property
+    def started(self) -> bool:
+        return self._client is not None
+
+    def configure(
+        self,
+        api_key: Optional[str] = None,
+        base_url: Optional[str] = None,
+        max_concurrency: Optional[int] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None
+    ) -> None:
+        """Sobrescreve a configuração (usado em scripts de benchmark); o cliente é recriado"""
+        if api_key is not None:
+            self.api_key = api_key
+        if base_url is not None:
+            self.base_url = base_url
+        if max_concurrency is not None:
+            self._semaphore = asyncio.Semaphore(max_concurrency)
+        if transport is not None:
+            self._transport = transport
+        self._client = None
+        self._http_client = None
+
+    def start(self) -> None:
+        """Cria o pool de conexões; chamado no startup da aplicação"""
+        if self._client is not None or not self.available:
+            return
+
+        http2 = settings.openai_http2 and HTTP2_AVAILABLE and self._transport is None
+        self._http_client = httpx.AsyncClient(
+            transport=self._transport,
+            http2=http2,
+            timeout=httpx.Timeout(self.timeout, connect=5.0),
+            limits=httpx.Limits(
+                max_connections=settings.openai_max_connections,
+                max_keepalive_connections=settings.openai_max_keepalive_connections,
+                keepalive_expiry=settings.openai_keepalive_expiry_seconds
+            )
+        )
+        self._client = AsyncOpenAI(
+            api_key=self.api_key,
+            base_url=self.base_url,
+            timeout=self.timeout,
+            http_client=self._http_client
+        )
+        logger.info(f"Cliente LLM iniciado (modelo={self.model}, http2={http2})")
+
+    @property
+    def client(self) -> "AsyncOpenAI":
+        # Scripts e workers fora do lifespan iniciam o pool no primeiro uso
+        if self._client is None:
+            self.start()
+        return self._client
+
+    async def chat_completion(
+        self,
+        messages: List[Dict[str, Any]],
+        temperature: float = 0.7,
+        max_tokens: int = 300,
+        timeout: Optional[float] = None,
+        operation: str = "other"
+    ) -> str:
+        """
+        Executa uma chat completion sem bloquear o event loop e retorna o texto
+        da resposta; `operation` rotula os tokens em /metrics
+        """
+        client = self.client
+
+        async with self._semaphore:
+            response = await client.chat.completions.create(
+                model=self.model,
+                messages=messages,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                timeout=timeout or self.timeout
+            )
+
+        if response.usage is not None:
+            llm_tokens.inc(operation, "prompt", amount=response.usage.prompt_tokens)
+            llm_tokens.inc(operation, "completion", amount=response.usage.completion_tokens)
+        return response.choices[0].message.content.strip()
+
+    async def stream_chat_completion(
+        self,
+        messages: List[Dict[str, Any]],
+        temperature: float = 0.7,
+        max_tokens: int = 300,
+        timeout: Optional[float] = None,
+        operation: str = "other"
+    ) -> AsyncIterator[str]:
+        """Executa uma chat completion com stream=True e produz os trechos de texto à medida que chegam"""
+        client = self.client
+
+        async with self._semaphore:
+            stream = await client.chat.completions.create(
+                model=self.model,
+                messages=messages,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                timeout=timeout or self.timeout,
+                stream=True
+            )
+            async for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    # O stream não traz o uso de tokens: cada trecho conta como um
+                    llm_tokens.inc(operation, "completion")
+                    yield chunk.choices[0].delta.content
+
+    async def close(self) -> None:
+        """Fecha o pool de conexões; chamado no shutdown da aplicação"""
+        if self._http_client is not None:
+            await self._http_client.aclose()
+        self._client = None
+        self._http_client = None
+
+
+# Registro global do cliente de LLM
+llm_client = LLMClientRegistry()
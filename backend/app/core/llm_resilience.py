@@ -0,0 +1,284 @@
+"""
+Resiliência das chamadas ao LLM: prazo total, circuit breaker e hedging por
+operação (análise, análise em lote, resposta, resposta em stream)
+
+- Prazo: a chamada inteira, incluindo a espera pelo semáforo do provedor e
+  as novas tentativas do cliente OpenAI, termina em `deadline` segundos com
+  LLMDeadlineExceeded.
+- Circuit breaker: `failure_threshold` falhas seguidas (erro, prazo ou
+  resposta acima do SLO de latência) abrem o circuito. Aberto, as chamadas
+  levantam CircuitOpenError na hora e quem chama usa o fallback local. Depois
+  de `reset_timeout` segundos uma única chamada de teste passa: se der certo
+  o circuito fecha, senão volta a abrir.
+- Hedging (opcional): se a resposta não chega até o p95 das latências
+  recentes, uma segunda requisição idêntica é disparada e vale a primeira que
+  terminar; a outra é cancelada.
+
+Nos streams, o SLO vale para o primeiro token e não há hedging.
+"""
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional, TypeVar
+
+from .config import settings
+from .metrics import llm_request_duration
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# Latências guardadas para o p95 do hedging
+LATENCY_WINDOW = 200
+
+
+class LLMUnavailable(Exception):
+    """O LLM não respondeu a tempo ou o circuito está aberto: use o fallback local"""
+
+
+class CircuitOpenError(LLMUnavailable):
+    pass
+
+
+class LLMDeadlineExceeded(LLMUnavailable):
+    pass
+
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.opened = 0
+        self._probing = False
+
+    def allow(self) -> bool:
+        if self.state == CLOSED:
+            return True
+        if self.state == OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+            self.state = HALF_OPEN
+        if self.state == HALF_OPEN and not self._probing:
+            self._probing = True
+            return True
+        return False
+
+    def release(self) -> None:
+        """A chamada admitida foi cancelada por quem chamou: não conta como sucesso nem falha"""
+        self._probing = False
+
+    def record_success(self) -> None:
+        self._probing = False
+        self.consecutive_failures = 0
+        self.state = CLOSED
+
+    def record_failure(self) -> None:
+        self._probing = False
+        self.consecutive_failures += 1
+        if self.state == HALF_OPEN or (self.state == CLOSED and self.consecutive_failures >= self.failure_threshold):
+            self.state = OPEN
+            self.opened_at = time.monotonic()
+            self.opened += 1
+
+
+class LLMGuard:
+    def __init__(
+        self,
+        name: str,
+        deadline: float,
+        slo: float,
+        failure_threshold: int,
+        reset_timeout: float,
+        hedging: bool = False,
+        hedge_min_samples: int = 20
+    ):
+        self.name = name
+        self.deadline = deadline
+        self.slo = slo
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+        self.hedging = hedging
+        self.hedge_min_samples = hedge_min_samples
+        self.latencies: deque = deque(maxlen=LATENCY_WINDOW)
+
+        # Métricas
+        self.calls = 0
+        self.succeeded = 0
+        self.failed = 0
+        self.timed_out = 0
+        self.slow = 0
+        self.short_circuited = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+
+    def _percentile(self, fraction: float) -> Optional[float]:
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+    def hedge_delay(self) -> Optional[float]:
+        if not self.hedging or len(self.latencies) < self.hedge_min_samples:
+            return None
+        return self._percentile(0.95)
+
+    def _admit(self) -> None:
+        self.calls += 1
+        if not self.breaker.allow():
+            self.short_circuited += 1
+            raise CircuitOpenError(f"Circuito do LLM aberto ({self.name})")
+
+    def _succeeded(self, latency: float) -> None:
+        self.latencies.append(latency)
+        llm_request_duration.observe(latency, self.name, "ok")
+        if latency > self.slo:
+            # Respondeu, mas fora do SLO: conta para abrir o circuito
+            self.slow += 1
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_success()
+        self.succeeded += 1
+
+    def _failed(self, error: BaseException, latency: float) -> None:
+        if isinstance(error, LLMDeadlineExceeded):
+            self.timed_out += 1
+            llm_request_duration.observe(latency, self.name, "timeout")
+        else:
+            self.failed += 1
+            llm_request_duration.observe(latency, self.name, "error")
+        self.breaker.record_failure()
+        if self.breaker.state == OPEN:
+            logger.warning(f"Circuito do LLM aberto ({self.name}) após {type(error).__name__}: {error}")
+
+    async def call(self, fn: Callable[[], Awaitable[T]]) -> T:
+        """Executa `fn` (uma requisição ao LLM) dentro do prazo e do circuit breaker"""
+        self._admit()
+        start = time.monotonic()
+        try:
+            try:
+                result = await asyncio.wait_for(self._hedged(fn), timeout=self.deadline)
+            except asyncio.TimeoutError:
+                raise LLMDeadlineExceeded(f"LLM sem resposta em {self.deadline:g}s ({self.name})")
+        except Exception as e:
+            self._failed(e, time.monotonic() - start)
+            raise
+        except asyncio.CancelledError:
+            # Quem chamou desistiu; não diz nada sobre o provedor
+            self.breaker.release()
+            raise
+        self._succeeded(time.monotonic() - start)
+        return result
+
+    async def _hedged(self, fn: Callable[[], Awaitable[T]]) -> T:
+        delay = self.hedge_delay()
+        if delay is None:
+            return await fn()
+
+        pending = {asyncio.ensure_future(fn())}
+        hedge = None
+        error: Optional[BaseException] = None
+        try:
+            done, pending = await asyncio.wait(pending, timeout=delay)
+            if not done:
+                self.hedges += 1
+                hedge = asyncio.ensure_future(fn())
+                pending.add(hedge)
+            while True:
+                for task in done:
+                    if task.exception() is None:
+                        if task is hedge:
+                            self.hedge_wins += 1
+                        return task.result()
+                    error = task.exception()
+                if not pending:
+                    raise error
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def stream(self, open_stream: Callable[[], AsyncIterator[str]]) -> AsyncIterator[str]:
+        """Como `call`, para streams: o prazo vale para o stream inteiro e o SLO para o primeiro token"""
+        self._admit()
+        start = time.monotonic()
+        first_token: Optional[float] = None
+        iterator = open_stream().__aiter__()
+        try:
+            while True:
+                remaining = self.deadline - (time.monotonic() - start)
+                try:
+                    if remaining <= 0:
+                        raise asyncio.TimeoutError
+                    token = await asyncio.wait_for(iterator.__anext__(), timeout=remaining)
+                except StopAsyncIteration:
+                    break
+                except asyncio.TimeoutError:
+                    raise LLMDeadlineExceeded(f"LLM sem resposta em {self.deadline:g}s ({self.name})")
+                if first_token is None:
+                    first_token = time.monotonic() - start
+                yield token
+        except Exception as e:
+            self._failed(e, time.monotonic() - start)
+            raise
+        except (asyncio.CancelledError, GeneratorExit):
+            self.breaker.release()
+            raise
+        finally:
+            await iterator.aclose()
+        self._succeeded(first_token if first_token is not None else time.monotonic() - start)
+
+    def stats(self) -> Dict[str, Any]:
+        fallbacks = self.failed + self.timed_out + self.short_circuited
+        p50, p95 = self._percentile(0.5), self._percentile(0.95)
+        return {
+            "state": self.breaker.state,
+            "consecutive_failures": self.breaker.consecutive_failures,
+            "opened": self.breaker.opened,
+            "calls": self.calls,
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+            "timed_out": self.timed_out,
+            "slow": self.slow,
+            "short_circuited": self.short_circuited,
+            "fallback_rate": fallbacks / self.calls if self.calls else 0.0,
+            "p50_ms": p50 * 1000 if p50 is not None else None,
+            "p95_ms": p95 * 1000 if p95 is not None else None,
+            "hedges": self.hedges,
+            "hedge_wins": self.hedge_wins
+        }
+
+
+def _guard(name: str, deadline: float, slo: float, hedging: bool = False) -> LLMGuard:
+    return LLMGuard(
+        name,
+        deadline=deadline,
+        slo=slo,
+        failure_threshold=settings.llm_breaker_failure_threshold,
+        reset_timeout=settings.llm_breaker_reset_seconds,
+        hedging=hedging and settings.llm_hedging,
+        hedge_min_samples=settings.llm_hedge_min_samples
+    )
+
+
+# Uma proteção por operação: prazos e SLOs diferentes, e um lote lento não abre o circuito das análises avulsas
+llm_guards: Dict[str, LLMGuard] = {
+    "analyze": _guard(
+        "analyze", settings.openai_analyze_timeout_seconds, settings.openai_analyze_slo_seconds, hedging=True
+    ),
+    "analyze_batch": _guard(
+        "analyze_batch", settings.openai_analyze_timeout_seconds, settings.openai_analyze_slo_seconds * 2
+    ),
+    "answer": _guard("answer", settings.openai_answer_timeout_seconds, settings.openai_answer_slo_seconds, hedging=True),
+    "answer_stream": _guard(
+        "answer_stream", settings.openai_answer_timeout_seconds, settings.openai_answer_slo_seconds
+    ),
+}
+
+
+def llm_guard_stats() -> Dict[str, Dict[str, Any]]:
+    return {name: guard.stats() for name, guard in llm_guards.items()}
@@ -0,0 +1,103 @@
+"""
+Executor dedicado ao hash de senhas
+
+PBKDF2 com 100.000 iterações custa dezenas de milissegundos de CPU. Rodando no
+threadpool compartilhado do AnyIO, uma rajada de logins ocupa todos os seus
+workers (e a CPU) e atrasa qualquer rota ou dependency síncrona. Aqui o hash
+roda num pool próprio com `password_hash_workers` threads (hashlib libera o GIL)
+ou processos, e no máximo `password_hash_max_pending` operações pendentes;
+além disso a operação é recusada com PasswordHasherBusy (HTTP 503).
+"""
+import asyncio
+import logging
+import multiprocessing
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from .config import settings
+from .security import get_password_hash, password_needs_rehash, verify_password
+
+logger = logging.getLogger(__name__)
+
+
+class PasswordHasherBusy(Exception):
+    """Fila do executor de hash cheia"""
+
+
+class PasswordHasher:
+    def __init__(self, workers: int, max_pending: int, use_processes: bool = False):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.use_processes = use_processes
+        self._executor: Optional[Executor] = None
+
+        # Métricas: pendentes = em execução + na fila do executor
+        self.pending = 0
+        self.peak_pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self.total_seconds = 0.0
+
+    def start(self) -> None:
+        if self._executor is not None:
+            return
+        if self.use_processes:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        else:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="password-hash")
+        logger.info(f"Executor de hash de senhas: {self.workers} {'processos' if self.use_processes else 'threads'}")
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    async def _run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise PasswordHasherBusy("Muitas operações de senha em andamento, tente novamente")
+
+        self.start()
+        self.pending += 1
+        self.peak_pending = max(self.peak_pending, self.pending)
+        start = time.perf_counter()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+        finally:
+            self.pending -= 1
+            self.completed += 1
+            self.total_seconds += time.perf_counter() - start
+
+    async def hash(self, password: str) -> str:
+        return await self._run(get_password_hash, password, settings.password_hash_iterations)
+
+    async def verify(self, password: str, hashed_password: str) -> bool:
+        return await self._run(verify_password, password, hashed_password)
+
+    @staticmethod
+    def needs_rehash(hashed_password: str) -> bool:
+        return password_needs_rehash(hashed_password)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": self.workers,
+            "kind": "process" if self.use_processes else "thread",
+            "pending": self.pending,
+            "queued": max(0, self.pending - self.workers),
+            "peak_pending": self.peak_pending,
+            "max_pending": self.max_pending,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "avg_ms": self.total_seconds / self.completed * 1000 if self.completed else 0.0
+        }
+
+
+password_hasher = PasswordHasher(
+    workers=settings.password_hash_workers,
+    max_pending=settings.password_hash_max_pending,
+    use_processes=settings.password_hash_use_processes
+)
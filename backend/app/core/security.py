@@ -1,27 +1,51 @@
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Optional, Tuple
 import jwt
 import hashlib
+import hmac
 import os
 from .config import settings
 
 
-def get_password_hash(password: str) -> str:
+# Formato: pbkdf2_sha256$<iterações>$<salt hex>$<hash hex>. Hashes antigos
+# (salt hex + hash hex, sem prefixo) usam 100.000 iterações
+PBKDF2_PREFIX = "pbkdf2_sha256"
+LEGACY_PBKDF2_ITERATIONS = 100000
+
+
+def get_password_hash(password: str, iterations: Optional[int] = None) -> str:
+    iterations = iterations or settings.password_hash_iterations
     salt = os.urandom(32)
-    pwdhash = hashlib.pbkdf2_hmac('sha256', password.encode('utf-8'), salt, 100000)
-    return salt.hex() + pwdhash.hex()
+    pwdhash = hashlib.pbkdf2_hmac('sha256', password.encode('utf-8'), salt, iterations)
+    return f"{PBKDF2_PREFIX}${iterations}${salt.hex()}${pwdhash.hex()}"
+
+
+def _parse_password_hash(hashed_password: str) -> Tuple[int, bytes, bytes]:
+    if hashed_password.startswith(PBKDF2_PREFIX + "$"):
+        _, iterations, salt, stored_hash = hashed_password.split("$")
+        return int(iterations), bytes.fromhex(salt), bytes.fromhex(stored_hash)
+    return LEGACY_PBKDF2_ITERATIONS, bytes.fromhex(hashed_password[:64]), bytes.fromhex(hashed_password[64:])
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     try:
-        salt = bytes.fromhex(hashed_password[:64])
-        stored_hash = bytes.fromhex(hashed_password[64:])
-        pwdhash = hashlib.pbkdf2_hmac('sha256', plain_password.encode('utf-8'), salt, 100000)
-        return pwdhash == stored_hash
+        iterations, salt, stored_hash = _parse_password_hash(hashed_password)
+        pwdhash = hashlib.pbkdf2_hmac('sha256', plain_password.encode('utf-8'), salt, iterations)
+        return hmac.compare_digest(pwdhash, stored_hash)
     except:
         return False
 
 
+def password_needs_rehash(hashed_password: str) -> bool:
+    """True se o hash não usa o formato e o número de iterações atuais"""
+    if not hashed_password.startswith(PBKDF2_PREFIX + "$"):
+        return True
+    try:
+        return _parse_password_hash(hashed_password)[0] != settings.password_hash_iterations
+    except ValueError:
+        return True
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
     if expires_delta:
@@ -34,14 +58,16 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     return encoded_jwt
 
 
-def verify_token(token: str) -> Optional[str]:
+def decode_access_token(token: str) -> Optional[dict]:
+    """Valida assinatura e expiração; retorna as claims ou None"""
     try:
-        payload = jwt.decode(token, settings.secret_key, algorithms=[settings.algorithm])
-        email: str = payload.get("sub")
-        if email is None:
-            return None
-        return email
-    except jwt.ExpiredSignatureError:
+        return jwt.decode(token, settings.secret_key, algorithms=[settings.algorithm])
+    except jwt.PyJWTError:
         return None
-    except jwt.JWTError:
+
+
+def verify_token(token: str) -> Optional[str]:
+    payload = decode_access_token(token)
+    if payload is None:
         return None
+    return payload.get("sub")
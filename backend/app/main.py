@@ -1,5 +1,7 @@
 from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
 from slowapi import Limiter, _rate_limit_exceeded_handler
@@ -10,7 +12,12 @@ import logging
 
 from .core.config import settings
 from .core.database import create_tables
-from .routers import auth, tasks, webhook, ai, chat
+from .core.llm import llm_client
+from .core.metrics import http_request_duration, http_requests_in_flight
+from .core.password_hasher import PasswordHasherBusy, password_hasher
+from .services.answer_context import answer_context_builder
+from .services.webhook_queue import webhook_queue
+from .routers import auth, tasks, webhook, ai, chat, metrics
 
 
 logging.basicConfig(
@@ -19,7 +26,7 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-limiter = Limiter(key_func=get_remote_address, default_limits=["200/minute"])
+limiter = Limiter(key_func=get_remote_address, default_limits=["200/minute"], enabled=settings.rate_limit_enabled)
 
 
 @asynccontextmanager
@@ -31,10 +38,18 @@ async def lifespan(app: FastAPI):
         create_tables()
 
     logger.info("Inicializando serviços de IA...")
+    llm_client.start()
+    app.state.llm_client = llm_client
+    password_hasher.start()
+    await run_in_threadpool(answer_context_builder.tokens.load)
+    webhook_queue.start()
 
     yield
 
     logger.info("Encerrando aplicação")
+    await webhook_queue.stop()
+    await llm_client.close()
+    password_hasher.shutdown()
 
 
 app = FastAPI(
@@ -47,6 +62,11 @@ app = FastAPI(
 app.state.limiter = limiter
 app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
 
+
+@app.exception_handler(PasswordHasherBusy)
+async def password_hasher_busy_handler(request: Request, exc: PasswordHasherBusy):
+    return JSONResponse(status_code=503, content={"detail": str(exc)}, headers={"Retry-After": "1"})
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["http://localhost:5173", "http://localhost:3000"],
@@ -62,10 +82,26 @@ if settings.environment == "production":
     )
 
 
+# Endpoint da rota -> caminho com parâmetros (/tasks/{task_id}), para não criar uma série por id
+route_paths: dict = {}
+
+
+def route_path(request: Request) -> str:
+    endpoint = request.scope.get("endpoint")
+    if endpoint is None:
+        return "unmatched"
+    if endpoint not in route_paths:
+        route_paths[endpoint] = next(
+            (route.path for route in app.routes if getattr(route, "endpoint", None) is endpoint), "unmatched"
+        )
+    return route_paths[endpoint]
+
+
 @app.middleware("http")
 async def log_requests(request: Request, call_next):
-    start_time = time.time()
+    start_time = time.perf_counter()
     logger.info(f"{request.method} {request.url.path}")
+    http_requests_in_flight.inc()
 
     try:
         response = await call_next(request)
@@ -77,12 +113,14 @@ async def log_requests(request: Request, call_next):
         response.headers["Referrer-Policy"] = "strict-origin-when-cross-origin"
         response.headers["Permissions-Policy"] = "geolocation=(), microphone=(), camera=()"
 
-        process_time = time.time() - start_time
+        process_time = time.perf_counter() - start_time
+        http_request_duration.observe(process_time, request.method, route_path(request), str(response.status_code))
         logger.info(f"{request.method} {request.url.path} - {response.status_code} - {process_time:.4f}s")
 
         return response
     
     except Exception as e:
+        http_request_duration.observe(time.perf_counter() - start_time, request.method, route_path(request), "500")
         logger.error(f"❌ {request.method} {request.url.path} - Error: {type(e).__name__}")
         
         if settings.environment == "production":
@@ -93,9 +131,13 @@ async def log_requests(request: Request, call_next):
             )
         raise
 
+    finally:
+        http_requests_in_flight.dec()
+
 
 @app.get("/health", tags=["health"])
-def health_check():
+async def health_check():
+    # Só liveness: contadores e estado interno ficam em GET /metrics
     return {
         "status": "healthy",
         "timestamp": time.time(),
@@ -108,6 +150,7 @@ app.include_router(tasks.router)
 app.include_router(webhook.router)
 app.include_router(ai.router)
 app.include_router(chat.router)
+app.include_router(metrics.router)
 
 
 if __name__ == "__main__":
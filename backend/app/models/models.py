@@ -1,5 +1,6 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, Enum, ForeignKey, Boolean
-from sqlalchemy.orm import relationship
+from datetime import datetime, timezone
+from sqlalchemy import BigInteger, Column, Integer, String, Text, DateTime, Enum, ForeignKey, Boolean, LargeBinary, DDL, Index, UniqueConstraint, event
+from sqlalchemy.orm import relationship, deferred
 from sqlalchemy.sql import func
 from enum import Enum as PyEnum
 from ..core.database import Base
@@ -19,6 +20,17 @@ class TaskStatus(str, PyEnum):
     CANCELLED = "CANCELLED"
 
 
+class WebhookJobStatus(str, PyEnum):
+    PENDING = "PENDING"
+    PROCESSING = "PROCESSING"
+    DONE = "DONE"
+    FAILED = "FAILED"
+
+
+def utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
 class User(Base):
     __tablename__ = "users"
 
@@ -50,14 +62,23 @@ class Task(Base):
     ai_priority = Column(Enum(Priority), nullable=True)
     ai_reasoning = Column(Text, nullable=True)
 
-    # Campos de auditoria
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    # Embedding float32 para a busca semântica (carregado só pelo índice vetorial)
+    embedding = deferred(Column(LargeBinary, nullable=True))
+    embedding_model = Column(String, nullable=True)
+
+    # Campos de auditoria (created_at definido na aplicação para ter precisão de
+    # microssegundos também no SQLite; é a chave da paginação por cursor)
+    created_at = Column(DateTime(timezone=True), default=utcnow, server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     user_id = Column(String, ForeignKey("users.id"), nullable=False)
 
     # Relacionamento com usuário
     user = relationship("User", back_populates="tasks")
 
+    __table_args__ = (
+        Index("ix_tasks_user_id_created_at_id", "user_id", "created_at", "id"),
+    )
+
 
 class ChatMessage(Base):
     __tablename__ = "chat_messages"
@@ -67,8 +88,147 @@ class ChatMessage(Base):
     message = Column(Text, nullable=False)
     is_user = Column(Boolean, nullable=False)  # True = usuário, False = IA
     task_id = Column(String, ForeignKey("tasks.id"), nullable=True)  # Se criou uma tarefa
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(DateTime(timezone=True), default=utcnow, server_default=func.now())
 
     # Relacionamentos
     user = relationship("User", back_populates="chat_messages")
     task = relationship("Task")
+
+    __table_args__ = (
+        Index("ix_chat_messages_user_id_created_at_id", "user_id", "created_at", "id"),
+    )
+
+
+class UserTaskCounters(Base):
+    """
+    Contadores de tarefas por usuário, mantidos pelo TaskService na mesma
+    transação de cada escrita em tasks; uma coluna por status e por prioridade
+    (nome = valor do enum em minúsculas). `task_version` cresce a cada escrita
+    e identifica o estado das tarefas do usuário (cache de respostas do chat)
+    """
+    __tablename__ = "user_task_counters"
+
+    user_id = Column(String, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    total = Column(Integer, nullable=False, default=0, server_default="0")
+
+    pending = Column(Integer, nullable=False, default=0, server_default="0")
+    in_progress = Column(Integer, nullable=False, default=0, server_default="0")
+    completed = Column(Integer, nullable=False, default=0, server_default="0")
+    cancelled = Column(Integer, nullable=False, default=0, server_default="0")
+
+    low = Column(Integer, nullable=False, default=0, server_default="0")
+    medium = Column(Integer, nullable=False, default=0, server_default="0")
+    high = Column(Integer, nullable=False, default=0, server_default="0")
+    urgent = Column(Integer, nullable=False, default=0, server_default="0")
+
+    task_version = Column(BigInteger, nullable=False, default=0, server_default="0")
+    updated_at = Column(DateTime(timezone=True), default=utcnow, onupdate=utcnow)
+
+
+class WebhookJob(Base):
+    """
+    Fila (outbox) do webhook: a mensagem é gravada aqui e respondida com 202;
+    os workers de services.webhook_queue criam a tarefa depois
+    """
+    __tablename__ = "webhook_jobs"
+
+    id = Column(String, primary_key=True)
+    user_id = Column(String, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    payload = Column(Text, nullable=False)  # WebhookPayload em JSON
+    status = Column(Enum(WebhookJobStatus), nullable=False, default=WebhookJobStatus.PENDING)
+    attempts = Column(Integer, nullable=False, default=0)
+    next_attempt_at = Column(DateTime(timezone=True), nullable=False, default=utcnow)
+    locked_at = Column(DateTime(timezone=True), nullable=True)  # início do processamento atual
+    last_error = Column(Text, nullable=True)
+    # Definido no enfileiramento e gravado junto com a tarefa: reprocessar não duplica
+    task_id = Column(String, nullable=False)
+    # sha256 do Idempotency-Key ou de (from_user, timestamp, mensagem); reenvios do gateway reutilizam o job
+    idempotency_key = Column(String(64), nullable=True)
+    created_at = Column(DateTime(timezone=True), default=utcnow)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        Index("ix_webhook_jobs_status_next_attempt_at", "status", "next_attempt_at"),
+        UniqueConstraint("user_id", "idempotency_key", name="uq_webhook_jobs_user_id_idempotency_key"),
+    )
+
+
+class AIAnalysisCache(Base):
+    __tablename__ = "ai_analysis_cache"
+
+    key = Column(String(64), primary_key=True)  # sha256(modelo + mensagem normalizada)
+    model = Column(String, nullable=False)
+    result = Column(Text, nullable=False)  # AIAnalysisResult em JSON
+    expires_at = Column(DateTime, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+# Busca textual das tarefas, fora do mapeamento ORM: coluna tsvector gerada + GIN
+# no PostgreSQL, tabela FTS5 (conteúdo externo) sincronizada por triggers no SQLite.
+# Criada junto com a tabela tasks; em bancos existentes, pelas migrações 0003 e 0009.
+#
+# No SQLite a FTS5 é indexada por `tasks.fts_rowid`, não pelo rowid implícito:
+# tasks tem chave primária texto, e o VACUUM pode renumerar o rowid, o que
+# desalinharia o índice das linhas. O trigger de inserção atribui o próximo
+# número, que não muda mais.
+TASKS_FTS_TABLE = "tasks_fts"
+TASKS_FTS_ROWID = "fts_rowid"
+TASKS_FTS_COLUMNS = ("title", "description", "raw_message", "ai_title", "ai_summary")
+
+_FTS_COLUMNS = ", ".join(TASKS_FTS_COLUMNS)
+_FTS_NEW = ", ".join(f"new.{column}" for column in TASKS_FTS_COLUMNS)
+_FTS_OLD = ", ".join(f"old.{column}" for column in TASKS_FTS_COLUMNS)
+
+FULLTEXT_DDL = {
+    "postgresql": [
+        """
+        ALTER TABLE tasks ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS (
+            setweight(to_tsvector('portuguese', coalesce(title, '') || ' ' || coalesce(ai_title, '')), 'A') ||
+            setweight(to_tsvector('portuguese', coalesce(description, '') || ' ' || coalesce(ai_summary, '')), 'B') ||
+            setweight(to_tsvector('portuguese', coalesce(raw_message, '')), 'C')
+        ) STORED
+        """,
+        "CREATE INDEX IF NOT EXISTS ix_tasks_search_vector ON tasks USING gin (search_vector)",
+    ],
+    "sqlite": [
+        f"ALTER TABLE tasks ADD COLUMN {TASKS_FTS_ROWID} INTEGER",
+        f"CREATE UNIQUE INDEX IF NOT EXISTS ix_tasks_{TASKS_FTS_ROWID} ON tasks ({TASKS_FTS_ROWID})",
+        f"""
+        CREATE VIRTUAL TABLE IF NOT EXISTS {TASKS_FTS_TABLE} USING fts5(
+            {_FTS_COLUMNS}, content='tasks', content_rowid='{TASKS_FTS_ROWID}',
+            tokenize='unicode61 remove_diacritics 2'
+        )
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS tasks_fts_insert AFTER INSERT ON tasks BEGIN
+            UPDATE tasks SET {TASKS_FTS_ROWID} = (SELECT coalesce(max({TASKS_FTS_ROWID}), 0) + 1 FROM tasks)
+                WHERE rowid = new.rowid;
+            INSERT INTO {TASKS_FTS_TABLE}(rowid, {_FTS_COLUMNS})
+                SELECT {TASKS_FTS_ROWID}, {_FTS_COLUMNS} FROM tasks WHERE rowid = new.rowid;
+        END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS tasks_fts_delete AFTER DELETE ON tasks BEGIN
+            INSERT INTO {TASKS_FTS_TABLE}({TASKS_FTS_TABLE}, rowid, {_FTS_COLUMNS})
+                VALUES ('delete', old.{TASKS_FTS_ROWID}, {_FTS_OLD});
+        END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS tasks_fts_update AFTER UPDATE OF {_FTS_COLUMNS} ON tasks BEGIN
+            INSERT INTO {TASKS_FTS_TABLE}({TASKS_FTS_TABLE}, rowid, {_FTS_COLUMNS})
+                VALUES ('delete', old.{TASKS_FTS_ROWID}, {_FTS_OLD});
+            INSERT INTO {TASKS_FTS_TABLE}(rowid, {_FTS_COLUMNS}) VALUES (new.{TASKS_FTS_ROWID}, {_FTS_NEW});
+        END
+        """,
+    ],
+}
+
+for _dialect, _statements in FULLTEXT_DDL.items():
+    for _statement in _statements:
+        event.listen(Task.__table__, "after_create", DDL(_statement).execute_if(dialect=_dialect))
+
+# Os triggers caem junto com a tabela tasks; a tabela FTS5 precisa ser removida
+event.listen(
+    Task.__table__, "after_drop",
+    DDL(f"DROP TABLE IF EXISTS {TASKS_FTS_TABLE}").execute_if(dialect="sqlite")
+)
@@ -1,7 +1,8 @@
-from pydantic import BaseModel, Field
+from pydantic import AliasChoices, BaseModel, Field
 from typing import Optional, List
 from datetime import datetime
-from .models import Priority, TaskStatus
+from enum import Enum
+from .models import Priority, TaskStatus, WebhookJobStatus
 
 
 class UserBase(BaseModel):
@@ -70,20 +71,63 @@ class TaskResponse(TaskBase):
         from_attributes = True
 
 
+class TaskPage(BaseModel):
+    items: List[TaskResponse]
+    next_cursor: Optional[str] = None
+
+
 class TaskFilters(BaseModel):
     status: Optional[TaskStatus] = None
     priority: Optional[Priority] = None
     search: Optional[str] = None
     limit: int = Field(50, ge=1, le=100)
-    offset: int = Field(0, ge=0)
+    cursor: Optional[str] = None
 
 
 class WebhookPayload(BaseModel):
     message: str
-    from_user: Optional[str] = None
+    # O gateway envia "from"
+    from_user: Optional[str] = Field(None, validation_alias=AliasChoices("from_user", "from"))
     timestamp: Optional[str] = None
 
 
+class WebhookJobResponse(BaseModel):
+    id: str
+    status: WebhookJobStatus
+    attempts: int
+    task_id: Optional[str] = None  # preenchido quando DONE
+    last_error: Optional[str] = None
+    next_attempt_at: Optional[datetime] = None
+    created_at: datetime
+    finished_at: Optional[datetime] = None
+
+
+class WebhookBatchItemStatus(str, Enum):
+    CREATED = "created"
+    IGNORED = "ignored"  # pergunta ou conversa: não vira tarefa
+    DUPLICATE = "duplicate"  # reenvio de uma mensagem já recebida
+    FAILED = "failed"
+
+
+class WebhookBatchItemResult(BaseModel):
+    index: int  # posição no array recebido
+    status: WebhookBatchItemStatus
+    job_id: Optional[str] = None  # registro de idempotência, quando a mensagem tem chave
+    task_id: Optional[str] = None
+    title: Optional[str] = None
+    ai_priority: Optional[Priority] = None
+    ai_reasoning: Optional[str] = None
+    error: Optional[str] = None
+
+
+class WebhookBatchResponse(BaseModel):
+    created: int
+    ignored: int
+    duplicates: int
+    failed: int
+    results: List[WebhookBatchItemResult]
+
+
 class AIAnalysisResult(BaseModel):
     title: str
     summary: str
@@ -92,6 +136,11 @@ class AIAnalysisResult(BaseModel):
     confidence: float = Field(..., ge=0.0, le=1.0)
 
 
+class SearchMode(str, Enum):
+    LEXICAL = "lexical"
+    SEMANTIC = "semantic"
+
+
 class SearchResult(BaseModel):
     task: TaskResponse
     similarity: float
@@ -1,6 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from ..models.schemas import AIAnalysisResult
+from typing import List
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..core.dependencies import get_async_db, get_current_user
+from ..models.models import User
+from ..models.schemas import AIAnalysisResult, SearchMode, SearchResult, TaskResponse
 from ..services.ai_service import ai_service
+from ..services.task_service import TaskService
 
 router = APIRouter(prefix="/ai", tags=["ai"])
 
@@ -20,21 +25,30 @@ async def analyze_message(message: str) -> AIAnalysisResult:
         )
 
 
-@router.post("/search")
-async def semantic_search(query: str, limit: int = 5):
+@router.post("/search", response_model=List[SearchResult])
+async def semantic_search(
+    query: str,
+    limit: int = Query(5, ge=1, le=20),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
     """
-    Busca semântica em tarefas usando embeddings
+    Busca semântica nas tarefas do usuário usando embeddings
     """
     try:
-        # Esta rota seria usada para buscar tarefas similares
-        # sem precisar de autenticação específica
-        return {
-            "query": query,
-            "limit": limit,
-            "message": "Busca semântica implementada no endpoint /tasks/search/similar"
-        }
+        results = await TaskService.search_similar_tasks(
+            db, query, current_user.id, limit, SearchMode.SEMANTIC
+        )
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Erro na busca semântica: {str(e)}"
         )
+
+    return [
+        SearchResult(
+            task=TaskResponse.model_validate(result["task"]),
+            similarity=result["similarity"]
+        )
+        for result in results
+    ]
@@ -1,23 +1,23 @@
 from datetime import timedelta
 from fastapi import APIRouter, Depends, HTTPException, status, Request
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from slowapi import Limiter
 from slowapi.util import get_remote_address
-from ..core.dependencies import get_db, get_current_user
+from ..core.dependencies import get_async_db, get_current_user
 from ..models.schemas import UserCreate, UserResponse, UserLogin, Token
 from ..models.models import User
 from ..services.auth_service import AuthService
 from ..core.config import settings
 
 router = APIRouter(prefix="/auth", tags=["authentication"])
-limiter = Limiter(key_func=get_remote_address)
+limiter = Limiter(key_func=get_remote_address, enabled=settings.rate_limit_enabled)
 
 
 @router.post("/register", response_model=UserResponse)
-def register(user_data: UserCreate, db: Session = Depends(get_db)):
+async def register(user_data: UserCreate, db: AsyncSession = Depends(get_async_db)):
     try:
-        user = AuthService.create_user(db, user_data)
+        user = await AuthService.create_user(db, user_data)
         return user
     except ValueError as e:
         raise HTTPException(
@@ -28,14 +28,14 @@ def register(user_data: UserCreate, db: Session = Depends(get_db)):
 
 @router.post("/login", response_model=Token)
 @limiter.limit("5/minute")
-def login(
+async def login(
     request: Request,
     form_data: OAuth2PasswordRequestForm = Depends(),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     login_data = UserLogin(email=form_data.username, password=form_data.password)
 
-    user = AuthService.authenticate_user(db, login_data)
+    user = await AuthService.authenticate_user(db, login_data)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -44,11 +44,11 @@ def login(
         )
 
     access_token_expires = timedelta(minutes=settings.access_token_expire_minutes)
-    access_token = AuthService.create_access_token(user.email)
+    access_token = AuthService.create_access_token(user.email, user.id)
 
     return Token(access_token=access_token, token_type="bearer")
 
 
 @router.get("/me", response_model=UserResponse)
-def get_current_user_profile(current_user = Depends(get_current_user)):
+async def get_current_user_profile(current_user = Depends(get_current_user)):
     return current_user
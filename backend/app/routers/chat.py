@@ -1,17 +1,32 @@
-from fastapi import APIRouter, Depends, Request
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from slowapi import Limiter
 from slowapi.util import get_remote_address
-from ..core.dependencies import get_db, get_current_user
-from ..models.models import User, Task, ChatMessage as ChatMessageModel
+from ..core.config import settings
+from ..core.dependencies import get_async_db, get_current_user
+from ..core.group_commit import group_commit_enabled, group_committer
+from ..core.llm import llm_client
+from ..core.llm_resilience import llm_guards
+from ..core.metrics import chat_classifications
+from ..models.models import User, Task, ChatMessage as ChatMessageModel, utcnow
 from ..services.ai_service import ai_service
+from ..services.answer_cache import answer_cache
+from ..services.answer_context import answer_context_builder
+from ..services import message_classifier, task_counters
 from ..services.task_service import TaskService
+from ..utils.pagination import (
+    InvalidCursorError, after_keyset, cursor_created_at, decode_cursor, encode_cursor, keyset_created_at
+)
 from pydantic import BaseModel, Field
+from typing import Any, AsyncIterator
+import json
 import uuid
 from datetime import datetime
 
 router = APIRouter(prefix="/chat", tags=["chat"])
-limiter = Limiter(key_func=get_remote_address)
+limiter = Limiter(key_func=get_remote_address, enabled=settings.rate_limit_enabled)
 
 
 class ChatMessage(BaseModel):
@@ -32,26 +47,57 @@ class ChatHistoryResponse(BaseModel):
     created_at: datetime
 
 
-@router.get("/history", response_model=list[ChatHistoryResponse])
+class ChatHistoryPage(BaseModel):
+    items: list[ChatHistoryResponse]  # ordem cronológica
+    next_cursor: str | None = None  # página de mensagens mais antigas
+
+
+@router.get("/history", response_model=ChatHistoryPage)
 async def get_chat_history(
-    limit: int = 50,
+    limit: int = Query(50, ge=1, le=200),
+    cursor: str | None = None,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    messages = db.query(ChatMessageModel).filter(
-        ChatMessageModel.user_id == current_user.id
-    ).order_by(ChatMessageModel.created_at.desc()).limit(limit).all()
-    
-    return [
-        ChatHistoryResponse(
-            id=msg.id,
-            message=msg.message,
-            is_user=msg.is_user,
-            task_id=msg.task_id,
-            created_at=msg.created_at
-        )
-        for msg in reversed(messages)
-    ]
+    dialect = db.get_bind().dialect.name
+    query = select(
+        ChatMessageModel,
+        keyset_created_at(ChatMessageModel.created_at, dialect).label("cursor_created_at")
+    ).where(ChatMessageModel.user_id == current_user.id)
+
+    if cursor:
+        try:
+            created_at, last_id = decode_cursor(cursor, 2)
+        except InvalidCursorError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+        created_at = cursor_created_at(created_at, dialect)
+        query = query.where(after_keyset(ChatMessageModel.created_at, ChatMessageModel.id, created_at, last_id))
+
+    # Mais recentes primeiro; um item a mais indica se há mensagens anteriores
+    result = await db.execute(
+        query.order_by(ChatMessageModel.created_at.desc(), ChatMessageModel.id.desc()).limit(limit + 1)
+    )
+    rows = result.all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].cursor_created_at, rows[-1][0].id)
+    messages = [row[0] for row in rows]
+
+    return ChatHistoryPage(
+        items=[
+            ChatHistoryResponse(
+                id=msg.id,
+                message=msg.message,
+                is_user=msg.is_user,
+                task_id=msg.task_id,
+                created_at=msg.created_at
+            )
+            for msg in reversed(messages)
+        ],
+        next_cursor=next_cursor
+    )
 
 
 @router.post("/message", response_model=ChatResponse)
@@ -60,35 +106,152 @@ async def send_message(
     request: Request,
     data: ChatMessage,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     message = data.message.strip()
+    user_message = new_chat_message(current_user.id, message, is_user=True)
+    
+    result, task, embedding = await process_chat_message(message, current_user, db)
+    await save_turn(db, user_message, result, task, embedding)
     
-    user_message = ChatMessageModel(
+    return result
+
+
+@router.post("/message/stream")
+@limiter.limit("30/minute")
+async def send_message_stream(
+    request: Request,
+    data: ChatMessage,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Variante de /chat/message com Server-Sent Events
+
+    Eventos: `task` (card da tarefa criada), `token` (trecho da resposta),
+    `done` (fim do turno) e `error`.
+    """
+    message = data.message.strip()
+    user_message = new_chat_message(current_user.id, message, is_user=True)
+    
+    return StreamingResponse(
+        stream_chat_message(message, user_message, current_user, db),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+def format_sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+def new_chat_message(user_id: str, message: str, is_user: bool, task_id: str | None = None) -> ChatMessageModel:
+    # created_at definido aqui: a pergunta fica antes da resposta mesmo gravadas na mesma transação
+    return ChatMessageModel(
         id=str(uuid.uuid4()),
-        user_id=current_user.id,
+        user_id=user_id,
         message=message,
-        is_user=True
+        is_user=is_user,
+        task_id=task_id,
+        created_at=utcnow()
     )
-    db.add(user_message)
-    db.commit()
+
+
+async def save_turn(
+    db: AsyncSession,
+    user_message: ChatMessageModel,
+    result: ChatResponse,
+    task: Task | None = None,
+    embedding=None
+) -> ChatMessageModel:
+    """
+    Grava o turno (mensagem do usuário, tarefa criada e resposta da IA) numa
+    única transação; com group commit (padrão no SQLite), no commit em grupo
+    com os turnos concorrentes. Retorna a mensagem da IA
+    """
+    ai_message = new_chat_message(user_message.user_id, result.content, is_user=False, task_id=task.id if task else None)
+
+    async def write(session: AsyncSession) -> None:
+        session.add(user_message)
+        if task is not None:
+            await TaskService.add_task(session, task)
+        session.add(ai_message)
+        await session.flush()
+
+    if group_commit_enabled():
+        await group_committer.submit(write)
+    else:
+        await write(db)
+        await db.commit()
+
+    if task is not None:
+        TaskService.index_task(task, embedding)
+    return ai_message
+
+
+async def stream_chat_message(
+    message: str,
+    user_message: ChatMessageModel,
+    user: User,
+    db: AsyncSession
+) -> AsyncIterator[str]:
+    """Gera os eventos SSE de um turno; o turno inteiro é gravado ao final do stream"""
+    is_question = await classify_message_type(message)
+    task = embedding = None
+    
+    if is_question:
+        counters = await task_counters.get_counters(db, user.id)
+        cache_key = answer_cache.key_for(user.id, counters["version"], message)
+        chunks = []
+        cached = await answer_cache.get(cache_key)
+        
+        if cached is not None:
+            chunks.append(cached)
+            yield format_sse("token", {"content": cached})
+        else:
+            messages, stats = await build_answer_context(message, user, db, counters)
+            
+            if llm_client.available:
+                try:
+                    async for token in llm_guards["answer_stream"].stream(lambda: llm_client.stream_chat_completion(
+                        messages=messages,
+                        temperature=0.8,
+                        max_tokens=800,
+                        timeout=settings.openai_answer_timeout_seconds,
+                        operation="answer_stream"
+                    )):
+                        chunks.append(token)
+                        yield format_sse("token", {"content": token})
+                    await answer_cache.set(cache_key, "".join(chunks).strip())
+                except Exception as e:
+                    print(f"Erro ao usar OpenAI: {e}")
+                    if chunks:
+                        yield format_sse("error", {"detail": "Resposta interrompida"})
+        
+        if not chunks:
+            chunks.append(fallback_answer(stats))
+            yield format_sse("token", {"content": chunks[0]})
+        
+        result = ChatResponse(type="answer", content="".join(chunks).strip(), task=None)
+    else:
+        result, task, embedding = await create_task_from_message(message, user)
     
-    result = await process_chat_message(message, current_user, db)
+    # Gravado antes do card: a tarefa exibida já existe no banco
+    ai_message = await save_turn(db, user_message, result, task, embedding)
     
-    ai_message = ChatMessageModel(
-        id=str(uuid.uuid4()),
-        user_id=current_user.id,
-        message=result.content,
-        is_user=False,
-        task_id=result.task.get('id') if result.task else None
-    )
-    db.add(ai_message)
-    db.commit()
+    if task is not None:
+        yield format_sse("task", result.task)
+        yield format_sse("token", {"content": result.content})
     
-    return result
+    yield format_sse("done", {"type": result.type, "message_id": ai_message.id})
 
 
-async def process_chat_message(message: str, user: User, db: Session) -> ChatResponse:
+async def process_chat_message(
+    message: str,
+    user: User,
+    db: AsyncSession
+) -> tuple[ChatResponse, Task | None, Any]:
+    """Resposta do turno e, se a mensagem virou tarefa, a tarefa ainda não gravada e seu embedding"""
     is_question = await classify_message_type(message)
     
     if is_question:
@@ -97,32 +260,37 @@ async def process_chat_message(message: str, user: User, db: Session) -> ChatRes
             type="answer",
             content=answer,
             task=None
-        )
+        ), None, None
     else:
-        from ..models.schemas import TaskCreate
-        
-        analysis = await ai_service.analyze_task(message)
-        
-        task_data = TaskCreate(
-            title=analysis.title,
-            description=analysis.summary,
-            priority=analysis.suggested_priority,
-            status="PENDING",
-            raw_message=message
-        )
-        
-        task = await TaskService.create_task(db, user.id, task_data)
-        
-        priority_map = {
-            "LOW": {"emoji": "🟢", "text": "Baixa"},
-            "MEDIUM": {"emoji": "🟡", "text": "Média"},
-            "HIGH": {"emoji": "🟠", "text": "Alta"},
-            "URGENT": {"emoji": "🔴", "text": "Urgente"}
-        }
-        
-        priority_info = priority_map.get(analysis.suggested_priority, {"emoji": "⚪", "text": "Média"})
-        
-        response_text = f"""✅ **Tarefa criada com sucesso!**
+        return await create_task_from_message(message, user)
+
+
+async def create_task_from_message(message: str, user: User) -> tuple[ChatResponse, Task, Any]:
+    from ..models.schemas import TaskCreate
+    
+    analysis = await ai_service.analyze_task(message)
+    
+    task_data = TaskCreate(
+        title=analysis.title,
+        description=analysis.summary,
+        priority=analysis.suggested_priority,
+        status="PENDING",
+        raw_message=message
+    )
+    
+    # Gravada por save_turn, junto com as mensagens do turno
+    task, embedding = await TaskService.prepare_task(user.id, task_data, ai_analysis=analysis)
+    
+    priority_map = {
+        "LOW": {"emoji": "🟢", "text": "Baixa"},
+        "MEDIUM": {"emoji": "🟡", "text": "Média"},
+        "HIGH": {"emoji": "🟠", "text": "Alta"},
+        "URGENT": {"emoji": "🔴", "text": "Urgente"}
+    }
+    
+    priority_info = priority_map.get(analysis.suggested_priority, {"emoji": "⚪", "text": "Média"})
+    
+    response_text = f"""✅ **Tarefa criada com sucesso!**
 
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 
@@ -147,115 +315,46 @@ async def process_chat_message(message: str, user: User, db: Session) -> ChatRes
 • Use este assistente sempre que precisar!
 
 Estou aqui para otimizar seu tempo! 💪"""
-        
-        return ChatResponse(
-            type="task_created",
-            content=response_text,
-            task={
-                "id": task.id,
-                "title": task.title,
-                "description": task.description,
-                "priority": task.priority,
-                "status": task.status
-            }
-        )
-
-
-async def classify_message_type(message: str) -> bool:
-    message_lower = message.lower().strip()
-    
-    conversation_patterns = [
-        'oi', 'olá', 'ola', 'hey', 'e aí', 'eai', 'tudo bem', 'tudo bom',
-        'bom dia', 'boa tarde', 'boa noite', 'obrigad', 'valeu', 'vlw',
-        'legal', 'show', 'massa', 'top', 'maneiro', 'dahora',
-        'vsf', 'pqp', 'cacete', 'caramba', 'nossa', 'mds', 'ai ai',
-        'help', 'ajuda', 'socorro', 'perdid', 'confus',
-        'como funciona', 'o que você faz', 'quem é você', 'como usar'
-    ]
-    
-    for pattern in conversation_patterns:
-        if pattern in message_lower:
-            return True
-    
-    question_words = ['qual', 'quais', 'como', 'quando', 'onde', 'por que', 'porque', 
-                      'quanto', 'quantos', 'quantas', 'o que', 'há', 'existe', 'tem',
-                      'posso', 'pode', 'consegue', 'me mostra', 'me diz', 'me conta',
-                      'vê', 'veja', 'mostra', 'lista']
-    
-    if '?' in message:
-        return True
-    
-    for word in question_words:
-        if message_lower.startswith(word) or f' {word} ' in message_lower:
-            return True
-    
-    if len(message_lower) < 15 and not any(word in message_lower for word in ['preciso', 'fazer', 'criar', 'comprar', 'enviar', 'revisar']):
-        return True
-    
-    action_words = ['preciso', 'devo', 'tenho que', 'precisa', 'fazer', 'criar', 
-                    'organizar', 'preparar', 'revisar', 'enviar', 'comprar', 
-                    'agendar', 'marcar', 'ligar', 'falar com']
-    
-    for word in action_words:
-        if word in message_lower:
-            return False
     
-    return True
+    return ChatResponse(
+        type="task_created",
+        content=response_text,
+        task={
+            "id": task.id,
+            "title": task.title,
+            "description": task.description,
+            "priority": task.priority,
+            "status": task.status
+        }
+    ), task, embedding
 
 
-async def answer_question(message: str, user: User, db: Session) -> str:
-    from ..models.schemas import TaskFilters
-    from ..core.config import settings
-    
-    all_tasks = TaskService.get_tasks(
-        db,
-        user.id,
-        TaskFilters(limit=100, offset=0)
-    )
-    
-    priority_translation = {
-        "LOW": "Baixa",
-        "MEDIUM": "Média",
-        "HIGH": "Alta",
-        "URGENT": "Urgente"
-    }
-    
-    status_translation = {
-        "PENDING": "Pendente",
-        "IN_PROGRESS": "Em progresso",
-        "COMPLETED": "Concluída"
-    }
-    
-    tasks_context = []
-    for task in all_tasks:
-        priority_emoji = {
-            "LOW": "🟢",
-            "MEDIUM": "🟡", 
-            "HIGH": "🟠",
-            "URGENT": "🔴"
-        }.get(task.priority, "⚪")
-        
-        priority_pt = priority_translation.get(task.priority, task.priority)
-        status_pt = status_translation.get(task.status, task.status)
-        
-        tasks_context.append(f"{priority_emoji} {task.title} - {task.description or 'Sem descrição'} (Status: {status_pt}, Prioridade: {priority_pt})")
+async def classify_message_type(message: str) -> bool:
+    is_question = message_classifier.is_question(message)
+    chat_classifications.inc("question" if is_question else "task")
+    return is_question
+
+
+async def build_answer_context(
+    message: str,
+    user: User,
+    db: AsyncSession,
+    counters: dict
+) -> tuple[list[dict], dict]:
+    """
+    Monta as mensagens do prompt de resposta e as estatísticas usadas no
+    fallback; `counters` são os contadores de todas as tarefas do usuário
+    """
+    # Só as tarefas mais relevantes para a pergunta, dentro do orçamento de tokens
+    context = await answer_context_builder.build(db, user.id, message)
+    tasks_summary = context.summary or "Nenhuma tarefa cadastrada."
     
-    tasks_summary = "\n".join(tasks_context) if tasks_context else "Nenhuma tarefa cadastrada."
+    stats = {key: counters[key] for key in ("total", "pending", "in_progress", "completed", "urgent")}
     
-    stats = {
-        "total": len(all_tasks),
-        "pending": len([t for t in all_tasks if t.status == "PENDING"]),
-        "in_progress": len([t for t in all_tasks if t.status == "IN_PROGRESS"]),
-        "completed": len([t for t in all_tasks if t.status == "COMPLETED"]),
-        "urgent": len([t for t in all_tasks if t.priority == "URGENT"]),
-    }
+    # Libera a conexão antes da chamada ao LLM, que pode levar segundos
+    await db.close()
     
-    if settings.openai_api_key:
-        try:
-            from openai import OpenAI
-            client = OpenAI(api_key=settings.openai_api_key)
-            
-            system_prompt = f"""Você é um assistente inteligente de produtividade chamado Leggal.
+    system_prompt = f"""Você é um assistente inteligente de produtividade chamado Leggal.
 
 SUA MISSÃO: Otimizar o tempo do usuário ajudando-o a gerenciar tarefas de forma eficiente.
 
@@ -277,7 +376,7 @@ Em progresso: {stats['in_progress']}
 Concluídas: {stats['completed']}
 Urgentes: {stats['urgent']}
 
-TAREFAS DO USUÁRIO:
+TAREFAS DO USUÁRIO (as {context.included} mais relevantes para a mensagem, de {stats['total']}):
 {tasks_summary}
 
 COMO REAGIR A DIFERENTES SITUAÇÕES:
@@ -299,24 +398,48 @@ REGRAS:
 - Adapte o tom à situação (formal, casual, empático)
 - Use separadores (━━━) para organizar informações quando necessário"""
 
-            response = client.chat.completions.create(
-                model=settings.openai_model_name,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": message}
-                ],
+    answer_context_builder.record_prompt(system_prompt)
+    messages = [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": message}
+    ]
+    return messages, stats
+
+
+async def answer_question(message: str, user: User, db: AsyncSession) -> str:
+    # A versão muda a cada escrita em tarefas: uma resposta em cache nunca é de um estado anterior
+    counters = await task_counters.get_counters(db, user.id)
+    cache_key = answer_cache.key_for(user.id, counters["version"], message)
+    cached = await answer_cache.get(cache_key)
+    if cached is not None:
+        await db.close()
+        return cached
+
+    messages, stats = await build_answer_context(message, user, db, counters)
+
+    if llm_client.available:
+        try:
+            answer = await llm_guards["answer"].call(lambda: llm_client.chat_completion(
+                messages=messages,
                 temperature=0.8,
-                max_tokens=800
-            )
-            
-            return response.choices[0].message.content.strip()
+                max_tokens=800,
+                timeout=settings.openai_answer_timeout_seconds,
+                operation="answer"
+            ))
+            # O fallback não entra no cache: a próxima pergunta tenta o LLM de novo
+            await answer_cache.set(cache_key, answer)
+            return answer
             
         except Exception as e:
             print(f"Erro ao usar OpenAI: {e}")
             # Fallback para resposta simples
             pass
     
-    # Fallback se OpenAI não estiver disponível
+    return fallback_answer(stats)
+
+
+def fallback_answer(stats: dict) -> str:
+    """Resposta usada quando a OpenAI não está disponível"""
     return f"""Olá! 👋 Sou seu assistente de produtividade.
 
 📊 Status atual:
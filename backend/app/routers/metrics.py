@@ -0,0 +1,136 @@
+from fastapi import APIRouter, Response
+
+from ..core.database import async_engine
+from ..core.group_commit import group_committer
+from ..core.llm_resilience import CLOSED, HALF_OPEN, OPEN, llm_guards
+from ..core.metrics import CONTENT_TYPE, metrics
+from ..core.password_hasher import password_hasher
+from ..services.ai_service import ai_service
+from ..services.analysis_cache import analysis_cache
+from ..services.answer_cache import answer_cache
+from ..services.answer_context import answer_context_builder
+from ..services.principal_cache import principal_cache
+from ..services.webhook_idempotency import webhook_idempotency
+from ..services.webhook_queue import webhook_queue
+
+router = APIRouter(tags=["metrics"])
+
+CIRCUIT_STATES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+@router.get("/metrics", include_in_schema=False)
+async def get_metrics():
+    """Métricas no formato texto do Prometheus"""
+    return Response(content=metrics.render(), media_type=CONTENT_TYPE)
+
+
+@metrics.collector
+def cache_metrics():
+    # (acertos, faltas, entradas) de cada cache em memória
+    answer = answer_cache.exact.stats()
+    caches = {
+        "analysis": analysis_cache.memory.stats(),
+        "answer": {
+            **answer,
+            # Faltas no nível exato atendidas pelo nível por similaridade contam como acerto
+            "hits": answer["hits"] + answer_cache.similar_hits,
+            "misses": answer["misses"] - answer_cache.similar_hits
+        },
+        "principal": principal_cache.entries.stats(),
+        "webhook_idempotency": webhook_idempotency.finished.stats(),
+    }
+    yield "leggal_cache_hits_total", "counter", "Acertos por cache", [
+        ({"cache": name}, stats["hits"]) for name, stats in caches.items()
+    ]
+    yield "leggal_cache_misses_total", "counter", "Faltas por cache", [
+        ({"cache": name}, stats["misses"]) for name, stats in caches.items()
+    ]
+    yield "leggal_cache_hit_ratio", "gauge", "Fração de acertos desde o início do processo", [
+        ({"cache": name}, stats["hits"] / (stats["hits"] + stats["misses"]) if stats["hits"] + stats["misses"] else 0.0)
+        for name, stats in caches.items()
+    ]
+    yield "leggal_cache_entries", "gauge", "Entradas por cache", [
+        ({"cache": name}, stats["size"]) for name, stats in caches.items()
+    ]
+    yield "leggal_answer_cache_similar_hits_total", "counter", "Respostas reaproveitadas por similaridade", [
+        ({}, answer_cache.similar_hits)
+    ]
+
+
+@metrics.collector
+def llm_metrics():
+    stats = {name: guard.stats() for name, guard in llm_guards.items()}
+    yield "leggal_llm_circuit_state", "gauge", "Circuito por operação (0 fechado, 1 em teste, 2 aberto)", [
+        ({"operation": name}, CIRCUIT_STATES[guard["state"]]) for name, guard in stats.items()
+    ]
+    yield "leggal_llm_calls_total", "counter", "Chamadas ao LLM por operação e resultado", [
+        ({"operation": name, "result": result}, guard[result])
+        for name, guard in stats.items()
+        for result in ("succeeded", "failed", "timed_out", "short_circuited")
+    ]
+    yield "leggal_llm_slow_total", "counter", "Respostas acima do SLO de latência", [
+        ({"operation": name}, guard["slow"]) for name, guard in stats.items()
+    ]
+    yield "leggal_llm_hedges_total", "counter", "Requisições de hedging disparadas", [
+        ({"operation": name}, guard["hedges"]) for name, guard in stats.items()
+    ]
+
+    context = answer_context_builder.stats()
+    yield "leggal_answer_context_builds_total", "counter", "Contextos de resposta montados", [
+        ({}, context["builds"])
+    ]
+    yield "leggal_answer_context_avg_build_seconds", "gauge", "Tempo médio de montagem do contexto", [
+        ({}, context["avg_build_ms"] / 1000)
+    ]
+    yield "leggal_answer_context_avg_prompt_tokens", "gauge", "Tamanho médio do prompt de resposta (tokens)", [
+        ({}, context["avg_prompt_tokens"])
+    ]
+    yield "leggal_answer_context_max_prompt_tokens", "gauge", "Maior prompt de resposta (tokens)", [
+        ({}, context["max_prompt_tokens"])
+    ]
+
+    ai = ai_service.stats()
+    yield "leggal_ai_analysis_in_flight", "gauge", "Análises em andamento (chaves distintas)", [
+        ({}, ai["singleflight"]["in_flight"])
+    ]
+    yield "leggal_ai_analysis_coalesced_total", "counter", "Análises atendidas por uma chamada já em andamento", [
+        ({}, ai["singleflight"]["coalesced"])
+    ]
+    yield "leggal_ai_analysis_batches_total", "counter", "Lotes de análises enviados ao LLM", [
+        ({}, ai["batching"]["batches"])
+    ]
+    yield "leggal_ai_analysis_batch_items_total", "counter", "Análises enviadas em lotes", [
+        ({}, ai["batching"]["items"])
+    ]
+    yield "leggal_ai_analysis_batch_fallbacks_total", "counter", "Itens de lote refeitos individualmente", [
+        ({}, ai["batching"]["fallbacks"])
+    ]
+
+
+@metrics.collector
+def worker_metrics():
+    pool = async_engine.sync_engine.pool
+    # Só os pools com fila têm tamanho e overflow (o SQLite usa NullPool)
+    if hasattr(pool, "size") and hasattr(pool, "overflow"):
+        yield "leggal_db_pool_size", "gauge", "Tamanho do pool do banco", [({}, pool.size())]
+        yield "leggal_db_pool_overflow", "gauge", "Conexões além do tamanho do pool", [({}, max(0, pool.overflow()))]
+
+    queue = webhook_queue.stats()
+    yield "leggal_webhook_workers", "gauge", "Workers da fila do webhook", [({}, queue["workers"])]
+    yield "leggal_webhook_jobs_total", "counter", "Jobs do webhook por resultado", [
+        ({"result": result}, queue[result]) for result in ("processed", "retried", "failed")
+    ]
+    yield "leggal_webhook_replays_total", "counter", "Reenvios do webhook respondidos sem reprocessar", [
+        ({}, webhook_idempotency.replays)
+    ]
+
+    hasher = password_hasher.stats()
+    yield "leggal_password_hash_pending", "gauge", "Hashes de senha em execução ou na fila", [({}, hasher["pending"])]
+    yield "leggal_password_hash_queued", "gauge", "Hashes de senha aguardando um worker", [({}, hasher["queued"])]
+    yield "leggal_password_hash_total", "counter", "Hashes de senha por resultado", [
+        ({"result": result}, hasher[result]) for result in ("completed", "rejected")
+    ]
+
+    commits = group_committer.stats()
+    yield "leggal_group_commit_commits_total", "counter", "Commits do group commit", [({}, commits["commits"])]
+    yield "leggal_group_commit_units_total", "counter", "Turnos gravados pelo group commit", [({}, commits["units"])]
@@ -1,12 +1,13 @@
 from typing import List
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
-from ..core.dependencies import get_db, get_current_user
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..core.dependencies import get_async_db, get_current_user
 from ..models.models import User
 from ..models.schemas import (
-    TaskCreate, TaskUpdate, TaskResponse, TaskFilters, TaskStats, SearchResult
+    TaskCreate, TaskUpdate, TaskResponse, TaskFilters, TaskPage, TaskStats, SearchResult, SearchMode
 )
 from ..services.task_service import TaskService
+from ..utils.pagination import InvalidCursorError
 
 router = APIRouter(prefix="/tasks", tags=["tasks"])
 
@@ -15,7 +16,7 @@ router = APIRouter(prefix="/tasks", tags=["tasks"])
 async def create_task(
     task_data: TaskCreate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     try:
         task = await TaskService.create_task(db, current_user.id, task_data)
@@ -27,35 +28,45 @@ async def create_task(
         )
 
 
-@router.get("/", response_model=List[TaskResponse])
+@router.get("/", response_model=TaskPage)
 async def list_tasks(
-    status: str = Query(None),
+    status_filter: str = Query(None, alias="status"),
     priority: str = Query(None),
     search: str = Query(None),
     limit: int = Query(50, ge=1, le=100),
-    offset: int = Query(0, ge=0),
+    cursor: str = Query(None),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     filters = TaskFilters(
-        status=status,
+        status=status_filter,
         priority=priority,
         search=search,
         limit=limit,
-        offset=offset
+        cursor=cursor
     )
 
-    tasks = TaskService.get_tasks(db, current_user.id, filters)
-    return [TaskResponse.model_validate(task) for task in tasks]
+    try:
+        tasks, next_cursor = await TaskService.get_tasks(db, current_user.id, filters)
+    except InvalidCursorError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+    return TaskPage(
+        items=[TaskResponse.model_validate(task) for task in tasks],
+        next_cursor=next_cursor
+    )
 
 
 @router.get("/{task_id}", response_model=TaskResponse)
-def get_task(
+async def get_task(
     task_id: str,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    task = TaskService.get_task_by_id(db, task_id, current_user.id)
+    task = await TaskService.get_task_by_id(db, task_id, current_user.id)
 
     if not task:
         raise HTTPException(
@@ -67,13 +78,13 @@ def get_task(
 
 
 @router.put("/{task_id}", response_model=TaskResponse)
-def update_task(
+async def update_task(
     task_id: str,
     task_data: TaskUpdate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    task = TaskService.update_task(db, task_id, current_user.id, task_data)
+    task = await TaskService.update_task(db, task_id, current_user.id, task_data)
 
     if not task:
         raise HTTPException(
@@ -85,12 +96,12 @@ def update_task(
 
 
 @router.delete("/{task_id}")
-def delete_task(
+async def delete_task(
     task_id: str,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    deleted = TaskService.delete_task(db, task_id, current_user.id)
+    deleted = await TaskService.delete_task(db, task_id, current_user.id)
 
     if not deleted:
         raise HTTPException(
@@ -102,22 +113,23 @@ def delete_task(
 
 
 @router.get("/stats/overview", response_model=TaskStats)
-def get_task_stats(
+async def get_task_stats(
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    return TaskService.get_task_stats(db, current_user.id)
+    return await TaskService.get_task_stats(db, current_user.id)
 
 
 @router.get("/search/similar", response_model=List[SearchResult])
 async def search_similar_tasks(
     query: str = Query(...),
     limit: int = Query(5, ge=1, le=20),
+    mode: SearchMode = Query(SearchMode.LEXICAL),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     similar_tasks = await TaskService.search_similar_tasks(
-        db, query, current_user.id, limit
+        db, query, current_user.id, limit, mode
     )
 
     return [
@@ -1,59 +1,102 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Header
-from sqlalchemy.orm import Session
-from typing import Dict, Any
-from ..core.dependencies import get_db, get_current_user_optional
-from ..models.models import User
-from ..models.schemas import WebhookPayload
+from fastapi import APIRouter, Body, Depends, HTTPException, Response, status, Header
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Dict, Any, List, Optional
+from ..core.config import settings
+from ..core.dependencies import get_async_db
+from ..models.models import User, WebhookJob, WebhookJobStatus
+from ..models.schemas import WebhookPayload, WebhookBatchResponse, WebhookJobResponse
+from ..services.webhook_queue import webhook_queue
 from ..services.webhook_service import WebhookService
 
 router = APIRouter(prefix="/webhook", tags=["webhook"])
 
 
-@router.post("/message")
+@router.post("/message", status_code=status.HTTP_202_ACCEPTED, response_model=WebhookJobResponse)
 async def receive_webhook_message(
     payload: WebhookPayload,
+    response: Response,
     x_user_id: str = Header(..., description="ID do usuário que receberá a tarefa"),
-    db: Session = Depends(get_db)
+    idempotency_key: Optional[str] = Header(None, description="Identifica a entrega; reenvios devolvem o mesmo job"),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
-    Recebe mensagem via webhook e cria tarefa automaticamente
+    Recebe mensagem via webhook e enfileira a criação da tarefa
 
-    Esta rota simula o recebimento de mensagens do WhatsApp
+    Esta rota simula o recebimento de mensagens do WhatsApp. Responde 202 assim
+    que a mensagem é gravada na fila; o andamento fica em GET /webhook/jobs/{id}.
+    Um reenvio (mesmo Idempotency-Key ou mesmos from/timestamp/mensagem)
+    devolve o job original com o header Idempotent-Replayed: true
     """
     try:
         # Validar payload
         webhook_payload = WebhookService.validate_webhook_payload(payload.model_dump())
 
-        # Processar mensagem e criar tarefa
-        result = await WebhookService.process_webhook_message(
-            db, webhook_payload, x_user_id
-        )
+        if await db.get(User, x_user_id) is None:
+            raise ValueError("Usuário não encontrado")
 
-        if result["success"]:
-            return {
-                "message": result["message"],
-                "task": {
-                    "id": result["task_id"],
-                    "title": result["title"],
-                    "ai_priority": result["ai_priority"],
-                    "ai_reasoning": result["ai_reasoning"]
-                }
-            }
-        else:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=result["error"]
-            )
+        job, replayed = await webhook_queue.enqueue(db, webhook_payload, x_user_id, idempotency_key)
 
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=str(e)
         )
-    except Exception as e:
+
+    response.headers["Location"] = f"/webhook/jobs/{job.id}"
+    if replayed:
+        response.headers["Idempotent-Replayed"] = "true"
+    return job_response(job)
+
+
+@router.get("/jobs/{job_id}", response_model=WebhookJobResponse)
+async def get_webhook_job(
+    job_id: str,
+    x_user_id: str = Header(..., description="ID do usuário dono da mensagem"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Andamento de uma mensagem enfileirada: PENDING, PROCESSING, DONE (com task_id) ou FAILED"""
+    job = await webhook_queue.get_job(db, job_id, x_user_id)
+    if job is None:
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Erro interno: {str(e)}"
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job não encontrado"
+        )
+    return job_response(job)
+
+
+def job_response(job: WebhookJob) -> WebhookJobResponse:
+    return WebhookJobResponse(
+        id=job.id,
+        status=job.status,
+        attempts=job.attempts,
+        task_id=job.task_id if job.status == WebhookJobStatus.DONE else None,
+        last_error=job.last_error,
+        next_attempt_at=job.next_attempt_at if job.status == WebhookJobStatus.PENDING else None,
+        created_at=job.created_at,
+        finished_at=job.finished_at
+    )
+
+
+@router.post("/messages:batch", response_model=WebhookBatchResponse)
+async def receive_webhook_batch(
+    payloads: List[WebhookPayload] = Body(..., min_length=1, max_length=settings.webhook_batch_max_size),
+    x_user_id: str = Header(..., description="ID do usuário que receberá as tarefas"),
+    idempotency_key: Optional[str] = Header(None, description="Identifica o lote; reenvios não duplicam tarefas"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Recebe um lote de mensagens (rajada do gateway) e cria as tarefas numa
+    única transação
+
+    Cada item tem seu resultado (created, ignored, duplicate ou failed) na
+    mesma posição do array; itens com erro não impedem a criação dos demais
+    """
+    try:
+        return await WebhookService.process_webhook_batch(db, payloads, x_user_id, idempotency_key)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
         )
 
 
@@ -1,31 +1,52 @@
+import asyncio
 import json
+import logging
 import re
 from typing import List, Dict, Any, Optional, TYPE_CHECKING
 from ..core.config import settings
+from ..core.llm import llm_client
+from ..core.llm_resilience import LLMUnavailable, llm_guards
 from ..models.schemas import AIAnalysisResult
 from ..models.models import Priority
+from ..utils.micro_batcher import MicroBatcher
+from ..utils.singleflight import SingleFlight
+from .analysis_cache import analysis_cache
 
 if TYPE_CHECKING:
     from ..models.models import Task
 
-# Tentar importar OpenAI
-try:
-    from openai import OpenAI
-    OPENAI_AVAILABLE = True
-except ImportError:
-    OPENAI_AVAILABLE = False
+logger = logging.getLogger(__name__)
+
+ANALYSIS_SYSTEM_PROMPT = "Você é um assistente especializado em análise e priorização de tarefas. Responda sempre em português do Brasil."
+ANALYSIS_MAX_TOKENS = 300
+
+
+class UnparseableAnalysis(ValueError):
+    """A resposta do modelo não trouxe o JSON da análise: usa a análise simplificada sem guardar no cache"""
+
 
 class AIService:
     def __init__(self):
+        # Análises concorrentes da mesma mensagem (webhook e chat, reenvios) compartilham uma chamada ao modelo
+        self.inflight = SingleFlight()
+        # Com AI_ANALYSIS_BATCHING, mensagens diferentes que chegam juntas vão numa única chamada
+        self.batcher = MicroBatcher(
+            self._analyze_batch_with_openai,
+            window=settings.ai_analysis_batch_window_ms / 1000,
+            max_batch=settings.ai_analysis_batch_max_size
+        )
+        self.batch_fallbacks = 0
+
         # Verificar se OpenAI está disponível e configurada
-        self.openai_available = OPENAI_AVAILABLE and bool(settings.openai_api_key)
         if self.openai_available:
-            self.client = OpenAI(api_key=settings.openai_api_key)
-            self.model = getattr(settings, 'openai_model_name', 'gpt-4o-mini')
-            print(f"✅ OpenAI configurada com modelo {self.model}")
+            print(f"✅ OpenAI configurada com modelo {llm_client.model}")
         else:
             print("⚠️  OpenAI não disponível, usando análise simplificada")
 
+    @property
+    def openai_available(self) -> bool:
+        return llm_client.available
+
     async def analyze_task(self, message: str) -> AIAnalysisResult:
         """
         Analisa uma mensagem e gera título, resumo e prioridade sugerida
@@ -33,10 +54,14 @@ class AIService:
         """
         try:
             if self.openai_available:
-                return await self._analyze_with_openai(message)
+                key = analysis_cache.key_for(message, llm_client.model)
+                return await self.inflight.do(key, lambda: self._analyze_cached(key, message))
             else:
                 return self._analyze_simplified(message)
 
+        except (LLMUnavailable, UnparseableAnalysis):
+            # Circuito aberto, prazo estourado ou resposta sem JSON: análise local na hora
+            return self._analyze_simplified(message)
         except Exception as e:
             print(f"Erro na análise de IA: {e}")
             # Retornar análise padrão em caso de erro
@@ -48,6 +73,30 @@ class AIService:
                 confidence=0.3
             )
     
+    async def _analyze_cached(self, key: str, message: str) -> AIAnalysisResult:
+        """Cache de análises e, na falta, o modelo; executado uma vez por chave em andamento"""
+        cached = await analysis_cache.get(key)
+        if cached is not None:
+            return cached
+
+        if settings.ai_analysis_batching:
+            result = await self.batcher.submit(message)
+        else:
+            result = await self._analyze_with_openai(message)
+        await analysis_cache.set(key, llm_client.model, result)
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "cache": analysis_cache.memory.stats(),
+            "singleflight": self.inflight.stats(),
+            "batching": {
+                "enabled": settings.ai_analysis_batching,
+                "fallbacks": self.batch_fallbacks,
+                **self.batcher.stats()
+            }
+        }
+
     async def _analyze_with_openai(self, message: str) -> AIAnalysisResult:
         """Análise usando OpenAI GPT"""
         prompt = f"""Analise a seguinte mensagem de tarefa e forneça:
@@ -66,35 +115,110 @@ Responda APENAS com um JSON no formato:
     "reasoning": "explicação aqui"
 }}"""
 
-        response = self.client.chat.completions.create(
-            model=self.model,
+        content = await llm_guards["analyze"].call(lambda: llm_client.chat_completion(
             messages=[
-                {"role": "system", "content": "Você é um assistente especializado em análise e priorização de tarefas. Responda sempre em português do Brasil."},
+                {"role": "system", "content": ANALYSIS_SYSTEM_PROMPT},
                 {"role": "user", "content": prompt}
             ],
             temperature=0.7,
-            max_tokens=300
-        )
-        
-        content = response.choices[0].message.content.strip()
+            max_tokens=ANALYSIS_MAX_TOKENS,
+            timeout=settings.openai_analyze_timeout_seconds,
+            operation="analyze"
+        ))
         
-        # Extrair JSON da resposta
+        # Extrair JSON da resposta; sem ele, a exceção impede que o fallback vá para o cache
         json_match = re.search(r'\{.*\}', content, re.DOTALL)
-        if json_match:
-            result = json.loads(json_match.group())
-            priority_str = result.get('priority', 'MEDIUM').upper()
-            priority = Priority[priority_str] if priority_str in Priority.__members__ else Priority.MEDIUM
-            
-            return AIAnalysisResult(
-                title=result.get('title', message[:60]),
-                summary=result.get('summary', message[:150]),
-                suggested_priority=priority,
-                reasoning=result.get('reasoning', 'Análise automática por IA'),
-                confidence=0.9
+        if not json_match:
+            raise UnparseableAnalysis("Resposta do modelo sem JSON")
+        try:
+            return self._result_from_json(json.loads(json_match.group()), message)
+        except json.JSONDecodeError as e:
+            raise UnparseableAnalysis(f"JSON inválido na resposta do modelo: {e}") from e
+
+    async def _analyze_batch_with_openai(self, messages: List[str]) -> List[Any]:
+        """
+        Análise de várias mensagens numa única chamada (micro-batching). Itens
+        que faltam ou não dá para interpretar na resposta são refeitos um a um
+        """
+        if len(messages) == 1:
+            return [await self._analyze_with_openai(messages[0])]
+
+        listed = "\n".join(f"[{index}] {json.dumps(message, ensure_ascii=False)}" for index, message in enumerate(messages))
+        prompt = f"""Analise cada uma das mensagens de tarefa abaixo e forneça, para cada uma:
+1. Um título conciso (máximo 60 caracteres)
+2. Um resumo breve (máximo 150 caracteres)
+3. Prioridade sugerida (LOW, MEDIUM, HIGH, ou URGENT)
+4. Raciocínio para a prioridade escolhida
+
+Mensagens:
+{listed}
+
+Responda APENAS com um array JSON, com um objeto por mensagem, na mesma ordem:
+[
+    {{"index": 0, "title": "título aqui", "summary": "resumo aqui", "priority": "MEDIUM", "reasoning": "explicação aqui"}}
+]"""
+
+        content = await llm_guards["analyze_batch"].call(lambda: llm_client.chat_completion(
+            messages=[
+                {"role": "system", "content": ANALYSIS_SYSTEM_PROMPT},
+                {"role": "user", "content": prompt}
+            ],
+            temperature=0.7,
+            max_tokens=ANALYSIS_MAX_TOKENS * len(messages),
+            timeout=settings.openai_analyze_timeout_seconds,
+            operation="analyze_batch"
+        ))
+
+        results: List[Any] = self._parse_batch(content, messages)
+        missing = [index for index, result in enumerate(results) if result is None]
+        if missing:
+            logger.warning(f"Resposta em lote sem {len(missing)} de {len(messages)} análises, refazendo uma a uma")
+            self.batch_fallbacks += len(missing)
+            retried = await asyncio.gather(
+                *(self._analyze_with_openai(messages[index]) for index in missing),
+                return_exceptions=True
             )
-        else:
-            # Se não conseguir parsear, usar análise simplificada
-            return self._analyze_simplified(message)
+            for index, result in zip(missing, retried):
+                results[index] = result
+        return results
+
+    def _parse_batch(self, content: str, messages: List[str]) -> List[Optional[AIAnalysisResult]]:
+        """Análises do array JSON da resposta em lote, por posição; None onde faltar"""
+        results: List[Optional[AIAnalysisResult]] = [None] * len(messages)
+        json_match = re.search(r'\[.*\]', content, re.DOTALL)
+        if not json_match:
+            return results
+        try:
+            items = json.loads(json_match.group())
+        except json.JSONDecodeError:
+            return results
+        if not isinstance(items, list):
+            return results
+
+        for position, item in enumerate(items):
+            if not isinstance(item, dict):
+                continue
+            index = item.get("index", position)
+            if not isinstance(index, int) or not 0 <= index < len(messages) or results[index] is not None:
+                continue
+            try:
+                results[index] = self._result_from_json(item, messages[index])
+            except ValueError:
+                # Campos com tipo errado: o item é refeito sozinho
+                continue
+        return results
+
+    def _result_from_json(self, result: Dict[str, Any], message: str) -> AIAnalysisResult:
+        priority_str = str(result.get('priority', 'MEDIUM')).upper()
+        priority = Priority[priority_str] if priority_str in Priority.__members__ else Priority.MEDIUM
+
+        return AIAnalysisResult(
+            title=result.get('title', message[:60]),
+            summary=result.get('summary', message[:150]),
+            suggested_priority=priority,
+            reasoning=result.get('reasoning', 'Análise automática por IA'),
+            confidence=0.9
+        )
     
     def _analyze_simplified(self, message: str) -> AIAnalysisResult:
         """Análise simplificada baseada em palavras-chave"""
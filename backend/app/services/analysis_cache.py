@@ -0,0 +1,87 @@
+"""
+Cache de análises de IA endereçado pelo conteúdo da mensagem
+"""
+import hashlib
+import re
+import unicodedata
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy.exc import SQLAlchemyError
+
+from ..core.config import settings
+from ..core.database import AsyncSessionLocal
+from ..models.models import AIAnalysisCache as AIAnalysisCacheModel
+from ..models.schemas import AIAnalysisResult
+from ..utils.cache import TTLCache
+
+
+def normalize_message(message: str) -> str:
+    """Normaliza o texto para que variações triviais gerem a mesma chave"""
+    text = unicodedata.normalize("NFC", message).lower()
+    return re.sub(r"\s+", " ", text).strip()
+
+
+class AnalysisCache:
+    """
+    Dois níveis: LRU+TTL em memória e, opcionalmente, a tabela ai_analysis_cache,
+    compartilhada entre processos e reinícios
+    """
+
+    def __init__(self):
+        self.memory = TTLCache(
+            maxsize=settings.analysis_cache_size,
+            ttl=settings.analysis_cache_ttl_seconds
+        )
+        self.persistent = settings.analysis_cache_persistent
+
+    @staticmethod
+    def key_for(message: str, model: str) -> str:
+        content = f"{model}\n{normalize_message(message)}"
+        return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+    async def get(self, key: str) -> Optional[AIAnalysisResult]:
+        result = self.memory.get(key)
+        if result is not None:
+            return result
+
+        if self.persistent:
+            result = await self._load(key)
+            if result is not None:
+                self.memory.set(key, result)
+        return result
+
+    async def set(self, key: str, model: str, result: AIAnalysisResult) -> None:
+        self.memory.set(key, result)
+        if self.persistent:
+            await self._store(key, model, result)
+
+    async def _load(self, key: str) -> Optional[AIAnalysisResult]:
+        async with AsyncSessionLocal() as db:
+            try:
+                entry = await db.get(AIAnalysisCacheModel, key)
+                if entry is None or entry.expires_at <= datetime.utcnow():
+                    return None
+                return AIAnalysisResult.model_validate_json(entry.result)
+            except SQLAlchemyError as e:
+                print(f"Erro ao ler cache de análise: {e}")
+                return None
+
+    async def _store(self, key: str, model: str, result: AIAnalysisResult) -> None:
+        async with AsyncSessionLocal() as db:
+            try:
+                await db.merge(AIAnalysisCacheModel(
+                    key=key,
+                    model=model,
+                    result=result.model_dump_json(),
+                    expires_at=datetime.utcnow() + timedelta(seconds=settings.analysis_cache_persistent_ttl_seconds)
+                ))
+                await db.commit()
+            except SQLAlchemyError as e:
+                # Outro processo pode ter gravado a mesma chave; o cache é best-effort
+                await db.rollback()
+                print(f"Erro ao gravar cache de análise: {e}")
+
+
+# Instância global do cache de análises
+analysis_cache = AnalysisCache()
@@ -0,0 +1,105 @@
+"""
+Cache das respostas do chat por usuário
+
+A chave é a pergunta normalizada mais a versão das tarefas do usuário
+(user_task_counters.task_version), incrementada por toda escrita do
+TaskService na mesma transação da tarefa. Depois de uma escrita a versão
+muda e as respostas anteriores deixam de ser encontradas, em qualquer
+processo, sem invalidação explícita; elas saem pelo LRU ou pelo TTL. O TTL
+também limita respostas que dependem da data ("o que vence hoje?").
+
+Com `chat_answer_cache_similarity` > 0, uma pergunta sem acerto exato é
+comparada por embedding com as já respondidas na mesma versão e reaproveita a
+resposta mais próxima acima do limiar. Isso exige um embedder semântico
+(EMBEDDING_BACKEND=sentence-transformers), com o limiar calibrado em perguntas
+reais. O embedder por hashing mede só a sobreposição de palavras: uma
+reformulação ("quais são minhas tarefas urgentes" / "quais as minhas tarefas
+urgentes?") dá cosseno ~0.84, e uma pergunta diferente com as mesmas palavras
+("... tarefas concluídas") dá ~0.73. Nenhum limiar separa as duas com segurança.
+"""
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from ..core.config import settings
+from ..utils.cache import TTLCache
+from .analysis_cache import normalize_message
+from .embedding_service import embedding_service
+
+# Perguntas quase iguais guardadas por (usuário, versão)
+MAX_SIMILAR_ENTRIES = 32
+
+
+def normalize_question(question: str) -> str:
+    """Como normalize_message, sem a pontuação final ("bom dia!" = "bom dia")"""
+    return re.sub(r"[\s?!.…]+$", "", normalize_message(question))
+
+
+@dataclass
+class AnswerKey:
+    user_id: str
+    version: int
+    question: str  # normalizada
+    vector: Optional[np.ndarray] = None  # embedding, calculado só com a busca por similaridade
+
+
+class AnswerCache:
+    def __init__(self, maxsize: int, ttl: float, similarity: float):
+        self.exact = TTLCache(maxsize=maxsize, ttl=ttl)
+        # (user_id, versão) -> [(embedding, resposta)], da mais antiga para a mais nova
+        self.similar = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.similarity = similarity
+
+        # Métricas
+        self.similar_hits = 0
+        self.stored = 0
+
+    @staticmethod
+    def key_for(user_id: str, version: int, question: str) -> AnswerKey:
+        return AnswerKey(user_id, version, normalize_question(question))
+
+    async def get(self, key: AnswerKey) -> Optional[str]:
+        answer = self.exact.get((key.user_id, key.version, key.question))
+        if answer is not None or self.similarity <= 0:
+            return answer
+
+        entries: List[Tuple[np.ndarray, str]] = self.similar.get((key.user_id, key.version)) or []
+        if not entries:
+            return None
+        key.vector = await embedding_service.embed(key.question)
+        scores = np.stack([vector for vector, _ in entries]) @ key.vector
+        best = int(np.argmax(scores))
+        if scores[best] < self.similarity:
+            return None
+        self.similar_hits += 1
+        return entries[best][1]
+
+    async def set(self, key: AnswerKey, answer: str) -> None:
+        self.exact.set((key.user_id, key.version, key.question), answer)
+        self.stored += 1
+        if self.similarity <= 0:
+            return
+
+        if key.vector is None:
+            key.vector = await embedding_service.embed(key.question)
+        group = (key.user_id, key.version)
+        entries = self.similar.pop(group) or []
+        entries.append((key.vector, answer))
+        self.similar.set(group, entries[-MAX_SIMILAR_ENTRIES:])
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "stored": self.stored,
+            "similar_hits": self.similar_hits,
+            "similarity": self.similarity,
+            "exact": self.exact.stats()
+        }
+
+
+answer_cache = AnswerCache(
+    maxsize=settings.chat_answer_cache_size,
+    ttl=settings.chat_answer_cache_ttl_seconds,
+    similarity=settings.chat_answer_cache_similarity
+)
@@ -0,0 +1,217 @@
+"""
+Contexto de tarefas do prompt de respostas do chat
+
+Em vez de listar as 100 tarefas mais recentes, pontua as candidatas contra a
+pergunta e inclui as melhores até `chat_context_token_budget` tokens.
+
+- Candidatas: as mais similares à pergunta nos índices em memória (lexical e
+  vetorial) mais as `chat_context_candidates` mais recentes.
+- Pontuação: relevância (a maior das similaridades), prioridade e recência
+  (meia-vida de `chat_context_recency_half_life_days`); concluídas e
+  canceladas pesam menos.
+- Os tokens são contados com o tokenizer do modelo (tiktoken); sem ele, com
+  uma estimativa conservadora por caracteres.
+"""
+import logging
+import math
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from itertools import chain
+from typing import Any, Dict
+
+from sqlalchemy import and_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import load_only
+
+from ..core.config import settings
+from ..models.models import Priority, Task, TaskStatus, utcnow
+from .embedding_service import embedding_service
+from .search_index import task_search_index
+from .vector_index import task_vector_index
+
+# Tentar importar tiktoken
+try:
+    import tiktoken
+    TIKTOKEN_AVAILABLE = True
+except ImportError:
+    TIKTOKEN_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+RELEVANCE_WEIGHT = 0.6
+PRIORITY_WEIGHT = 0.25
+RECENCY_WEIGHT = 0.15
+PRIORITY_SCORES = {Priority.LOW: 0.25, Priority.MEDIUM: 0.5, Priority.HIGH: 0.75, Priority.URGENT: 1.0}
+CLOSED_STATUSES = (TaskStatus.COMPLETED, TaskStatus.CANCELLED)
+CLOSED_STATUS_FACTOR = 0.3
+# Sem tiktoken: português com emojis fica abaixo de 3 caracteres por token só em casos raros
+CHARS_PER_TOKEN = 3
+MAX_DESCRIPTION_CHARS = 200
+
+PRIORITY_EMOJIS = {Priority.LOW: "🟢", Priority.MEDIUM: "🟡", Priority.HIGH: "🟠", Priority.URGENT: "🔴"}
+PRIORITY_NAMES = {Priority.LOW: "Baixa", Priority.MEDIUM: "Média", Priority.HIGH: "Alta", Priority.URGENT: "Urgente"}
+STATUS_NAMES = {
+    TaskStatus.PENDING: "Pendente",
+    TaskStatus.IN_PROGRESS: "Em progresso",
+    TaskStatus.COMPLETED: "Concluída",
+    TaskStatus.CANCELLED: "Cancelada"
+}
+
+
+class TokenCounter:
+    """Conta tokens com o encoding do modelo; carregado na primeira utilização"""
+
+    def __init__(self, model: str):
+        self.model = model
+        self._encoding = None
+        self._loaded = False
+
+    def load(self):
+        """Carrega o encoding (pode baixar o arquivo BPE); chamado no lifespan, fora do event loop"""
+        if self._loaded:
+            return self._encoding
+        self._loaded = True
+        if TIKTOKEN_AVAILABLE:
+            try:
+                try:
+                    self._encoding = tiktoken.encoding_for_model(self.model)
+                except KeyError:
+                    self._encoding = tiktoken.get_encoding("o200k_base")
+            except Exception as e:
+                # O encoding é baixado no primeiro uso; sem rede, fica a estimativa
+                logger.warning(f"tiktoken indisponível, usando estimativa de tokens: {e}")
+        return self._encoding
+
+    @property
+    def name(self) -> str:
+        encoding = self.load()
+        return encoding.name if encoding is not None else f"estimativa ({CHARS_PER_TOKEN} caracteres/token)"
+
+    def count(self, text: str) -> int:
+        encoding = self.load()
+        if encoding is None:
+            return math.ceil(len(text) / CHARS_PER_TOKEN)
+        return len(encoding.encode(text, disallowed_special=()))
+
+
+@dataclass
+class AnswerContext:
+    summary: str  # uma linha por tarefa, da mais para a menos relevante
+    included: int
+    candidates: int
+    tokens: int
+
+
+def format_task_line(task: Task) -> str:
+    description = task.description or "Sem descrição"
+    if len(description) > MAX_DESCRIPTION_CHARS:
+        description = description[:MAX_DESCRIPTION_CHARS] + "..."
+    return (
+        f"{PRIORITY_EMOJIS.get(task.priority, '⚪')} {task.title} - {description} "
+        f"(Status: {STATUS_NAMES.get(task.status, task.status)}, "
+        f"Prioridade: {PRIORITY_NAMES.get(task.priority, task.priority)})"
+    )
+
+
+class AnswerContextBuilder:
+    def __init__(self, token_budget: int, candidates: int, recency_half_life_days: float, model: str):
+        self.token_budget = token_budget
+        self.candidates = candidates
+        self.recency_half_life_days = recency_half_life_days
+        self.tokens = TokenCounter(model)
+
+        # Métricas
+        self.builds = 0
+        self.build_seconds = 0.0
+        self.context_tokens = 0
+        self.included = 0
+        self.prompts = 0
+        self.prompt_tokens = 0
+        self.max_prompt_tokens = 0
+
+    def score(self, task: Task, relevance: float, now: datetime) -> float:
+        created_at = task.created_at or now
+        if created_at.tzinfo is None:
+            created_at = created_at.replace(tzinfo=timezone.utc)
+        age_days = max(0.0, (now - created_at).total_seconds() / 86400)
+        recency = 0.5 ** (age_days / self.recency_half_life_days)
+
+        value = (
+            RELEVANCE_WEIGHT * relevance
+            + PRIORITY_WEIGHT * PRIORITY_SCORES.get(task.priority, 0.5)
+            + RECENCY_WEIGHT * recency
+        )
+        if task.status in CLOSED_STATUSES:
+            value *= CLOSED_STATUS_FACTOR
+        return value
+
+    async def build(self, db: AsyncSession, user_id: str, question: str) -> AnswerContext:
+        start = time.perf_counter()
+
+        lexical = (await task_search_index.get(db, user_id)).search(question, self.candidates)
+        semantic = await task_vector_index.search(db, user_id, await embedding_service.embed(question), self.candidates)
+        relevance: Dict[str, float] = {}
+        for task_id, similarity in chain(lexical, semantic):
+            relevance[task_id] = max(relevance.get(task_id, 0.0), similarity)
+
+        columns = load_only(Task.id, Task.title, Task.description, Task.priority, Task.status, Task.created_at)
+        recent = await db.execute(
+            select(Task).options(columns).where(Task.user_id == user_id)
+            .order_by(Task.created_at.desc(), Task.id.desc()).limit(self.candidates)
+        )
+        tasks = {task.id: task for task in recent.scalars()}
+        missing = [task_id for task_id in relevance if task_id not in tasks]
+        if missing:
+            result = await db.execute(
+                select(Task).options(columns).where(and_(Task.user_id == user_id, Task.id.in_(missing)))
+            )
+            tasks.update((task.id, task) for task in result.scalars())
+
+        now = utcnow()
+        ranked = sorted(tasks.values(), key=lambda task: self.score(task, relevance.get(task.id, 0.0), now), reverse=True)
+
+        # Guloso: uma tarefa que não cabe é pulada e as seguintes ainda podem caber
+        lines = []
+        used = 0
+        for task in ranked:
+            line = format_task_line(task)
+            cost = self.tokens.count(line) + 1  # quebra de linha
+            if used + cost > self.token_budget:
+                continue
+            lines.append(line)
+            used += cost
+
+        self.builds += 1
+        self.build_seconds += time.perf_counter() - start
+        self.context_tokens += used
+        self.included += len(lines)
+        return AnswerContext(summary="\n".join(lines), included=len(lines), candidates=len(tasks), tokens=used)
+
+    def record_prompt(self, prompt: str) -> int:
+        """Registra o tamanho do prompt final; retorna os tokens"""
+        tokens = self.tokens.count(prompt)
+        self.prompts += 1
+        self.prompt_tokens += tokens
+        self.max_prompt_tokens = max(self.max_prompt_tokens, tokens)
+        return tokens
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "tokenizer": self.tokens.name,
+            "token_budget": self.token_budget,
+            "builds": self.builds,
+            "avg_build_ms": self.build_seconds / self.builds * 1000 if self.builds else 0.0,
+            "avg_context_tokens": self.context_tokens / self.builds if self.builds else 0.0,
+            "avg_tasks": self.included / self.builds if self.builds else 0.0,
+            "avg_prompt_tokens": self.prompt_tokens / self.prompts if self.prompts else 0.0,
+            "max_prompt_tokens": self.max_prompt_tokens
+        }
+
+
+answer_context_builder = AnswerContextBuilder(
+    token_budget=settings.chat_context_token_budget,
+    candidates=settings.chat_context_candidates,
+    recency_half_life_days=settings.chat_context_recency_half_life_days,
+    model=settings.openai_model_name
+)
@@ -1,22 +1,26 @@
 from datetime import datetime, timedelta
 from typing import Optional
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 import jwt
 import uuid
-from ..models.models import User
+from ..models.models import User, UserTaskCounters
 from ..models.schemas import UserCreate, UserResponse, UserLogin
-from ..core.security import verify_password, get_password_hash, create_access_token
+from ..core.password_hasher import PasswordHasherBusy, password_hasher
+from ..core.security import decode_access_token
 from ..core.config import settings
 
 
 class AuthService:
     @staticmethod
-    def create_user(db: Session, user_data: UserCreate) -> UserResponse:
-        existing_user = db.query(User).filter(User.email == user_data.email).first()
+    async def create_user(db: AsyncSession, user_data: UserCreate) -> UserResponse:
+        result = await db.execute(select(User).where(User.email == user_data.email))
+        existing_user = result.scalar_one_or_none()
         if existing_user:
             raise ValueError("Usuário já existe com este email")
 
-        hashed_password = get_password_hash(user_data.password)
+        # PBKDF2 é CPU-bound: roda no executor dedicado, fora do event loop
+        hashed_password = await password_hasher.hash(user_data.password)
 
         db_user = User(
             id=str(uuid.uuid4()),
@@ -26,48 +30,67 @@ class AuthService:
         )
 
         db.add(db_user)
-        db.commit()
-        db.refresh(db_user)
+        db.add(UserTaskCounters(user_id=db_user.id))
+        await db.commit()
+        await db.refresh(db_user)
 
         return UserResponse.model_validate(db_user)
 
     @staticmethod
-    def authenticate_user(db: Session, login_data: UserLogin) -> Optional[User]:
-        user = db.query(User).filter(User.email == login_data.email).first()
+    async def authenticate_user(db: AsyncSession, login_data: UserLogin) -> Optional[User]:
+        result = await db.execute(select(User).where(User.email == login_data.email))
+        user = result.scalar_one_or_none()
 
         if not user:
             return None
 
-        if not verify_password(login_data.password, user.password):
+        if not await password_hasher.verify(login_data.password, user.password):
             return None
 
+        # Senha gravada com parâmetros antigos: regrava com os atuais
+        if password_hasher.needs_rehash(user.password):
+            try:
+                user.password = await password_hasher.hash(login_data.password)
+                await db.commit()
+            except PasswordHasherBusy:
+                pass  # fica para o próximo login
+
         return user
 
     @staticmethod
-    def create_access_token(email: str) -> str:
+    def create_access_token(email: str, user_id: Optional[str] = None) -> str:
         expire = datetime.utcnow() + timedelta(minutes=settings.access_token_expire_minutes)
         to_encode = {"sub": email, "exp": expire}
+        if user_id is not None:
+            # id imutável: a autenticação busca o usuário pela chave primária
+            to_encode["uid"] = user_id
         encoded_jwt = jwt.encode(to_encode, settings.secret_key, algorithm=settings.algorithm)
         return encoded_jwt
 
     @staticmethod
-    def get_current_user(db: Session, token: str) -> Optional[User]:
-        try:
-            payload = jwt.decode(token, settings.secret_key, algorithms=[settings.algorithm])
-            email: str = payload.get("sub")
-            if email is None:
-                return None
-        except jwt.ExpiredSignatureError:
-            return None
-        except jwt.JWTError:
+    async def get_current_user(db: AsyncSession, token: str) -> Optional[User]:
+        payload = decode_access_token(token)
+        if payload is None:
             return None
+        return await AuthService.get_user_from_claims(db, payload)
 
-        user = db.query(User).filter(User.email == email).first()
-        return user
+    @staticmethod
+    async def get_user_from_claims(db: AsyncSession, payload: dict) -> Optional[User]:
+        """Usuário das claims de um token já verificado"""
+        user_id = payload.get("uid")
+        if user_id is not None:
+            return await db.get(User, user_id)
+
+        # Tokens emitidos antes da claim `uid`
+        email = payload.get("sub")
+        if email is None:
+            return None
+        result = await db.execute(select(User).where(User.email == email))
+        return result.scalar_one_or_none()
 
     @staticmethod
-    def get_user_by_id(db: Session, user_id: str) -> Optional[UserResponse]:
-        user = db.query(User).filter(User.id == user_id).first()
+    async def get_user_by_id(db: AsyncSession, user_id: str) -> Optional[UserResponse]:
+        user = await db.get(User, user_id)
         if user:
             return UserResponse.model_validate(user)
         return None
@@ -0,0 +1,141 @@
+"""
+Embeddings de tarefas para a busca semântica
+
+Dois backends, escolhidos por `embedding_backend`:
+
+- hashing: vetorizador por hashing (palavras + trigramas de caracteres, sem
+  acentos) em `embedding_dimensions` posições. Local, determinístico e sem
+  download de modelo; aproxima variações morfológicas ("revisar"/"revisão").
+- sentence-transformers: modelo `embedding_model`, executado no threadpool.
+
+Os vetores são float32 normalizados (L2), então o produto interno é o cosseno.
+"""
+import logging
+import re
+import unicodedata
+import zlib
+from typing import Optional, Sequence
+
+import numpy as np
+from fastapi.concurrency import run_in_threadpool
+
+from ..core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Tentar importar sentence-transformers
+try:
+    from sentence_transformers import SentenceTransformer
+    SENTENCE_TRANSFORMERS_AVAILABLE = True
+except ImportError:
+    SENTENCE_TRANSFORMERS_AVAILABLE = False
+
+_WORD_PATTERN = re.compile(r"\w+")
+
+
+def task_text(title, description, ai_title, ai_summary, raw_message) -> str:
+    """Texto da tarefa usado no embedding (mesmos campos da busca lexical)"""
+    return " ".join(part for part in (title, description, ai_title, ai_summary, raw_message) if part)
+
+
+def _strip_accents(text: str) -> str:
+    decomposed = unicodedata.normalize("NFKD", text)
+    return "".join(char for char in decomposed if not unicodedata.combining(char))
+
+
+class HashingEmbedder:
+    """Vetorizador por hashing com sinal (feature hashing)"""
+
+    blocking = False
+    trigram_weight = 0.5
+
+    def __init__(self, dimensions: int):
+        self.dimensions = dimensions
+        self.name = f"hashing-{dimensions}"
+
+    def _features(self, text: str):
+        for word in _WORD_PATTERN.findall(_strip_accents(text.lower())):
+            yield word, 1.0
+            padded = f"#{word}#"
+            for i in range(len(padded) - 2):
+                yield padded[i:i + 3], self.trigram_weight
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dimensions), dtype=np.float32)
+        for row, text in enumerate(texts):
+            vector = vectors[row]
+            for feature, weight in self._features(text):
+                h = zlib.crc32(feature.encode("utf-8"))
+                # Bit alto define o sinal: colisões tendem a se cancelar
+                vector[h % self.dimensions] += weight if h & 0x80000000 else -weight
+
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        np.divide(vectors, norms, out=vectors, where=norms > 0)
+        return vectors
+
+
+class SentenceTransformerEmbedder:
+    """Modelo sentence-transformers, carregado na primeira utilização"""
+
+    blocking = True
+
+    def __init__(self, model_name: str):
+        self.model_name = model_name
+        self.name = f"st-{model_name}"
+        self._model: Optional["SentenceTransformer"] = None
+
+    @property
+    def dimensions(self) -> int:
+        return self._load().get_sentence_embedding_dimension()
+
+    def _load(self) -> "SentenceTransformer":
+        if self._model is None:
+            self._model = SentenceTransformer(self.model_name)
+        return self._model
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        vectors = self._load().encode(list(texts), normalize_embeddings=True, convert_to_numpy=True)
+        return np.asarray(vectors, dtype=np.float32)
+
+
+class EmbeddingService:
+    def __init__(self):
+        if settings.embedding_backend == "sentence-transformers" and SENTENCE_TRANSFORMERS_AVAILABLE:
+            self.embedder = SentenceTransformerEmbedder(settings.embedding_model)
+        else:
+            if settings.embedding_backend != "hashing":
+                logger.warning("Backend de embedding '%s' indisponível, usando hashing", settings.embedding_backend)
+            self.embedder = HashingEmbedder(settings.embedding_dimensions)
+
+    @property
+    def name(self) -> str:
+        return self.embedder.name
+
+    @property
+    def dimensions(self) -> int:
+        return self.embedder.dimensions
+
+    async def embed_many(self, texts: Sequence[str]) -> np.ndarray:
+        if not texts:
+            return np.zeros((0, self.dimensions), dtype=np.float32)
+        if self.embedder.blocking:
+            return await run_in_threadpool(self.embedder.embed, texts)
+        return self.embedder.embed(texts)
+
+    async def embed(self, text: str) -> np.ndarray:
+        return (await self.embed_many([text]))[0]
+
+    @staticmethod
+    def to_bytes(vector: np.ndarray) -> bytes:
+        return np.ascontiguousarray(vector, dtype=np.float32).tobytes()
+
+    def from_bytes(self, data: Optional[bytes], model: Optional[str]) -> Optional[np.ndarray]:
+        """Vetor salvo no banco, ou None se ausente ou gerado por outro backend"""
+        if data is None or model != self.name:
+            return None
+        return np.frombuffer(data, dtype=np.float32)
+
+
+# Instância global do serviço de embeddings
+embedding_service = EmbeddingService()
+
@@ -0,0 +1,71 @@
+"""
+Filtro de busca textual das tarefas
+
+- PostgreSQL: `search_vector @@ websearch_to_tsquery('portuguese', termo)`,
+  servido pelo índice GIN e ordenado por `ts_rank_cd` (com stemming).
+- SQLite: MATCH na tabela FTS5 `tasks_fts`, com cada palavra como prefixo
+  ("contrat" encontra "contrato"/"contratos") e ordenação por `bm25`.
+- Outros bancos: ILIKE nas cinco colunas, como antes.
+
+Os objetos de banco (coluna, índice, tabela FTS5 e triggers) são definidos em
+models.models junto com a tabela tasks.
+"""
+import re
+from typing import Optional, Tuple
+
+from sqlalchemy import ColumnElement, Select, bindparam, column, func, literal_column, or_, select, table
+
+from ..models.models import Task, TASKS_FTS_ROWID, TASKS_FTS_TABLE
+
+# Pesos do bm25 por coluna, na ordem de TASKS_FTS_COLUMNS:
+# title, description, raw_message, ai_title, ai_summary
+_BM25_WEIGHTS = "10.0, 4.0, 1.0, 10.0, 4.0"
+_TERM_PATTERN = re.compile(r"\w+")
+
+
+def fts5_query(search: str) -> Optional[str]:
+    """Converte o texto livre numa expressão FTS5 segura (AND de prefixos)"""
+    terms = _TERM_PATTERN.findall(search.lower())
+    if not terms:
+        return None
+    return " ".join(f'"{term}"*' for term in terms)
+
+
+def apply_search(query: Select, dialect: str, search: str) -> Tuple[Select, Optional[ColumnElement]]:
+    """
+    Filtra `query` (sobre Task) pelo termo. Retorna também a expressão de
+    relevância (menor = mais relevante) para ordenação e paginação, ou None
+    quando o banco não tem busca textual
+    """
+    if dialect == "postgresql":
+        ts_query = func.websearch_to_tsquery(literal_column("'portuguese'::regconfig"), search)
+        search_vector = literal_column("tasks.search_vector")
+        rank = -func.ts_rank_cd(search_vector, ts_query)
+        return query.where(search_vector.op("@@")(ts_query)), rank
+
+    if dialect == "sqlite":
+        match = fts5_query(search)
+        if match is None:
+            return query, None
+
+        fts = table(TASKS_FTS_TABLE, column("rowid"))
+        ranked = (
+            select(
+                fts.c.rowid.label("rowid"),
+                literal_column(f"bm25({TASKS_FTS_TABLE}, {_BM25_WEIGHTS})").label("rank")
+            )
+            .where(literal_column(TASKS_FTS_TABLE).op("MATCH")(bindparam("fts_match", match)))
+            .subquery()
+        )
+        return query.join(ranked, ranked.c.rowid == literal_column(f"tasks.{TASKS_FTS_ROWID}")), ranked.c.rank
+
+    search_term = f"%{search}%"
+    return query.where(
+        or_(
+            Task.title.ilike(search_term),
+            Task.description.ilike(search_term),
+            Task.raw_message.ilike(search_term),
+            Task.ai_title.ilike(search_term),
+            Task.ai_summary.ilike(search_term)
+        )
+    ), None
@@ -0,0 +1,55 @@
+"""
+Classificação de mensagens do chat: pergunta/conversa x pedido de tarefa
+
+As listas de palavras-chave de app.constants são compiladas uma única vez, na
+importação, em expressões regulares de alternação; cada mensagem é varrida
+no máximo três vezes, independentemente do número de palavras-chave.
+"""
+import re
+from typing import Iterable, List
+
+from ..constants import (
+    ACTION_KEYWORDS,
+    CONVERSATION_KEYWORDS,
+    QUESTION_KEYWORDS,
+    SHORT_MESSAGE_ACTION_KEYWORDS,
+    SHORT_MESSAGE_MAX_LENGTH,
+)
+
+
+def _alternation(keywords: Iterable[str]) -> str:
+    # Mais longas primeiro para que prefixos comuns não encurtem o match
+    return "|".join(re.escape(word) for word in sorted(set(keywords), key=len, reverse=True))
+
+
+# Qualquer sinal de conversa/pergunta: '?', padrão de conversa em qualquer posição,
+# ou palavra interrogativa no início da mensagem ou cercada por espaços
+_ANSWER_PATTERN = re.compile(
+    r"\?"
+    rf"|{_alternation(CONVERSATION_KEYWORDS)}"
+    rf"|^(?:{_alternation(QUESTION_KEYWORDS)})"
+    rf"| (?:{_alternation(QUESTION_KEYWORDS)}) "
+)
+_SHORT_ACTION_PATTERN = re.compile(_alternation(SHORT_MESSAGE_ACTION_KEYWORDS))
+_ACTION_PATTERN = re.compile(_alternation(ACTION_KEYWORDS))
+
+
+def is_question(message: str) -> bool:
+    """
+    True se a mensagem deve ser respondida (pergunta ou conversa casual),
+    False se descreve uma tarefa a ser criada
+    """
+    text = message.lower().strip()
+
+    if _ANSWER_PATTERN.search(text):
+        return True
+
+    if len(text) < SHORT_MESSAGE_MAX_LENGTH and not _SHORT_ACTION_PATTERN.search(text):
+        return True
+
+    return _ACTION_PATTERN.search(text) is None
+
+
+def classify_messages(messages: Iterable[str]) -> List[bool]:
+    """Classifica várias mensagens de uma vez (ex.: lote do webhook)"""
+    return [is_question(message) for message in messages]
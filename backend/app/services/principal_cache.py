@@ -0,0 +1,88 @@
+"""
+Cache de usuários autenticados, indexado pelo sha256 do token
+
+Um acerto dispensa a verificação do JWT e a consulta ao banco. A entrada vale
+até o menor entre PRINCIPAL_CACHE_TTL_SECONDS e o `exp` do token; qualquer
+alteração ou remoção de um User pelo ORM invalida as entradas do usuário
+quando a transação é confirmada.
+
+O User guardado fica desanexado da sessão e é compartilhado entre requisições:
+serve para leitura de colunas (id, email, name...), não para relacionamentos.
+"""
+import hashlib
+import time
+from typing import Dict, Optional
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
+
+from ..core.config import settings
+from ..models.models import User
+from ..utils.cache import TTLCache
+
+
+class PrincipalCache:
+    def __init__(self, maxsize: int, ttl: float):
+        self.ttl = ttl
+        self.entries = TTLCache(maxsize=maxsize, ttl=ttl)
+        # Geração por usuário: invalidar incrementa e descarta todas as entradas antigas
+        self._generations: Dict[str, int] = {}
+
+    @staticmethod
+    def key_for(token: str) -> bytes:
+        return hashlib.sha256(token.encode("utf-8")).digest()
+
+    def get(self, token: str) -> Optional[User]:
+        entry = self.entries.get(self.key_for(token))
+        if entry is None:
+            return None
+
+        generation, user = entry
+        if generation != self._generations.get(user.id, 0):
+            self.entries.pop(self.key_for(token))
+            return None
+        return user
+
+    def set(self, token: str, user: User, expires_at: Optional[float]) -> None:
+        ttl = self.ttl
+        if expires_at is not None:
+            ttl = min(ttl, expires_at - time.time())
+        if ttl <= 0:
+            return
+        self.entries.set(self.key_for(token), (self._generations.get(user.id, 0), user), ttl=ttl)
+
+    def invalidate_user(self, user_id: str) -> None:
+        self._generations[user_id] = self._generations.get(user_id, 0) + 1
+
+    def clear(self) -> None:
+        self.entries.clear()
+
+
+principal_cache = PrincipalCache(
+    maxsize=settings.principal_cache_size,
+    ttl=settings.principal_cache_ttl_seconds
+)
+
+
+# Invalidação: os ids alterados no flush são anotados na sessão e descartados
+# do cache só no commit, para que uma requisição concorrente não recoloque o
+# estado antigo entre o flush e o commit
+def _mark_changed(mapper, connection, target: User) -> None:
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault("changed_user_ids", set()).add(target.id)
+
+
+event.listen(User, "after_update", _mark_changed)
+event.listen(User, "after_delete", _mark_changed)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_changed(session: Session) -> None:
+    for user_id in session.info.pop("changed_user_ids", ()):
+        principal_cache.invalidate_user(user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_changed(session: Session) -> None:
+    session.info.pop("changed_user_ids", None)
@@ -0,0 +1,181 @@
+"""
+Índice invertido por usuário para a busca de tarefas similares
+
+Cada usuário tem um mapa token -> ids de tarefas e o tamanho do conjunto de
+tokens de cada tarefa; o Jaccard é calculado apenas sobre as listas dos
+tokens da consulta, sem reler nem re-tokenizar todas as tarefas.
+
+O índice é construído sob demanda na primeira busca e atualizado pelo
+TaskService a cada create/update/delete. Como é local ao processo, é
+reconstruído após `search_index_ttl_seconds` para incorporar escritas feitas
+por outros workers.
+"""
+import asyncio
+import heapq
+import time
+from collections import Counter, OrderedDict
+from typing import Any, Dict, FrozenSet, List, Set, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..core.config import settings
+from ..models.models import Task
+
+SIMILARITY_THRESHOLD = 0.1
+
+
+def tokenize(text: str) -> FrozenSet[str]:
+    """Mesma tokenização da busca original: minúsculas e separação por espaços"""
+    return frozenset(text.lower().split())
+
+
+def task_tokens(title, description, ai_title, ai_summary, raw_message) -> FrozenSet[str]:
+    parts = [part for part in (title, description, ai_title, ai_summary, raw_message) if part]
+    return tokenize(" ".join(parts))
+
+
+class UserTaskIndex:
+    """Listas invertidas das tarefas de um usuário"""
+
+    def __init__(self):
+        self.postings: Dict[str, Set[str]] = {}
+        self.tokens: Dict[str, FrozenSet[str]] = {}
+        self.built_at = time.monotonic()
+
+    def add(self, task_id: str, tokens: FrozenSet[str]) -> None:
+        self.remove(task_id)
+        self.tokens[task_id] = tokens
+        for token in tokens:
+            self.postings.setdefault(token, set()).add(task_id)
+
+    def remove(self, task_id: str) -> None:
+        for token in self.tokens.pop(task_id, ()):
+            posting = self.postings.get(token)
+            if posting is not None:
+                posting.discard(task_id)
+                if not posting:
+                    del self.postings[token]
+
+    def search(self, query: str, top_k: int) -> List[Tuple[str, float]]:
+        """Retorna (task_id, jaccard) das top_k tarefas acima do limiar"""
+        query_tokens = tokenize(query)
+        if not query_tokens:
+            return []
+
+        intersections: Counter = Counter()
+        for token in query_tokens:
+            intersections.update(self.postings.get(token, ()))
+
+        query_size = len(query_tokens)
+        scored = []
+        for task_id, intersection in intersections.items():
+            union = query_size + len(self.tokens[task_id]) - intersection
+            similarity = intersection / union
+            if similarity > SIMILARITY_THRESHOLD:
+                scored.append((similarity, task_id))
+
+        return [(task_id, similarity) for similarity, task_id in heapq.nlargest(top_k, scored)]
+
+    def __len__(self) -> int:
+        return len(self.tokens)
+
+
+class PerUserIndexCache:
+    """
+    Índices por usuário, com LRU sobre usuários e reconstrução por TTL
+
+    Subclasses definem `columns`, `new_index` e `load_entries` e o gancho de
+    escrita que lhes serve (a entrada do índice vem da tarefa ou do
+    embedding); o índice precisa expor `add(task_id, entry)`,
+    `remove(task_id)` e o atributo `built_at`.
+    """
+
+    columns: tuple = ()
+
+    def __init__(self, max_users: int, ttl: float):
+        self.max_users = max_users
+        self.ttl = ttl
+        self._indexes: "OrderedDict[str, Any]" = OrderedDict()
+        # Escritas que chegam durante a construção são reaplicadas no final
+        self._pending: Dict[str, List[Tuple[str, Any]]] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+
+    def new_index(self) -> Any:
+        raise NotImplementedError
+
+    async def load_entries(self, rows) -> List[Tuple[str, Any]]:
+        """Converte as linhas de `columns` em (task_id, entrada do índice)"""
+        raise NotImplementedError
+
+    async def get(self, db: AsyncSession, user_id: str):
+        index = self._indexes.get(user_id)
+        if index is not None and time.monotonic() - index.built_at < self.ttl:
+            self._indexes.move_to_end(user_id)
+            return index
+
+        lock = self._locks.setdefault(user_id, asyncio.Lock())
+        async with lock:
+            index = self._indexes.get(user_id)
+            if index is None or time.monotonic() - index.built_at >= self.ttl:
+                index = await self._build(db, user_id)
+        return index
+
+    async def _build(self, db: AsyncSession, user_id: str):
+        self._pending[user_id] = []
+        try:
+            result = await db.execute(select(*self.columns).where(Task.user_id == user_id))
+            index = self.new_index()
+            for task_id, entry in await self.load_entries(result.all()):
+                index.add(task_id, entry)
+
+            for task_id, entry in self._pending[user_id]:
+                if entry is None:
+                    index.remove(task_id)
+                else:
+                    index.add(task_id, entry)
+        finally:
+            del self._pending[user_id]
+
+        self._indexes[user_id] = index
+        self._indexes.move_to_end(user_id)
+        while len(self._indexes) > self.max_users:
+            evicted, _ = self._indexes.popitem(last=False)
+            self._locks.pop(evicted, None)
+        return index
+
+    def _apply(self, user_id: str, task_id: str, entry: Any) -> None:
+        if user_id in self._pending:
+            self._pending[user_id].append((task_id, entry))
+        index = self._indexes.get(user_id)
+        if index is not None:
+            if entry is None:
+                index.remove(task_id)
+            else:
+                index.add(task_id, entry)
+
+    def on_task_deleted(self, user_id: str, task_id: str) -> None:
+        self._apply(user_id, task_id, None)
+
+
+class TaskSearchIndex(PerUserIndexCache):
+    """Índices invertidos por usuário, mantidos a cada tarefa salva"""
+
+    columns = (Task.id, Task.title, Task.description, Task.ai_title, Task.ai_summary, Task.raw_message)
+
+    def new_index(self) -> UserTaskIndex:
+        return UserTaskIndex()
+
+    async def load_entries(self, rows) -> List[Tuple[str, Any]]:
+        return [(row[0], task_tokens(*row[1:])) for row in rows]
+
+    def on_task_saved(self, task: Task) -> None:
+        tokens = task_tokens(task.title, task.description, task.ai_title, task.ai_summary, task.raw_message)
+        self._apply(task.user_id, task.id, tokens)
+
+
+# Instância global do índice de busca
+task_search_index = TaskSearchIndex(
+    max_users=settings.search_index_max_users,
+    ttl=settings.search_index_ttl_seconds
+)
@@ -0,0 +1,188 @@
+"""
+Contadores de tarefas por usuário (tabela user_task_counters)
+
+Cada escrita do TaskService aplica o delta com um UPDATE atômico
+(`coluna = coluna + delta`) na mesma transação da tarefa, depois do flush; a
+leitura das estatísticas é uma busca pela chave primária. O mesmo UPDATE
+incrementa `task_version`, inclusive quando nenhum contador muda (edição do
+título, por exemplo).
+
+`reconcile` recalcula os contadores a partir da tabela tasks e reporta (e, por
+padrão, corrige) a divergência. A correção de cada usuário trava a linha dos
+contadores antes de recontar, para não perder incrementos concorrentes.
+"""
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import func, select, update
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..models.models import Priority, Task, TaskStatus, UserTaskCounters
+from ..models.schemas import TaskStats
+
+STATUS_COLUMNS = {status: status.value.lower() for status in TaskStatus}
+PRIORITY_COLUMNS = {priority: priority.value.lower() for priority in Priority}
+COUNTER_COLUMNS = ("total", *STATUS_COLUMNS.values(), *PRIORITY_COLUMNS.values())
+
+# (status, prioridade) de uma tarefa antes ou depois da escrita
+TaskKey = Tuple[Optional[TaskStatus], Optional[Priority]]
+
+
+@dataclass
+class CounterDrift:
+    user_id: str
+    expected: Dict[str, int]
+    actual: Optional[Dict[str, int]]  # None: usuário sem linha de contadores
+
+    @property
+    def columns(self) -> List[str]:
+        if self.actual is None:
+            return list(COUNTER_COLUMNS)
+        return [column for column in COUNTER_COLUMNS if self.expected[column] != self.actual[column]]
+
+
+def _zero() -> Dict[str, int]:
+    return dict.fromkeys(COUNTER_COLUMNS, 0)
+
+
+def _add(counts: Dict[str, int], status: Optional[TaskStatus], priority: Optional[Priority], amount: int) -> None:
+    counts["total"] += amount
+    if status is not None:
+        counts[STATUS_COLUMNS[TaskStatus(status)]] += amount
+    if priority is not None:
+        counts[PRIORITY_COLUMNS[Priority(priority)]] += amount
+
+
+def _as_dict(counters: UserTaskCounters) -> Dict[str, int]:
+    return {column: getattr(counters, column) for column in COUNTER_COLUMNS}
+
+
+def _insert(dialect: str):
+    return postgresql_insert if dialect == "postgresql" else sqlite_insert
+
+
+async def count_from_tasks(db: AsyncSession, user_id: Optional[str] = None) -> Dict[str, Dict[str, int]]:
+    """Contagens recalculadas da tabela tasks (de um usuário ou de todos)"""
+    query = select(Task.user_id, Task.status, Task.priority, func.count()).group_by(
+        Task.user_id, Task.status, Task.priority
+    )
+    if user_id is not None:
+        query = query.where(Task.user_id == user_id)
+
+    counts: Dict[str, Dict[str, int]] = {}
+    for row_user_id, status, priority, count in (await db.execute(query)).all():
+        _add(counts.setdefault(row_user_id, _zero()), status, priority, count)
+    return counts
+
+
+async def apply(db: AsyncSession, user_id: str, before: Optional[TaskKey], after: Optional[TaskKey]) -> None:
+    """
+    Aplica a mudança de uma tarefa (None = inexistente antes/depois) aos
+    contadores do usuário. Chamar depois do flush e antes do commit da tarefa
+    """
+    await apply_many(db, user_id, [before] if before is not None else [], [after] if after is not None else [])
+
+
+async def apply_many(db: AsyncSession, user_id: str, removed: Iterable[TaskKey], added: Iterable[TaskKey]) -> None:
+    """Como `apply`, para várias tarefas removidas/adicionadas num único UPDATE"""
+    removed, added = list(removed), list(added)
+    if not removed and not added:
+        return
+    deltas = _zero()
+    for key in removed:
+        _add(deltas, *key, -1)
+    for key in added:
+        _add(deltas, *key, 1)
+
+    values = {column: getattr(UserTaskCounters, column) + delta for column, delta in deltas.items() if delta}
+    values["task_version"] = UserTaskCounters.task_version + 1
+    statement = update(UserTaskCounters).where(UserTaskCounters.user_id == user_id).values(values)
+    if (await db.execute(statement)).rowcount:
+        return
+
+    # Usuário sem linha (criado fora da API): inicializa a partir de tasks,
+    # que já inclui esta escrita. Se outra transação criou a linha no meio
+    # tempo, a contagem dela não vê esta escrita: aplica o delta.
+    if not await _initialize(db, user_id):
+        await db.execute(statement)
+
+
+async def _initialize(db: AsyncSession, user_id: str) -> bool:
+    counts = (await count_from_tasks(db, user_id)).get(user_id, _zero())
+    statement = (
+        _insert(db.get_bind().dialect.name)(UserTaskCounters)
+        .values(user_id=user_id, **counts)
+        .on_conflict_do_nothing(index_elements=["user_id"])
+    )
+    return bool((await db.execute(statement)).rowcount)
+
+
+async def get_counters(db: AsyncSession, user_id: str) -> Dict[str, int]:
+    """
+    Contadores do usuário e a versão das tarefas (chave "version");
+    inicializados a partir de tasks na primeira leitura, se faltarem.
+
+    A inicialização roda num savepoint da transação de quem chama, sem
+    confirmá-la, nos dois bancos: a linha fica gravada com o próximo commit
+    de `db`, e um rollback a descarta (até lá, outra leitura refaz a
+    contagem). No SQLite isso depende do BEGIN emitido antes do savepoint em
+    core.database; sem ele, o RELEASE confirmaria a transação. Uma transação
+    separada esperaria pelo lock de escrita que `db` pode estar segurando
+    (SQLite)
+    """
+    counters = await db.get(UserTaskCounters, user_id, populate_existing=True)
+    if counters is None:
+        async with db.begin_nested():
+            await _initialize(db, user_id)
+        counters = await db.get(UserTaskCounters, user_id)
+    return {**_as_dict(counters), "version": counters.task_version}
+
+
+def to_stats(counts: Dict[str, int]) -> TaskStats:
+    """Formato de /tasks/stats/overview: só os status e prioridades com tarefas"""
+    return TaskStats(
+        by_status={status.value: counts[column] for status, column in STATUS_COLUMNS.items() if counts[column]},
+        by_priority={priority.value: counts[column] for priority, column in PRIORITY_COLUMNS.items() if counts[column]},
+        total=counts["total"]
+    )
+
+
+async def reconcile(db: AsyncSession, fix: bool = True) -> List[CounterDrift]:
+    """
+    Compara os contadores com as contagens da tabela tasks e retorna os
+    usuários divergentes; com `fix`, regrava os contadores desses usuários
+    """
+    expected = await count_from_tasks(db)
+    stored = {counters.user_id: _as_dict(counters) for counters in (await db.execute(select(UserTaskCounters))).scalars()}
+
+    # Usuário sem tarefas e sem linha não diverge: a linha nasce na primeira escrita
+    drifts = [
+        CounterDrift(user_id, expected.get(user_id, _zero()), stored.get(user_id))
+        for user_id in sorted(expected.keys() | stored.keys())
+        if expected.get(user_id, _zero()) != stored.get(user_id)
+    ]
+    await db.rollback()
+
+    if fix:
+        for drift in drifts:
+            await _rebuild(db, drift.user_id)
+    return drifts
+
+
+async def _rebuild(db: AsyncSession, user_id: str) -> None:
+    # A trava faz as escritas concorrentes do usuário esperarem; as que já
+    # gravaram a tarefa sem aplicar o delta o aplicam depois, sobre a recontagem
+    locked = await db.execute(
+        select(UserTaskCounters.user_id).where(UserTaskCounters.user_id == user_id).with_for_update()
+    )
+    if locked.first() is None:
+        await _initialize(db, user_id)
+    else:
+        counts = (await count_from_tasks(db, user_id)).get(user_id, _zero())
+        await db.execute(
+            update(UserTaskCounters).where(UserTaskCounters.user_id == user_id)
+            .values(task_version=UserTaskCounters.task_version + 1, **counts)
+        )
+    await db.commit()
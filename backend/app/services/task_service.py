@@ -1,154 +1,315 @@
-from typing import List, Optional, Dict, Any
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_, func
+from typing import List, Optional, Dict, Any, Sequence, Tuple, Union
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import and_, select, delete, insert
 import uuid
-from ..models.models import Task, User, Priority, TaskStatus
-from ..models.schemas import TaskCreate, TaskUpdate, TaskFilters, TaskStats
+from ..models.models import Task, User, Priority, TaskStatus, utcnow
+from ..models.schemas import TaskCreate, TaskUpdate, TaskFilters, TaskStats, AIAnalysisResult, SearchMode
+from . import task_counters
 from .ai_service import ai_service
+from .embedding_service import embedding_service, task_text
+from .fulltext import apply_search
+from ..utils.pagination import (
+    InvalidCursorError, after_keyset, cursor_created_at, decode_cursor, encode_cursor, keyset_created_at
+)
+from .search_index import task_search_index
+from .vector_index import task_vector_index
+
+# Campos que alteram o texto usado no embedding
+EMBEDDED_FIELDS = {"title", "description"}
 
 
 class TaskService:
     @staticmethod
-    async def create_task(db: Session, user_id: str, task_data: TaskCreate) -> Task:
-        """Cria uma nova tarefa"""
-        # Analisar tarefa com IA
-        ai_analysis = await ai_service.analyze_task(task_data.raw_message or task_data.title)
-
-        # Criar tarefa no banco
-        db_task = Task(
-            id=str(uuid.uuid4()),
-            title=task_data.title,
-            description=task_data.description,
-            raw_message=task_data.raw_message,
-            priority=task_data.priority,
-            status=task_data.status,
-            user_id=user_id,
-            ai_title=ai_analysis.title,
-            ai_summary=ai_analysis.summary,
-            ai_priority=ai_analysis.suggested_priority,
-            ai_reasoning=ai_analysis.reasoning
-        )
+    async def create_task(
+        db: AsyncSession,
+        user_id: str,
+        task_data: TaskCreate,
+        ai_analysis: Optional[AIAnalysisResult] = None,
+        task_id: Optional[str] = None
+    ) -> Task:
+        """
+        Cria uma nova tarefa; reaproveita a análise de IA se o chamador já a
+        tiver. `task_id` permite ao chamador fixar o id (ex.: job do webhook)
+        """
+        db_task, embedding = await TaskService.prepare_task(user_id, task_data, ai_analysis, task_id)
+        await TaskService.add_task(db, db_task)
+        await db.commit()
+        TaskService.index_task(db_task, embedding)
 
+        return db_task
+
+    @staticmethod
+    async def prepare_task(
+        user_id: str,
+        task_data: TaskCreate,
+        ai_analysis: Optional[AIAnalysisResult] = None,
+        task_id: Optional[str] = None
+    ) -> Tuple[Task, Any]:
+        """Monta a tarefa (análise de IA, se faltar, e embedding) sem tocar no banco"""
+        if ai_analysis is None:
+            ai_analysis = await ai_service.analyze_task(task_data.raw_message or task_data.title)
+
+        db_task = TaskService._new_task(user_id, task_data, ai_analysis, task_id)
+        embedding = await TaskService._embed(db_task)
+        return db_task, embedding
+
+    @staticmethod
+    async def add_task(db: AsyncSession, db_task: Task) -> None:
+        """
+        Grava a tarefa e atualiza os contadores na transação corrente. O commit
+        fica com quem chama, que depois chama index_task
+        """
         db.add(db_task)
-        db.commit()
-        db.refresh(db_task)
+        await db.flush()
+        await task_counters.apply(db, db_task.user_id, None, (db_task.status, db_task.priority))
 
-        return db_task
+    @staticmethod
+    def index_task(db_task: Task, embedding) -> None:
+        """Atualiza os índices em memória depois do commit"""
+        task_search_index.on_task_saved(db_task)
+        task_vector_index.on_task_embedded(db_task.user_id, db_task.id, embedding)
+
+    @staticmethod
+    async def create_tasks_bulk(
+        db: AsyncSession,
+        user_id: str,
+        items: Sequence[Tuple[TaskCreate, AIAnalysisResult]],
+        task_ids: Optional[Sequence[Optional[str]]] = None
+    ) -> List[Union[Task, Exception]]:
+        """
+        Cria várias tarefas já analisadas com um único INSERT multi-linha e um
+        único commit. Se o INSERT em lote falhar, cada tarefa é inserida no
+        seu próprio savepoint: as válidas são gravadas e as demais voltam
+        como a exceção correspondente, na mesma posição. `task_ids` fixa o id
+        de cada tarefa (None gera um novo)
+        """
+        task_ids = task_ids or [None] * len(items)
+        tasks = [
+            TaskService._new_task(user_id, task_data, analysis, task_id=task_id)
+            for (task_data, analysis), task_id in zip(items, task_ids)
+        ]
+        if not tasks:
+            return []
+
+        vectors = await embedding_service.embed_many([
+            task_text(task.title, task.description, task.ai_title, task.ai_summary, task.raw_message)
+            for task in tasks
+        ])
+        rows = []
+        for task, vector in zip(tasks, vectors):
+            task.embedding = embedding_service.to_bytes(vector)
+            task.embedding_model = embedding_service.name
+            task.created_at = utcnow()
+            rows.append({column.key: getattr(task, column.key) for column in Task.__table__.columns})
+
+        results: List[Union[Task, Exception]] = list(tasks)
+        try:
+            async with db.begin_nested():
+                await db.execute(insert(Task).values(rows))
+        except SQLAlchemyError:
+            for position, row in enumerate(rows):
+                try:
+                    async with db.begin_nested():
+                        await db.execute(insert(Task).values(row))
+                except SQLAlchemyError as e:
+                    results[position] = e
+
+        created = [(task, vector) for task, vector in zip(results, vectors) if isinstance(task, Task)]
+        await task_counters.apply_many(db, user_id, [], [(task.status, task.priority) for task, _ in created])
+        await db.commit()
+
+        for task, vector in created:
+            task_search_index.on_task_saved(task)
+            task_vector_index.on_task_embedded(user_id, task.id, vector)
+
+        return results
 
     @staticmethod
-    def get_tasks(
-        db: Session,
+    async def get_tasks(
+        db: AsyncSession,
         user_id: str,
         filters: TaskFilters
-    ) -> List[Task]:
-        """Lista tarefas com filtros"""
+    ) -> Tuple[List[Task], Optional[str]]:
+        """
+        Lista tarefas com filtros, paginadas por cursor
 
-        query = db.query(Task).filter(Task.user_id == user_id)
+        Retorna a página e o cursor da próxima (None na última). Levanta
+        InvalidCursorError se o cursor não corresponder à consulta.
+        """
+        dialect = db.get_bind().dialect.name
+        query = select(Task).where(Task.user_id == user_id)
 
         # Aplicar filtros
         if filters.status:
-            query = query.filter(Task.status == filters.status)
+            query = query.where(Task.status == filters.status)
 
         if filters.priority:
-            query = query.filter(Task.priority == filters.priority)
+            query = query.where(Task.priority == filters.priority)
 
+        # Busca textual ordenada por relevância; sem busca, mais recentes primeiro
+        rank = None
         if filters.search:
-            search_term = f"%{filters.search}%"
-            query = query.filter(
-                or_(
-                    Task.title.ilike(search_term),
-                    Task.description.ilike(search_term),
-                    Task.raw_message.ilike(search_term),
-                    Task.ai_title.ilike(search_term),
-                    Task.ai_summary.ilike(search_term)
-                )
-            )
+            query, rank = apply_search(query, dialect, filters.search)
+            if rank is not None:
+                query = query.add_columns(rank.label("search_rank"))
+
+        if filters.cursor and rank is None:
+            created_at, last_id = decode_cursor(filters.cursor, 2)
+            created_at = cursor_created_at(created_at, dialect)
+            query = query.where(after_keyset(Task.created_at, Task.id, created_at, last_id))
+        elif filters.cursor:
+            last_rank, created_at, last_id = decode_cursor(filters.cursor, 3)
+            if not isinstance(last_rank, (int, float)):
+                raise InvalidCursorError("Cursor inválido")
+            created_at = cursor_created_at(created_at, dialect)
+            query = query.where(after_keyset(Task.created_at, Task.id, created_at, last_id, rank, last_rank))
+        query = query.add_columns(keyset_created_at(Task.created_at, dialect).label("cursor_created_at"))
 
-        # Ordenar por data de criação (mais recentes primeiro)
-        query = query.order_by(Task.created_at.desc())
+        order = [Task.created_at.desc(), Task.id.desc()]
+        if rank is not None:
+            order.insert(0, rank)
 
-        # Aplicar paginação
-        query = query.offset(filters.offset).limit(filters.limit)
+        # Um item a mais indica se há próxima página
+        result = await db.execute(query.order_by(*order).limit(filters.limit + 1))
+        rows = result.all()
 
-        return query.all()
+        next_cursor = None
+        if len(rows) > filters.limit:
+            rows = rows[:filters.limit]
+            last = rows[-1]
+            keys = (last.cursor_created_at, last[0].id)
+            next_cursor = encode_cursor(*keys) if rank is None else encode_cursor(last.search_rank, *keys)
+
+        return [row[0] for row in rows], next_cursor
 
     @staticmethod
-    def get_task_by_id(db: Session, task_id: str, user_id: str) -> Optional[Task]:
+    async def get_task_by_id(db: AsyncSession, task_id: str, user_id: str) -> Optional[Task]:
         """Busca tarefa por ID"""
-        return db.query(Task).filter(
-            and_(Task.id == task_id, Task.user_id == user_id)
-        ).first()
+        result = await db.execute(
+            select(Task).where(and_(Task.id == task_id, Task.user_id == user_id))
+        )
+        return result.scalar_one_or_none()
 
     @staticmethod
-    def update_task(
-        db: Session,
+    async def update_task(
+        db: AsyncSession,
         task_id: str,
         user_id: str,
         task_data: TaskUpdate
     ) -> Optional[Task]:
         """Atualiza uma tarefa"""
-        db_task = db.query(Task).filter(
-            and_(Task.id == task_id, Task.user_id == user_id)
-        ).first()
+        db_task = await TaskService.get_task_by_id(db, task_id, user_id)
 
         if not db_task:
             return None
 
+        before = (db_task.status, db_task.priority)
+
         # Atualizar campos
-        for field, value in task_data.model_dump(exclude_unset=True).items():
+        changes = task_data.model_dump(exclude_unset=True)
+        for field, value in changes.items():
             setattr(db_task, field, value)
 
-        db.commit()
-        db.refresh(db_task)
+        embedding = None
+        if EMBEDDED_FIELDS & changes.keys():
+            embedding = await TaskService._embed(db_task)
+
+        await db.flush()
+        await task_counters.apply(db, user_id, before, (db_task.status, db_task.priority))
+        await db.commit()
+        await db.refresh(db_task)
+
+        task_search_index.on_task_saved(db_task)
+        if embedding is not None:
+            task_vector_index.on_task_embedded(user_id, db_task.id, embedding)
 
         return db_task
 
     @staticmethod
-    def delete_task(db: Session, task_id: str, user_id: str) -> bool:
+    async def delete_task(db: AsyncSession, task_id: str, user_id: str) -> bool:
         """Deleta uma tarefa"""
-        result = db.query(Task).filter(
-            and_(Task.id == task_id, Task.user_id == user_id)
-        ).delete()
+        result = await db.execute(
+            delete(Task)
+            .where(and_(Task.id == task_id, Task.user_id == user_id))
+            .returning(Task.status, Task.priority)
+        )
+        removed = result.first()
+        if removed is not None:
+            await task_counters.apply(db, user_id, tuple(removed), None)
+
+        await db.commit()
 
-        db.commit()
-        return result > 0
+        deleted = removed is not None
+        if deleted:
+            task_search_index.on_task_deleted(user_id, task_id)
+            task_vector_index.on_task_deleted(user_id, task_id)
+        return deleted
 
     @staticmethod
-    def get_task_stats(db: Session, user_id: str) -> TaskStats:
-        """Obtém estatísticas das tarefas"""
-        # Estatísticas por status
-        status_stats = db.query(
-            Task.status,
-            func.count(Task.id).label('count')
-        ).filter(Task.user_id == user_id).group_by(Task.status).all()
-
-        # Estatísticas por prioridade
-        priority_stats = db.query(
-            Task.priority,
-            func.count(Task.id).label('count')
-        ).filter(Task.user_id == user_id).group_by(Task.priority).all()
-
-        # Total de tarefas
-        total = db.query(func.count(Task.id)).filter(Task.user_id == user_id).scalar()
-
-        return TaskStats(
-            by_status={status.value: count for status, count in status_stats},
-            by_priority={priority.value: count for priority, count in priority_stats},
-            total=total or 0
+    def _new_task(
+        user_id: str,
+        task_data: TaskCreate,
+        ai_analysis: AIAnalysisResult,
+        task_id: Optional[str] = None
+    ) -> Task:
+        return Task(
+            id=task_id or str(uuid.uuid4()),
+            title=task_data.title,
+            description=task_data.description,
+            raw_message=task_data.raw_message,
+            priority=task_data.priority,
+            status=task_data.status,
+            user_id=user_id,
+            ai_title=ai_analysis.title,
+            ai_summary=ai_analysis.summary,
+            ai_priority=ai_analysis.suggested_priority,
+            ai_reasoning=ai_analysis.reasoning
         )
 
+    @staticmethod
+    async def _embed(db_task: Task):
+        """Calcula o embedding da tarefa e o grava nas colunas correspondentes"""
+        vector = await embedding_service.embed(task_text(
+            db_task.title, db_task.description, db_task.ai_title, db_task.ai_summary, db_task.raw_message
+        ))
+        db_task.embedding = embedding_service.to_bytes(vector)
+        db_task.embedding_model = embedding_service.name
+        return vector
+
+    @staticmethod
+    async def get_task_stats(db: AsyncSession, user_id: str) -> TaskStats:
+        """Obtém estatísticas das tarefas (contadores mantidos a cada escrita)"""
+        return task_counters.to_stats(await task_counters.get_counters(db, user_id))
+
     @staticmethod
     async def search_similar_tasks(
-        db: Session,
+        db: AsyncSession,
         query: str,
         user_id: str,
-        limit: int = 5
+        limit: int = 5,
+        mode: SearchMode = SearchMode.LEXICAL
     ) -> List[Dict[str, Any]]:
-        """Busca tarefas similares usando IA"""
-        # Buscar tarefas do usuário
-        tasks = db.query(Task).filter(Task.user_id == user_id).all()
+        """
+        Busca tarefas similares: Jaccard sobre o índice invertido (lexical) ou
+        cosseno sobre os embeddings do usuário (semantic)
+        """
+        if mode == SearchMode.SEMANTIC:
+            matches = await task_vector_index.search(db, user_id, await embedding_service.embed(query), limit)
+        else:
+            index = await task_search_index.get(db, user_id)
+            matches = index.search(query, limit)
+        if not matches:
+            return []
 
-        # Usar serviço de IA para busca semântica
-        similar_tasks = await ai_service.search_similar_tasks(query, tasks, limit)
+        # Carregar apenas as tarefas retornadas
+        result = await db.execute(
+            select(Task).where(Task.id.in_([task_id for task_id, _ in matches]))
+        )
+        tasks_by_id = {task.id: task for task in result.scalars()}
 
-        return similar_tasks
+        return [
+            {"task": tasks_by_id[task_id], "similarity": similarity}
+            for task_id, similarity in matches
+            if task_id in tasks_by_id
+        ]
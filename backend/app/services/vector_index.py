@@ -0,0 +1,270 @@
+"""
+Índice vetorial por usuário para a busca semântica de tarefas
+
+Os embeddings de um usuário ficam numa matriz float32 contígua (uma linha por
+tarefa); a consulta é um único produto matriz-vetor seguido de
+`np.argpartition` para o top-k, sem ordenar todos os scores.
+
+Acima de `faiss_min_vectors` linhas, e se o faiss estiver instalado, a busca
+passa para um índice HNSW (aproximado). A construção roda em segundo plano,
+no threadpool e sobre uma cópia da matriz; até ela terminar, todas as buscas,
+inclusive a que a disparou, usam NumPy (ou o índice anterior). As escritas
+feitas nesse intervalo são reaplicadas ao final; depois disso o índice é
+mantido incrementalmente: inserções entram no próximo uso e remoções viram
+lápides até a reconstrução.
+"""
+import asyncio
+import logging
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from fastapi.concurrency import run_in_threadpool
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..core.config import settings
+from ..models.models import Task
+from .embedding_service import embedding_service, task_text
+from .search_index import PerUserIndexCache
+
+# Tentar importar FAISS
+try:
+    import faiss
+    FAISS_AVAILABLE = True
+except ImportError:
+    FAISS_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+SEMANTIC_SIMILARITY_THRESHOLD = 0.2
+FAISS_HNSW_NEIGHBORS = 32
+FAISS_EF_SEARCH = 128
+# Fração de lápides que dispara a reconstrução do índice FAISS
+FAISS_MAX_TOMBSTONE_RATIO = 0.2
+
+
+def _build_hnsw(matrix: np.ndarray):
+    index = faiss.IndexHNSWFlat(matrix.shape[1], FAISS_HNSW_NEIGHBORS, faiss.METRIC_INNER_PRODUCT)
+    index.hnsw.efSearch = FAISS_EF_SEARCH
+    index.add(matrix)
+    return index
+
+
+class UserVectorIndex:
+    """Matriz de embeddings das tarefas de um usuário"""
+
+    def __init__(self, dimensions: int, faiss_min_vectors: int = 0, initial_capacity: int = 64):
+        self.dimensions = dimensions
+        self.faiss_min_vectors = faiss_min_vectors
+        self.matrix = np.zeros((initial_capacity, dimensions), dtype=np.float32)
+        self.ids: List[str] = []
+        self.rows: Dict[str, int] = {}
+        self.built_at = time.monotonic()
+
+        self._faiss = None
+        self._faiss_ids: List[Optional[str]] = []  # rótulo FAISS -> task_id (None = lápide)
+        self._faiss_labels: Dict[str, int] = {}
+        self._faiss_pending: Dict[str, None] = {}  # conjunto ordenado de inserções
+        self._tombstones = 0
+        self._journal: Optional[List[str]] = None  # escritas durante a construção
+        self._build_task: Optional[asyncio.Task] = None
+
+    def add(self, task_id: str, vector: np.ndarray) -> None:
+        row = self.rows.get(task_id)
+        if row is None:
+            row = len(self.ids)
+            if row == len(self.matrix):
+                grown = np.zeros((2 * len(self.matrix), self.dimensions), dtype=np.float32)
+                grown[:row] = self.matrix[:row]
+                self.matrix = grown
+            self.ids.append(task_id)
+            self.rows[task_id] = row
+        self.matrix[row] = vector
+
+        if self._journal is not None:
+            self._journal.append(task_id)
+        if self._faiss is not None:
+            self._bury(task_id)
+            self._faiss_pending[task_id] = None
+
+    def remove(self, task_id: str) -> None:
+        row = self.rows.pop(task_id, None)
+        if row is None:
+            return
+
+        # A última linha ocupa o lugar da removida
+        last = len(self.ids) - 1
+        if row != last:
+            moved = self.ids[last]
+            self.matrix[row] = self.matrix[last]
+            self.ids[row] = moved
+            self.rows[moved] = row
+        self.ids.pop()
+
+        if self._journal is not None:
+            self._journal.append(task_id)
+        if self._faiss is not None:
+            self._bury(task_id)
+            self._faiss_pending.pop(task_id, None)
+
+    def _bury(self, task_id: str) -> None:
+        label = self._faiss_labels.pop(task_id, None)
+        if label is not None:
+            self._faiss_ids[label] = None
+            self._tombstones += 1
+
+    @property
+    def needs_faiss_build(self) -> bool:
+        building = self._journal is not None or (self._build_task is not None and not self._build_task.done())
+        if not FAISS_AVAILABLE or building or len(self.ids) < max(self.faiss_min_vectors, 1):
+            return False
+        return self._faiss is None or self._tombstones > FAISS_MAX_TOMBSTONE_RATIO * len(self._faiss_ids)
+
+    def start_faiss_build(self) -> None:
+        """Dispara a (re)construção do HNSW em segundo plano, se necessária; não espera"""
+        if self.needs_faiss_build:
+            self._build_task = asyncio.create_task(self.build_faiss())
+            self._build_task.add_done_callback(self._build_done)
+
+    @staticmethod
+    def _build_done(task: asyncio.Task) -> None:
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f"Erro ao construir o índice FAISS: {task.exception()}")
+
+    async def build_faiss(self) -> None:
+        """(Re)constrói o HNSW fora do event loop; enquanto isso as buscas usam o índice anterior ou NumPy"""
+        ids = list(self.ids)
+        snapshot = self.matrix[:len(ids)].copy()
+        self._journal = []
+        try:
+            index = await run_in_threadpool(_build_hnsw, snapshot)
+        finally:
+            journal, self._journal = self._journal, None
+
+        self._faiss = index
+        self._faiss_ids = ids
+        self._faiss_labels = {task_id: label for label, task_id in enumerate(ids)}
+        self._faiss_pending = {}
+        self._tombstones = 0
+        for task_id in dict.fromkeys(journal):
+            self._bury(task_id)
+            if task_id in self.rows:
+                self._faiss_pending[task_id] = None
+
+    def _faiss_index(self):
+        """Índice FAISS com as inserções pendentes aplicadas, ou None se não se aplica"""
+        if self._faiss is None or len(self.ids) < max(self.faiss_min_vectors, 1):
+            return None
+
+        if self._faiss_pending:
+            pending = list(self._faiss_pending)
+            self._faiss.add(self.matrix[[self.rows[task_id] for task_id in pending]])
+            for task_id in pending:
+                self._faiss_labels[task_id] = len(self._faiss_ids)
+                self._faiss_ids.append(task_id)
+            self._faiss_pending = {}
+        return self._faiss
+
+    def search(self, query: np.ndarray, top_k: int) -> List[Tuple[str, float]]:
+        """Retorna (task_id, cosseno) das top_k tarefas acima do limiar"""
+        size = len(self.ids)
+        if size == 0 or top_k <= 0:
+            return []
+
+        index = self._faiss_index()
+        if index is not None:
+            matches = self._search_faiss(index, query, top_k)
+            if matches is not None:
+                return matches
+
+        scores = self.matrix[:size] @ query
+        k = min(top_k, size)
+        if k < size:
+            top = np.argpartition(scores, size - k)[size - k:]
+        else:
+            top = np.arange(size)
+        top = top[np.argsort(scores[top])[::-1]]
+
+        return [
+            (self.ids[row], float(scores[row]))
+            for row in top
+            if scores[row] > SEMANTIC_SIMILARITY_THRESHOLD
+        ]
+
+    def _search_faiss(self, index, query: np.ndarray, top_k: int) -> Optional[List[Tuple[str, float]]]:
+        # Pede folga para compensar lápides; sem resultados suficientes, cai na busca exata
+        wanted = min(top_k * 2 + 10, len(self._faiss_ids))
+        scores, labels = index.search(query.reshape(1, -1).astype(np.float32, copy=False), wanted)
+
+        matches = []
+        for score, label in zip(scores[0], labels[0]):
+            if label < 0:
+                break
+            task_id = self._faiss_ids[label]
+            if task_id is None:
+                continue
+            if score <= SEMANTIC_SIMILARITY_THRESHOLD:
+                break
+            matches.append((task_id, float(score)))
+            if len(matches) == top_k:
+                return matches
+
+        if len(matches) < top_k and self._tombstones:
+            return None
+        return matches
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+
+class TaskVectorIndex(PerUserIndexCache):
+    """
+    Índices vetoriais por usuário; usa os embeddings salvos nas tarefas e
+    calcula, em lote, os que estiverem ausentes ou forem de outro backend.
+    Mantido por `on_task_embedded`: o embedding é uma coluna adiada e quem
+    salva a tarefa já tem o vetor
+    """
+
+    columns = (
+        Task.id, Task.embedding, Task.embedding_model,
+        Task.title, Task.description, Task.ai_title, Task.ai_summary, Task.raw_message
+    )
+
+    def __init__(self, max_users: int, ttl: float, faiss_min_vectors: int):
+        super().__init__(max_users, ttl)
+        self.faiss_min_vectors = faiss_min_vectors
+
+    def new_index(self) -> UserVectorIndex:
+        return UserVectorIndex(embedding_service.dimensions, self.faiss_min_vectors)
+
+    async def load_entries(self, rows) -> List[Tuple[str, np.ndarray]]:
+        entries = []
+        missing = []
+        for row in rows:
+            vector = embedding_service.from_bytes(row[1], row[2])
+            if vector is None:
+                missing.append(row)
+            else:
+                entries.append((row[0], vector))
+
+        if missing:
+            vectors = await embedding_service.embed_many([task_text(*row[3:]) for row in missing])
+            entries.extend((row[0], vector) for row, vector in zip(missing, vectors))
+        return entries
+
+    async def search(self, db: AsyncSession, user_id: str, query: np.ndarray, top_k: int) -> List[Tuple[str, float]]:
+        index = await self.get(db, user_id)
+        index.start_faiss_build()
+        return index.search(query, top_k)
+
+    def on_task_embedded(self, user_id: str, task_id: str, vector: np.ndarray) -> None:
+        self._apply(user_id, task_id, vector)
+
+
+# Instância global do índice vetorial
+task_vector_index = TaskVectorIndex(
+    max_users=settings.search_index_max_users,
+    ttl=settings.search_index_ttl_seconds,
+    faiss_min_vectors=settings.faiss_min_vectors
+)
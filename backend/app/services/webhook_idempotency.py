@@ -0,0 +1,99 @@
+"""
+Idempotência do webhook sobre o índice único (user_id, idempotency_key) de
+webhook_jobs
+
+A chave vem do header Idempotency-Key ou, sem ele, de (from_user, timestamp,
+sha256 da mensagem); sem timestamp não há como distinguir um reenvio de uma
+mensagem repetida de propósito, e a mensagem não é deduplicada. O job gravado
+na primeira entrega serve de registro: um reenvio devolve o mesmo job (e a
+mesma tarefa) sem nova análise de IA nem escrita em tasks.
+
+Jobs concluídos (DONE/FAILED) não mudam mais e ficam num cache LRU em memória;
+um reenvio deles não consulta o banco. Chaves novas vão direto para o INSERT
+... ON CONFLICT DO NOTHING, que é a verificação definitiva entre processos.
+"""
+import hashlib
+import json
+from typing import Any, Dict, Iterable, List, Optional
+
+from sqlalchemy import and_, select
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..core.config import settings
+from ..models.models import WebhookJob, WebhookJobStatus
+from ..models.schemas import WebhookPayload
+from ..utils.cache import TTLCache
+
+TERMINAL_STATUSES = (WebhookJobStatus.DONE, WebhookJobStatus.FAILED)
+
+
+def _insert(dialect: str):
+    return postgresql_insert if dialect == "postgresql" else sqlite_insert
+
+
+class WebhookIdempotency:
+    def __init__(self, maxsize: int, ttl: float):
+        # (user_id, chave) -> WebhookJob concluído
+        self.finished = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.replays = 0
+
+    @staticmethod
+    def key_for(payload: WebhookPayload, idempotency_key: Optional[str] = None) -> Optional[str]:
+        if idempotency_key:
+            raw = json.dumps(["header", idempotency_key])
+        elif payload.timestamp:
+            message_hash = hashlib.sha256(payload.message.encode("utf-8")).hexdigest()
+            raw = json.dumps(["message", payload.from_user, payload.timestamp, message_hash])
+        else:
+            return None
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def remember(self, job: WebhookJob) -> None:
+        if job.idempotency_key is not None and job.status in TERMINAL_STATUSES:
+            self.finished.set((job.user_id, job.idempotency_key), job)
+
+    async def lookup(self, db: AsyncSession, user_id: str, keys: Iterable[str]) -> Dict[str, WebhookJob]:
+        """Jobs já registrados para as chaves (cache primeiro, o resto numa única consulta)"""
+        found: Dict[str, WebhookJob] = {}
+        missing = []
+        for key in set(keys):
+            job = self.finished.get((user_id, key))
+            if job is not None:
+                found[key] = job
+            else:
+                missing.append(key)
+
+        if missing:
+            result = await db.execute(
+                select(WebhookJob).where(and_(WebhookJob.user_id == user_id, WebhookJob.idempotency_key.in_(missing)))
+            )
+            for job in result.scalars():
+                found[job.idempotency_key] = job
+                self.remember(job)
+        return found
+
+    async def insert_jobs(self, db: AsyncSession, rows: List[Dict[str, Any]]) -> List[WebhookJob]:
+        """
+        Insere os jobs ignorando chaves já registradas; retorna só os inseridos
+        (a ordem não é garantida). O commit fica com quem chama
+        """
+        if not rows:
+            return []
+        statement = (
+            _insert(db.get_bind().dialect.name)(WebhookJob)
+            .values(rows)
+            .on_conflict_do_nothing(index_elements=["user_id", "idempotency_key"])
+            .returning(WebhookJob)
+        )
+        return list((await db.scalars(statement)).all())
+
+    def stats(self) -> Dict[str, Any]:
+        return {"replays": self.replays, "cache": self.finished.stats()}
+
+
+webhook_idempotency = WebhookIdempotency(
+    maxsize=settings.webhook_idempotency_cache_size,
+    ttl=settings.webhook_idempotency_cache_ttl_seconds
+)
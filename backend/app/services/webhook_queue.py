@@ -0,0 +1,280 @@
+"""
+Fila durável do webhook sobre a tabela webhook_jobs (outbox)
+
+POST /webhook/message grava o job e responde 202; workers assíncronos (no
+lifespan da API ou em scripts/webhook_worker.py) reivindicam os jobs, analisam
+a mensagem fora de qualquer transação e depois criam a tarefa e marcam o job
+como concluído numa transação curta.
+
+- Reivindicação: UPDATE ... WHERE id = (SELECT ... FOR UPDATE SKIP LOCKED)
+  no PostgreSQL; no SQLite o próprio UPDATE serializa os workers.
+- Falhas transitórias voltam para PENDING com backoff exponencial (com
+  jitter) até `webhook_job_max_attempts`; payload inválido falha direto.
+- Um job em PROCESSING há mais de `webhook_job_visibility_timeout_seconds`
+  (worker que caiu) volta a ser reivindicável. O id da tarefa é fixado no
+  enfileiramento, então reprocessar nunca cria uma tarefa duplicada.
+- Reenvios do gateway com a mesma chave de idempotência
+  (services.webhook_idempotency) devolvem o job original.
+"""
+import asyncio
+import logging
+import random
+import uuid
+from datetime import timedelta
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import and_, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..core.config import settings
+from ..core.database import AsyncSessionLocal
+from ..models.models import Task, WebhookJob, WebhookJobStatus, utcnow
+from ..models.schemas import WebhookPayload
+from .task_service import TaskService
+from .webhook_idempotency import webhook_idempotency
+from .webhook_service import WebhookService
+
+logger = logging.getLogger(__name__)
+
+
+class WebhookQueue:
+    def __init__(
+        self,
+        workers: int,
+        poll_interval: float,
+        max_attempts: int,
+        retry_base: float,
+        retry_max: float,
+        visibility_timeout: float
+    ):
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.max_attempts = max_attempts
+        self.retry_base = retry_base
+        self.retry_max = retry_max
+        self.visibility_timeout = visibility_timeout
+
+        self._tasks: List[asyncio.Task] = []
+        self._stopping = False
+        self._wakeup = asyncio.Event()
+
+        # Métricas do processo
+        self.processed = 0
+        self.retried = 0
+        self.failed = 0
+
+    async def enqueue(
+        self,
+        db: AsyncSession,
+        payload: WebhookPayload,
+        user_id: str,
+        idempotency_key: Optional[str] = None
+    ) -> Tuple[WebhookJob, bool]:
+        """
+        Grava o job; retorna (job, reenvio). Um reenvio (mesma chave de
+        idempotência) devolve o job original sem enfileirar nada
+        """
+        key = webhook_idempotency.key_for(payload, idempotency_key)
+        # Reenvio de job concluído: responde do cache, sem tocar no banco
+        finished = webhook_idempotency.finished.get((user_id, key)) if key is not None else None
+        if finished is not None:
+            webhook_idempotency.replays += 1
+            return finished, True
+
+        now = utcnow()
+        inserted = await webhook_idempotency.insert_jobs(db, [{
+            "id": str(uuid.uuid4()),
+            "user_id": user_id,
+            "payload": payload.model_dump_json(),
+            "status": WebhookJobStatus.PENDING,
+            "attempts": 0,
+            "next_attempt_at": now,
+            "task_id": str(uuid.uuid4()),
+            "idempotency_key": key,
+            "created_at": now
+        }])
+        await db.commit()
+
+        if not inserted:
+            # Chave já registrada (reenvio de um job ainda não concluído)
+            webhook_idempotency.replays += 1
+            return (await webhook_idempotency.lookup(db, user_id, [key]))[key], True
+
+        # Acorda um worker deste processo sem esperar o próximo polling
+        self._wakeup.set()
+        return inserted[0], False
+
+    @staticmethod
+    async def get_job(db: AsyncSession, job_id: str, user_id: str) -> Optional[WebhookJob]:
+        result = await db.execute(
+            select(WebhookJob).where(and_(WebhookJob.id == job_id, WebhookJob.user_id == user_id))
+        )
+        return result.scalar_one_or_none()
+
+    async def claim(self) -> Optional[str]:
+        """Reivindica o próximo job disponível; retorna o id ou None"""
+        now = utcnow()
+        claimable = or_(
+            and_(WebhookJob.status == WebhookJobStatus.PENDING, WebhookJob.next_attempt_at <= now),
+            and_(
+                WebhookJob.status == WebhookJobStatus.PROCESSING,
+                WebhookJob.locked_at < now - timedelta(seconds=self.visibility_timeout)
+            ),
+        )
+        candidate = (
+            select(WebhookJob.id)
+            .where(claimable)
+            .order_by(WebhookJob.next_attempt_at)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+        statement = (
+            update(WebhookJob)
+            .where(WebhookJob.id == candidate)
+            .where(claimable)
+            .values(status=WebhookJobStatus.PROCESSING, locked_at=now, attempts=WebhookJob.attempts + 1)
+            .returning(WebhookJob.id)
+            .execution_options(synchronize_session=False)
+        )
+        async with AsyncSessionLocal() as db:
+            job_id = (await db.execute(statement)).scalar_one_or_none()
+            await db.commit()
+        return job_id
+
+    async def process(self, job_id: str) -> None:
+        # A análise de IA pode levar segundos: nenhuma sessão (nem conexão do
+        # pool) fica aberta enquanto ela roda, como em build_answer_context
+        async with AsyncSessionLocal() as db:
+            job = await db.get(WebhookJob, job_id)
+            user_id, task_id, attempts, raw_payload = job.user_id, job.task_id, job.attempts, job.payload
+
+            if attempts > self.max_attempts:
+                await self._fail(db, job_id, attempts, "Número máximo de tentativas excedido", retry=False)
+                return
+
+            try:
+                payload = WebhookPayload.model_validate_json(raw_payload)
+                task_data = WebhookService.task_data_from_message(payload.message)
+            except ValueError as e:
+                await self._fail(db, job_id, attempts, str(e), retry=False)
+                return
+
+        try:
+            db_task, embedding = await TaskService.prepare_task(user_id, task_data, task_id=task_id)
+        except Exception as e:
+            async with AsyncSessionLocal() as db:
+                await self._fail(db, job_id, attempts, f"{type(e).__name__}: {e}", retry=True)
+            return
+
+        async with AsyncSessionLocal() as db:
+            # Tarefa e conclusão do job no mesmo commit
+            job = await db.get(WebhookJob, job_id)
+            job.status = WebhookJobStatus.DONE
+            job.finished_at = utcnow()
+            job.last_error = None
+            try:
+                await TaskService.add_task(db, db_task)
+                await db.commit()
+            except Exception as e:
+                await db.rollback()
+                if await db.get(Task, task_id) is not None:
+                    # Outro worker concluiu o mesmo job (reivindicado após o timeout)
+                    await self._finish(db, job_id)
+                    return
+                await self._fail(db, job_id, attempts, f"{type(e).__name__}: {e}", retry=True)
+                return
+
+        TaskService.index_task(db_task, embedding)
+        webhook_idempotency.remember(job)
+        self.processed += 1
+
+    async def _finish(self, db: AsyncSession, job_id: str) -> None:
+        await db.execute(
+            update(WebhookJob).where(WebhookJob.id == job_id)
+            .values(status=WebhookJobStatus.DONE, finished_at=utcnow(), last_error=None)
+        )
+        await db.commit()
+
+    async def _fail(self, db: AsyncSession, job_id: str, attempts: int, error: str, retry: bool) -> None:
+        if retry and attempts < self.max_attempts:
+            delay = min(self.retry_max, self.retry_base * 2 ** (attempts - 1))
+            delay *= random.uniform(0.5, 1.0)
+            values = {"status": WebhookJobStatus.PENDING, "next_attempt_at": utcnow() + timedelta(seconds=delay)}
+            self.retried += 1
+            logger.warning(f"Job do webhook {job_id} falhou (tentativa {attempts}), nova tentativa em {delay:.1f}s: {error}")
+        else:
+            values = {"status": WebhookJobStatus.FAILED, "finished_at": utcnow()}
+            self.failed += 1
+            logger.error(f"Job do webhook {job_id} falhou definitivamente após {attempts} tentativa(s): {error}")
+
+        await db.execute(
+            update(WebhookJob).where(WebhookJob.id == job_id).values(locked_at=None, last_error=error, **values)
+        )
+        await db.commit()
+
+    async def drain(self) -> int:
+        """Processa os jobs disponíveis agora, em sequência (scripts e testes)"""
+        count = 0
+        while (job_id := await self.claim()) is not None:
+            await self.process(job_id)
+            count += 1
+        return count
+
+    async def _worker(self) -> None:
+        while not self._stopping:
+            self._wakeup.clear()
+            try:
+                job_id = await self.claim()
+                if job_id is not None:
+                    await self.process(job_id)
+                    continue
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Erro no worker do webhook")
+
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    def start(self, workers: Optional[int] = None) -> None:
+        """Inicia os workers no event loop atual"""
+        workers = self.workers if workers is None else workers
+        if self._tasks or workers <= 0:
+            return
+        self._stopping = False
+        self._wakeup = asyncio.Event()
+        self._tasks = [asyncio.create_task(self._worker(), name=f"webhook-worker-{i}") for i in range(workers)]
+        logger.info(f"{workers} worker(s) da fila do webhook iniciados")
+
+    async def stop(self, timeout: float = 10.0) -> None:
+        """Espera os jobs em andamento por até `timeout`; os restantes voltam à fila pelo timeout de visibilidade"""
+        if not self._tasks:
+            return
+        self._stopping = True
+        self._wakeup.set()
+        _, pending = await asyncio.wait(self._tasks, timeout=timeout)
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        self._tasks = []
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "workers": len(self._tasks),
+            "processed": self.processed,
+            "retried": self.retried,
+            "failed": self.failed
+        }
+
+
+webhook_queue = WebhookQueue(
+    workers=settings.webhook_workers,
+    poll_interval=settings.webhook_poll_interval_seconds,
+    max_attempts=settings.webhook_job_max_attempts,
+    retry_base=settings.webhook_retry_base_seconds,
+    retry_max=settings.webhook_retry_max_seconds,
+    visibility_timeout=settings.webhook_job_visibility_timeout_seconds
+)
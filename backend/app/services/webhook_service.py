@@ -1,42 +1,205 @@
-from typing import Dict, Any
-from sqlalchemy.orm import Session
-from ..models.schemas import WebhookPayload, TaskCreate, Priority, TaskStatus
+import asyncio
+import uuid
+from typing import Dict, Any, List, Optional
+from sqlalchemy import delete, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..core.config import settings
+from ..models.models import Task, User, WebhookJob, WebhookJobStatus, utcnow
+from ..models.schemas import (
+    WebhookPayload, TaskCreate, Priority, TaskStatus,
+    WebhookBatchItemResult, WebhookBatchItemStatus, WebhookBatchResponse
+)
+from . import message_classifier
+from .ai_service import ai_service
 from .task_service import TaskService
+from .webhook_idempotency import webhook_idempotency
 
 
 class WebhookService:
     @staticmethod
-    async def process_webhook_message(db: Session, payload: WebhookPayload, user_id: str) -> Dict[str, Any]:
+    async def process_webhook_batch(
+        db: AsyncSession,
+        payloads: List[WebhookPayload],
+        user_id: str,
+        idempotency_key: Optional[str] = None
+    ) -> WebhookBatchResponse:
         """
-        Processa mensagem recebida via webhook e cria tarefa automaticamente
+        Processa um lote de mensagens: classifica todas, analisa as tarefas
+        com no máximo `webhook_batch_concurrency` chamadas de IA simultâneas e
+        grava as tarefas com um único INSERT. A falha de um item não afeta os
+        demais; cada um tem seu resultado na posição correspondente
+
+        Mensagens já recebidas (mesma chave de idempotência: `idempotency_key`
+        do lote + posição, ou from_user/timestamp) voltam como duplicate, sem
+        nova análise de IA
         """
-        try:
-            # Criar dados da tarefa a partir da mensagem
-            task_data = TaskCreate(
-                title=payload.message[:100] + "..." if len(payload.message) > 100 else payload.message,
-                description=payload.message,
-                raw_message=payload.message,
-                priority=Priority.MEDIUM,  # Prioridade padrão, pode ser ajustada pela IA
-                status=TaskStatus.PENDING
+        if await db.get(User, user_id) is None:
+            raise ValueError("Usuário não encontrado")
+
+        results: List[Optional[WebhookBatchItemResult]] = [None] * len(payloads)
+
+        def fail(index: int, error: str) -> None:
+            results[index] = WebhookBatchItemResult(
+                index=index, status=WebhookBatchItemStatus.FAILED, error=f"Erro ao processar mensagem: {error}"
             )
 
-            # Criar tarefa
-            task = await TaskService.create_task(db, user_id, task_data)
+        def duplicate(index: int, job: WebhookJob) -> None:
+            webhook_idempotency.replays += 1
+            results[index] = WebhookBatchItemResult(
+                index=index,
+                status=WebhookBatchItemStatus.DUPLICATE,
+                job_id=job.id,
+                task_id=job.task_id if job.status == WebhookJobStatus.DONE else None
+            )
+
+        valid = []
+        for index, payload in enumerate(payloads):
+            try:
+                payload = WebhookService.validate_webhook_payload(payload.model_dump())
+            except ValueError as e:
+                fail(index, str(e))
+                continue
+            key = webhook_idempotency.key_for(payload, f"{idempotency_key}:{index}" if idempotency_key else None)
+            valid.append((index, payload, key))
+
+        # Reenvios: chaves já registradas ou repetidas dentro do próprio lote
+        known = await webhook_idempotency.lookup(db, user_id, [key for _, _, key in valid if key is not None])
+        first_seen: Dict[str, int] = {}
+        repeated = []
+        fresh = []
+        for index, payload, key in valid:
+            if key in known:
+                duplicate(index, known[key])
+            elif key in first_seen:
+                repeated.append((index, first_seen[key]))
+            else:
+                if key is not None:
+                    first_seen[key] = index
+                fresh.append((index, payload, key))
+
+        # Perguntas e conversa casual não viram tarefa
+        pending = []
+        questions = message_classifier.classify_messages(payload.message for _, payload, _ in fresh)
+        for (index, payload, key), is_question in zip(fresh, questions):
+            if is_question:
+                results[index] = WebhookBatchItemResult(index=index, status=WebhookBatchItemStatus.IGNORED)
+                continue
+            try:
+                pending.append((index, payload, key, WebhookService.task_data_from_message(payload.message)))
+            except ValueError as e:
+                fail(index, str(e))
+
+        # As chaves são registradas antes da análise: um reenvio simultâneo já
+        # as encontra. Se este processo cair, os workers da fila retomam os
+        # jobs em PROCESSING pelo timeout de visibilidade
+        now = utcnow()
+        reserved = {
+            job.idempotency_key: job
+            for job in await webhook_idempotency.insert_jobs(db, [
+                {
+                    "id": str(uuid.uuid4()),
+                    "user_id": user_id,
+                    "payload": payload.model_dump_json(),
+                    "status": WebhookJobStatus.PROCESSING,
+                    "attempts": 1,
+                    "next_attempt_at": now,
+                    "locked_at": now,
+                    "task_id": str(uuid.uuid4()),
+                    "idempotency_key": key,
+                    "created_at": now
+                }
+                for _, payload, key, _ in pending if key is not None
+            ])
+        }
+        if reserved:
+            await db.commit()
+
+        raced = await webhook_idempotency.lookup(
+            db, user_id, [key for _, _, key, _ in pending if key is not None and key not in reserved]
+        )
+        to_analyze = []
+        for index, _, key, task_data in pending:
+            if key is not None and key not in reserved:
+                duplicate(index, raced[key])
+            else:
+                to_analyze.append((index, task_data, reserved.get(key)))
+
+        semaphore = asyncio.Semaphore(settings.webhook_batch_concurrency)
+
+        async def analyze(task_data: TaskCreate):
+            async with semaphore:
+                return await ai_service.analyze_task(task_data.raw_message)
 
-            return {
-                "success": True,
-                "message": "Tarefa criada com sucesso",
-                "task_id": task.id,
-                "title": task.title,
-                "ai_priority": task.ai_priority.value if task.ai_priority else None,
-                "ai_reasoning": task.ai_reasoning
-            }
+        analyses = await asyncio.gather(*(analyze(task_data) for _, task_data, _ in to_analyze), return_exceptions=True)
 
-        except Exception as e:
-            return {
-                "success": False,
-                "error": f"Erro ao processar mensagem: {str(e)}"
-            }
+        done, released = [], []
+        analyzed = []
+        for (index, task_data, job), analysis in zip(to_analyze, analyses):
+            if isinstance(analysis, Exception):
+                fail(index, str(analysis))
+                if job is not None:
+                    released.append(job.id)
+            else:
+                analyzed.append((index, task_data, analysis, job))
+
+        created = await TaskService.create_tasks_bulk(
+            db,
+            user_id,
+            [(task_data, analysis) for _, task_data, analysis, _ in analyzed],
+            task_ids=[job.task_id if job is not None else None for _, _, _, job in analyzed]
+        )
+        for (index, _, _, job), task in zip(analyzed, created):
+            if not isinstance(task, Task):
+                fail(index, str(task))
+                if job is not None:
+                    released.append(job.id)
+                continue
+            if job is not None:
+                done.append(job.id)
+            results[index] = WebhookBatchItemResult(
+                index=index,
+                status=WebhookBatchItemStatus.CREATED,
+                job_id=job.id if job is not None else None,
+                task_id=task.id,
+                title=task.title,
+                ai_priority=task.ai_priority,
+                ai_reasoning=task.ai_reasoning
+            )
+
+        # Concluídos apontam para a tarefa; falhas liberam a chave para o gateway tentar de novo
+        if done:
+            await db.execute(
+                update(WebhookJob).where(WebhookJob.id.in_(done))
+                .values(status=WebhookJobStatus.DONE, finished_at=utcnow(), locked_at=None)
+            )
+        if released:
+            await db.execute(delete(WebhookJob).where(WebhookJob.id.in_(released)))
+        if done or released:
+            await db.commit()
+
+        for index, first in repeated:
+            original = results[first]
+            status = WebhookBatchItemStatus.DUPLICATE if original.status == WebhookBatchItemStatus.CREATED \
+                else original.status
+            results[index] = original.model_copy(update={"index": index, "status": status})
+
+        return WebhookBatchResponse(
+            created=sum(result.status == WebhookBatchItemStatus.CREATED for result in results),
+            ignored=sum(result.status == WebhookBatchItemStatus.IGNORED for result in results),
+            duplicates=sum(result.status == WebhookBatchItemStatus.DUPLICATE for result in results),
+            failed=sum(result.status == WebhookBatchItemStatus.FAILED for result in results),
+            results=results
+        )
+
+    @staticmethod
+    def task_data_from_message(message: str) -> TaskCreate:
+        return TaskCreate(
+            title=message[:100] + "..." if len(message) > 100 else message,
+            description=message,
+            raw_message=message,
+            priority=Priority.MEDIUM,  # Prioridade padrão, pode ser ajustada pela IA
+            status=TaskStatus.PENDING
+        )
 
     @staticmethod
     def validate_webhook_payload(payload: Dict[str, Any]) -> WebhookPayload:
@@ -49,6 +212,6 @@ class WebhookService:
 
         return WebhookPayload(
             message=payload["message"],
-            from_user=payload.get("from"),
+            from_user=payload.get("from_user") or payload.get("from"),
             timestamp=payload.get("timestamp")
         )
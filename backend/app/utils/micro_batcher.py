@@ -0,0 +1,116 @@
+"""
+Micro-batching: itens enviados por requisições concorrentes processados em
+lotes por uma única chamada
+
+O lote fecha `window` segundos depois do primeiro item pendente ou ao juntar
+`max_batch` itens, como o group commit (core.group_commit). Cada lote roda
+numa task própria, então um lote lento (chamada ao LLM) não segura o
+seguinte.
+
+O handler recebe a lista de itens e devolve uma lista do mesmo tamanho, na
+mesma ordem; uma posição com exceção vira o erro daquele item. Se o handler
+levantar, todos os itens do lote recebem o erro.
+"""
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, Generic, List, Optional, Set, Tuple, TypeVar, Union
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+Handler = Callable[[List[T]], Awaitable[List[Union[R, BaseException]]]]
+
+
+class MicroBatcher(Generic[T, R]):
+    """Não é thread-safe, use a partir do event loop"""
+
+    def __init__(self, handler: Handler, window: float, max_batch: int):
+        self.handler = handler
+        self.window = window
+        self.max_batch = max_batch
+        self._pending: List[Tuple[T, asyncio.Future]] = []
+        self._full = asyncio.Event()
+        self._runner: Optional[asyncio.Task] = None
+        self._flushing: Set[asyncio.Task] = set()
+
+        # Métricas
+        self.batches = 0
+        self.items = 0
+        self.largest_batch = 0
+        self.failed_batches = 0
+        self.batch_seconds = 0.0
+
+    async def submit(self, item: T) -> R:
+        """Processa `item` no próximo lote; retorna o resultado dele"""
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((item, future))
+        if self._runner is None:
+            self._full = asyncio.Event()
+            self._runner = asyncio.create_task(self._run())
+        if len(self._pending) >= self.max_batch:
+            self._full.set()
+        return await future
+
+    async def _run(self) -> None:
+        try:
+            while self._pending:
+                if len(self._pending) < self.max_batch:
+                    self._full.clear()
+                    try:
+                        await asyncio.wait_for(self._full.wait(), timeout=self.window)
+                    except asyncio.TimeoutError:
+                        pass
+                batch = self._pending[:self.max_batch]
+                del self._pending[:self.max_batch]
+                task = asyncio.create_task(self._flush(batch))
+                self._flushing.add(task)
+                task.add_done_callback(self._flushing.discard)
+        finally:
+            self._runner = None
+
+    async def _flush(self, batch: List[Tuple[T, asyncio.Future]]) -> None:
+        # Quem desistiu de esperar (requisição cancelada) não entra no lote
+        batch = [(item, future) for item, future in batch if not future.done()]
+        if not batch:
+            return
+
+        start = time.perf_counter()
+        try:
+            results = await self.handler([item for item, _ in batch])
+            if len(results) != len(batch):
+                raise ValueError(f"Handler retornou {len(results)} resultados para {len(batch)} itens")
+        except Exception as e:
+            logger.exception("Falha no lote")
+            self.failed_batches += 1
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        finally:
+            self.batches += 1
+            self.items += len(batch)
+            self.largest_batch = max(self.largest_batch, len(batch))
+            self.batch_seconds += time.perf_counter() - start
+
+        for (_, future), result in zip(batch, results):
+            if future.done():
+                continue
+            if isinstance(result, BaseException):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "batches": self.batches,
+            "items": self.items,
+            "avg_batch": self.items / self.batches if self.batches else 0.0,
+            "largest_batch": self.largest_batch,
+            "failed_batches": self.failed_batches,
+            "avg_batch_ms": self.batch_seconds / self.batches * 1000 if self.batches else 0.0,
+            "pending": len(self._pending),
+            "in_flight": len(self._flushing)
+        }
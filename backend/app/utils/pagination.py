@@ -0,0 +1,74 @@
+"""
+Paginação por cursor (keyset) sobre (created_at, id)
+
+O cursor é opaco para o cliente: JSON com os valores de ordenação do último
+item da página, em base64 url-safe. A próxima página é filtrada por
+`(created_at, id) < (último created_at, último id)`, servida pelos índices
+compostos (user_id, created_at, id); o custo não cresce com a profundidade.
+
+No SQLite created_at é texto, comparado como texto, e convivem dois formatos:
+'AAAA-MM-DD HH:MM:SS' (CURRENT_TIMESTAMP do server_default, em linhas antigas
+de bancos criados por create_all, sem a migração 0004) e
+'AAAA-MM-DD HH:MM:SS.ffffff' (aplicação). Por isso o cursor leva o texto
+gravado, sem passar por datetime: '... 10:00:00' reformatado viraria
+'... 10:00:00.000000', maior que o gravado, e as linhas do mesmo segundo
+voltariam na página seguinte.
+"""
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Any, List, Optional
+
+from sqlalchemy import String, and_, cast, literal, or_, tuple_
+
+
+class InvalidCursorError(ValueError):
+    pass
+
+
+def encode_cursor(*values: Any) -> str:
+    payload = [value.isoformat() if isinstance(value, datetime) else value for value in values]
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int) -> List[Any]:
+    """
+    Retorna os `size` valores do cursor; created_at (penúltimo) é validado e
+    volta como texto, para cursor_created_at
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+        if not isinstance(values, list) or len(values) != size:
+            raise InvalidCursorError("Cursor inválido")
+        datetime.fromisoformat(values[-2])
+    except (binascii.Error, UnicodeDecodeError, json.JSONDecodeError, TypeError, ValueError) as e:
+        raise InvalidCursorError("Cursor inválido") from e
+    return values
+
+
+def keyset_created_at(column, dialect: str):
+    """Expressão de created_at que vai para o cursor: o texto gravado, no SQLite"""
+    if dialect == "sqlite":
+        return cast(column, String)
+    return column
+
+
+def cursor_created_at(value: str, dialect: str):
+    """created_at do cursor pronto para comparar com a coluna"""
+    if dialect == "sqlite":
+        return literal(value, String)
+    return datetime.fromisoformat(value)
+
+
+def after_keyset(created_at_column, id_column, created_at, last_id: str, rank=None, last_rank: Optional[float] = None):
+    """
+    Condição para os itens depois do cursor na ordem
+    (rank asc,) created_at desc, id desc
+    """
+    after = tuple_(created_at_column, id_column) < tuple_(created_at, last_id)
+    if rank is None:
+        return after
+    return or_(rank > last_rank, and_(rank == last_rank, after))
@@ -0,0 +1,79 @@
+"""
+Single-flight: chamadas concorrentes com a mesma chave compartilham uma única
+execução
+
+A primeira chamada de uma chave inicia a execução numa task própria; as
+seguintes, enquanto ela não termina, aguardam o mesmo resultado. A chave sai
+do mapa ao terminar: nem resultados nem erros ficam guardados (isso é papel
+de um cache), e a chamada seguinte executa de novo.
+
+- Erro: propagado para todos que aguardavam aquela execução.
+- Cancelamento de quem aguarda: afeta só quem foi cancelado; a execução
+  continua para os demais e só é cancelada quando ninguém mais aguarda.
+"""
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, TypeVar
+
+T = TypeVar("T")
+
+
+class _Call:
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Não é thread-safe, use a partir do event loop"""
+
+    def __init__(self):
+        self._calls: Dict[Hashable, _Call] = {}
+
+        # Métricas
+        self.executions = 0
+        self.coalesced = 0
+        self.errors = 0
+        self.abandoned = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        call = self._calls.get(key)
+        if call is None:
+            call = _Call(asyncio.ensure_future(fn()))
+            self._calls[key] = call
+            call.task.add_done_callback(lambda task: self._done(key, call))
+            self.executions += 1
+        else:
+            self.coalesced += 1
+
+        call.waiters += 1
+        try:
+            # shield: cancelar quem aguarda não cancela a execução compartilhada
+            return await asyncio.shield(call.task)
+        finally:
+            call.waiters -= 1
+            if call.waiters == 0 and not call.task.done():
+                call.task.cancel()
+                self.abandoned += 1
+
+    def _done(self, key: Hashable, call: _Call) -> None:
+        if self._calls.get(key) is call:
+            del self._calls[key]
+        # Lê a exceção mesmo sem ninguém aguardando (evita o aviso "never retrieved")
+        if not call.task.cancelled() and call.task.exception() is not None:
+            self.errors += 1
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    def stats(self) -> Dict[str, Any]:
+        requests = self.executions + self.coalesced
+        return {
+            "in_flight": len(self._calls),
+            "executions": self.executions,
+            "coalesced": self.coalesced,
+            "coalesced_ratio": self.coalesced / requests if requests else 0.0,
+            "errors": self.errors,
+            "abandoned": self.abandoned
+        }
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Benchmark: vazão e latência das análises de IA com e sem micro-batching
+(AI_ANALYSIS_BATCHING, AIService.batcher)
+
+`--messages` mensagens diferentes chegam a `--rate` por segundo, como numa
+rajada do webhook. O provedor simulado (scripts/llm_stub.py) leva
+`--latency` por requisição mais `--per-item-ms` por análise gerada e atende
+no máximo `--provider-concurrency` requisições ao mesmo tempo (limite de
+taxa). A última variante devolve uma resposta em lote ilegível em
+`--malformed` dos lotes, que caem para uma chamada por mensagem.
+
+Uso: python scripts/bench_ai_batching.py --messages 400 --rate 200
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+os.environ.setdefault("ENVIRONMENT", "benchmark")
+os.environ.setdefault("OPENAI_API_KEY", "sk-stub")
+
+import httpx  # noqa: E402
+
+from llm_stub import batch_size, completion_payload, default_content  # noqa: E402
+from app.core.config import settings  # noqa: E402
+from app.core.llm import llm_client  # noqa: E402
+from app.services.ai_service import ai_service  # noqa: E402
+from app.services.analysis_cache import analysis_cache  # noqa: E402
+from app.utils.micro_batcher import MicroBatcher  # noqa: E402
+from app.utils.singleflight import SingleFlight  # noqa: E402
+
+
+class Provider:
+    """Modelo simulado com custo por requisição, custo por item e limite de concorrência"""
+
+    def __init__(self, latency: float, per_item: float, concurrency: int, malformed: float):
+        self.latency = latency
+        self.per_item = per_item
+        self.slots = asyncio.Semaphore(concurrency)
+        self.malformed = malformed
+        self.rng = random.Random(7)
+        self.requests = 0
+        self.prompt_chars = 0
+
+    async def handler(self, request: httpx.Request) -> httpx.Response:
+        body = json.loads(request.content or b"{}")
+        prompt = body["messages"][-1]["content"]
+        items = batch_size(prompt) or 1
+        async with self.slots:
+            self.requests += 1
+            self.prompt_chars += sum(len(message["content"]) for message in body["messages"])
+            await asyncio.sleep(self.latency + items * self.per_item)
+        if items > 1 and self.rng.random() < self.malformed:
+            content = "Desculpe, não consegui analisar todas as mensagens."
+        else:
+            content = default_content(request)
+        return httpx.Response(200, json=completion_payload(content))
+
+
+async def run(messages: int, rate: float, offset: int) -> tuple:
+    latencies = []
+
+    async def analyze(position: int) -> None:
+        await asyncio.sleep(position / rate)
+        start = time.perf_counter()
+        await ai_service.analyze_task(f"Ligar para o fornecedor {offset + position} sobre a entrega atrasada")
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(analyze(position) for position in range(messages)))
+    return time.perf_counter() - start, latencies
+
+
+async def main(args: argparse.Namespace) -> int:
+    variants = [
+        ("uma chamada por mensagem", False, 0.0),
+        (f"lotes de até {args.batch_size} ({args.window_ms:g} ms)", True, 0.0),
+        (f"lotes, {args.malformed:.0%} ilegíveis", True, args.malformed),
+    ]
+
+    print(
+        f"\n📊 {args.messages} mensagens a {args.rate:g}/s; provedor: {args.latency * 1000:.0f} ms + "
+        f"{args.per_item_ms:g} ms/item, {args.provider_concurrency} requisições simultâneas"
+    )
+    print(
+        f"   {'variante':<28} | {'análises/s':>10} | {'p50 (ms)':>8} | {'p95 (ms)':>8}"
+        f" | {'requisições':>11} | {'tokens prompt':>13} | refeitas"
+    )
+    for position, (name, batching, malformed) in enumerate(variants):
+        provider = Provider(args.latency, args.per_item_ms / 1000, args.provider_concurrency, malformed)
+        llm_client.configure(transport=httpx.MockTransport(provider.handler))
+        settings.ai_analysis_batching = batching
+        ai_service.inflight = SingleFlight()
+        ai_service.batcher = MicroBatcher(
+            ai_service._analyze_batch_with_openai, window=args.window_ms / 1000, max_batch=args.batch_size
+        )
+        ai_service.batch_fallbacks = 0
+        analysis_cache.memory.clear()
+
+        elapsed, latencies = await run(args.messages, args.rate, position * args.messages)
+        latencies.sort()
+        p95 = latencies[max(0, int(len(latencies) * 0.95) - 1)]
+        print(
+            f"   {name:<28} | {len(latencies) / elapsed:>10.1f} | {statistics.median(latencies):>8.1f}"
+            f" | {p95:>8.1f} | {provider.requests:>11} | {provider.prompt_chars // 3:>13}"
+            f" | {ai_service.batch_fallbacks}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark do micro-batching das análises de IA")
+    parser.add_argument("--messages", type=int, default=400)
+    parser.add_argument("--rate", type=float, default=200.0, help="mensagens por segundo")
+    parser.add_argument("--latency", type=float, default=0.4, help="custo fixo por requisição (s)")
+    parser.add_argument("--per-item-ms", type=float, default=60.0, help="custo por análise gerada (ms)")
+    parser.add_argument("--provider-concurrency", type=int, default=8)
+    parser.add_argument("--batch-size", type=int, default=settings.ai_analysis_batch_max_size)
+    parser.add_argument("--window-ms", type=float, default=settings.ai_analysis_batch_window_ms)
+    parser.add_argument("--malformed", type=float, default=0.1, help="fração de lotes com resposta ilegível")
+    args = parser.parse_args()
+
+    sys.exit(asyncio.run(main(args)))
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Benchmark: análises de IA concorrentes da mesma mensagem, com e sem
+single-flight (AIService.inflight)
+
+Simula rajadas em que a mesma mensagem chega várias vezes ao mesmo tempo
+(webhook e chat, duplo envio, reenvio do gateway): `--bursts` rajadas de
+`--copies` cópias, com variações triviais de caixa e espaços. O cache de
+análises é limpo antes de cada variante; o LLM simulado leva `--latency`.
+
+Uso: python scripts/bench_ai_singleflight.py --bursts 20 --copies 8
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+os.environ.setdefault("ENVIRONMENT", "benchmark")
+os.environ.setdefault("OPENAI_API_KEY", "sk-stub")
+
+import httpx  # noqa: E402
+
+from llm_stub import default_content, make_async_transport  # noqa: E402
+from app.core.llm import llm_client  # noqa: E402
+from app.services.ai_service import ai_service  # noqa: E402
+from app.services.analysis_cache import analysis_cache  # noqa: E402
+from app.utils.singleflight import SingleFlight  # noqa: E402
+
+
+class NoFlight:
+    """Comportamento anterior: cada chamada vai ao modelo"""
+
+    async def do(self, key, fn):
+        return await fn()
+
+
+def variants_of(message: str, copies: int) -> list:
+    forms = [message, message.upper(), f"  {message}  ", message.lower()]
+    return [forms[i % len(forms)] for i in range(copies)]
+
+
+async def run(bursts: int, copies: int) -> list:
+    latencies = []
+
+    async def analyze(message: str) -> None:
+        start = time.perf_counter()
+        await ai_service.analyze_task(message)
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    # Rajadas sobrepostas: cada uma começa antes da anterior terminar
+    async def burst(position: int) -> None:
+        await asyncio.sleep(position * 0.01)
+        message = f"Enviar proposta revisada para o cliente {position} até sexta"
+        await asyncio.gather(*(analyze(copy) for copy in variants_of(message, copies)))
+
+    await asyncio.gather(*(burst(position) for position in range(bursts)))
+    return latencies
+
+
+async def main(bursts: int, copies: int, latency: float) -> int:
+    calls = 0
+
+    def counted(request: httpx.Request) -> str:
+        nonlocal calls
+        calls += 1
+        return default_content(request)
+
+    llm_client.configure(transport=make_async_transport(latency, content_fn=counted, token_interval=0))
+
+    print(f"\n📊 {bursts} rajadas x {copies} cópias da mesma mensagem (LLM {latency * 1000:.0f} ms)")
+    print(f"   {'variante':<24} | {'análises':>8} | {'chamadas LLM':>12} | {'p50 (ms)':>8} | {'total (s)':>9}")
+    for name, inflight in (("sem single-flight", NoFlight()), ("single-flight", SingleFlight())):
+        ai_service.inflight = inflight
+        analysis_cache.memory.clear()
+        calls = 0
+        start = time.perf_counter()
+        latencies = await run(bursts, copies)
+        elapsed = time.perf_counter() - start
+        print(
+            f"   {name:<24} | {len(latencies):>8} | {calls:>12} | {statistics.median(latencies):>8.1f}"
+            f" | {elapsed:>9.2f}"
+        )
+    print(f"\n   single-flight: {ai_service.inflight.stats()}")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark do single-flight das análises de IA")
+    parser.add_argument("--bursts", type=int, default=20)
+    parser.add_argument("--copies", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=0.5, help="latência do LLM simulado (s)")
+    args = parser.parse_args()
+
+    sys.exit(asyncio.run(main(args.bursts, args.copies, args.latency)))
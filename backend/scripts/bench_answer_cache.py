@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Benchmark: perguntas repetidas no chat com e sem o cache de respostas
+(services.answer_cache)
+
+Um usuário faz `--questions` perguntas sorteadas de um pequeno repertório
+(com variações de escrita) e, a cada `--write-every` perguntas, cria uma
+tarefa, o que muda a versão das tarefas e invalida as respostas anteriores.
+Compara sem cache, só o acerto exato e o acerto exato mais perguntas quase
+iguais (`--similarity`). O LLM simulado leva `--latency` por resposta.
+
+Uso: python scripts/bench_answer_cache.py --questions 200 --write-every 25
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+os.environ.setdefault("ENVIRONMENT", "benchmark")
+os.environ.setdefault("OPENAI_API_KEY", "sk-stub")
+if "DATABASE_URL" not in os.environ:
+    os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/bench_answer_cache.db"
+
+import httpx  # noqa: E402
+
+from llm_stub import default_content, make_async_transport  # noqa: E402
+from app.core.config import settings  # noqa: E402
+from app.core.database import create_tables  # noqa: E402
+from app.core.llm import llm_client  # noqa: E402
+from app.main import app, limiter  # noqa: E402
+from app.routers import auth as auth_router, chat as chat_router  # noqa: E402
+from app.services.answer_cache import AnswerCache  # noqa: E402
+
+# Cada grupo é a mesma pergunta escrita de formas diferentes
+QUESTIONS = [
+    ["Quais são minhas tarefas urgentes?", "quais são minhas tarefas urgentes", "Quais sao as minhas tarefas urgentes?"],
+    ["Bom dia!", "bom dia", "Bom dia"],
+    ["O que tenho pendente?", "o que tenho pendente", "O que eu tenho pendente?"],
+    ["Como organizar minha semana?", "como organizar minha semana", "Como posso organizar a minha semana?"],
+    ["Quantas tarefas concluí?", "quantas tarefas concluí", "Quantas tarefas eu concluí?"],
+]
+
+
+async def run(client: httpx.AsyncClient, headers: dict, questions: int, write_every: int, seed: int) -> list:
+    rng = random.Random(seed)
+    latencies = []
+    for position in range(questions):
+        if write_every and position and position % write_every == 0:
+            task = {"title": f"Tarefa {seed}-{position}", "priority": "MEDIUM"}
+            response = await client.post("/tasks/", json=task, headers=headers)
+            assert response.status_code == 200, response.text
+
+        message = rng.choice(rng.choice(QUESTIONS))
+        start = time.perf_counter()
+        response = await client.post("/chat/message", json={"message": message}, headers=headers)
+        assert response.status_code == 200, response.text
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+async def main(questions: int, write_every: int, latency: float, similarity: float) -> int:
+    create_tables()
+    limiter.enabled = False
+    auth_router.limiter.enabled = False
+    chat_router.limiter.enabled = False
+
+    calls = 0
+
+    def counted(request: httpx.Request) -> str:
+        nonlocal calls
+        calls += 1
+        return default_content(request)
+
+    llm_client.configure(transport=make_async_transport(latency, content_fn=counted, token_interval=0))
+
+    variants = [
+        ("sem cache", AnswerCache(maxsize=0, ttl=0, similarity=0)),
+        ("acerto exato", AnswerCache(settings.chat_answer_cache_size, settings.chat_answer_cache_ttl_seconds, 0)),
+        (
+            f"exato + similaridade {similarity:g}",
+            AnswerCache(settings.chat_answer_cache_size, settings.chat_answer_cache_ttl_seconds, similarity)
+        ),
+    ]
+
+    async with httpx.AsyncClient(app=app, base_url="http://bench", timeout=300) as client:
+        credentials = {"email": "answers@leggal.test", "password": "123456", "name": "Bench"}
+        await client.post("/auth/register", json=credentials)
+        token = (await client.post(
+            "/auth/login", data={"username": credentials["email"], "password": credentials["password"]}
+        )).json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+
+        print(f"\n📊 {questions} perguntas, 1 escrita a cada {write_every} (LLM {latency * 1000:.0f} ms)")
+        print(f"   {'cache':<28} | {'chamadas LLM':>12} | {'p50 (ms)':>8} | {'média (ms)':>10} | {'total (s)':>9}")
+        for seed, (name, cache) in enumerate(variants):
+            chat_router.answer_cache = cache
+            calls = 0
+            start = time.perf_counter()
+            latencies = await run(client, headers, questions, write_every, seed)
+            elapsed = time.perf_counter() - start
+            print(
+                f"   {name:<28} | {calls:>12} | {statistics.median(latencies):>8.1f}"
+                f" | {statistics.mean(latencies):>10.1f} | {elapsed:>9.2f}"
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark do cache de respostas do chat")
+    parser.add_argument("--questions", type=int, default=200)
+    parser.add_argument("--write-every", type=int, default=25)
+    parser.add_argument("--latency", type=float, default=0.3, help="latência do LLM simulado (s)")
+    parser.add_argument(
+        "--similarity", type=float, default=0.92,
+        help="limiar do nível por similaridade (calibre para o embedder em uso; com hashing não é seguro)"
+    )
+    args = parser.parse_args()
+
+    sys.exit(asyncio.run(main(args.questions, args.write_every, args.latency, args.similarity)))
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Benchmark: tamanho do prompt e latência das respostas do chat, antes e depois
+da seleção de contexto (services.answer_context)
+
+Popula um usuário com `--tasks` tarefas; a tarefa sobre a pergunta é antiga e
+fica fora das 100 mais recentes. Compara a listagem anterior (100 tarefas mais
+recentes, todas no prompt) com o contexto pontuado dentro do orçamento de
+tokens. O LLM simulado leva `--latency` mais `--prefill-ms` por 1000 tokens do
+prompt até responder, como o tempo até o primeiro token de um modelo real.
+
+Uso: python scripts/bench_answer_context.py --tasks 2000 --questions 20
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+from datetime import timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+os.environ.setdefault("ENVIRONMENT", "benchmark")
+os.environ.setdefault("OPENAI_API_KEY", "sk-stub")
+# A mesma pergunta se repete: sem o cache de respostas, todas montam o contexto
+os.environ.setdefault("CHAT_ANSWER_CACHE_SIZE", "0")
+if "DATABASE_URL" not in os.environ:
+    os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/bench_answer_context.db"
+
+import httpx  # noqa: E402
+from sqlalchemy import insert  # noqa: E402
+
+from llm_stub import completion_payload, default_content  # noqa: E402
+from app.core.database import Base, engine  # noqa: E402
+from app.core.llm import llm_client  # noqa: E402
+from app.main import app, limiter  # noqa: E402
+from app.models.models import Priority, Task, TaskStatus, utcnow  # noqa: E402
+from app.models.schemas import TaskFilters  # noqa: E402
+from app.routers import auth as auth_router, chat as chat_router  # noqa: E402
+from app.services.answer_context import (  # noqa: E402
+    PRIORITY_EMOJIS, PRIORITY_NAMES, STATUS_NAMES, AnswerContext, answer_context_builder
+)
+from app.services.task_service import TaskService  # noqa: E402
+
+QUESTION = "Qual é o prazo do contrato de manutenção com a Acme?"
+TARGET_TITLE = "Renovar contrato de manutenção Acme"
+DESCRIPTION = (
+    "Conferir valores, prazos e cláusulas de reajuste com o financeiro antes de enviar ao cliente; "
+    "anexar as notas fiscais do último trimestre e o relatório de atendimento"
+)
+
+
+async def legacy_build(db, user_id: str, question: str) -> AnswerContext:
+    """Contexto anterior: as 100 tarefas mais recentes, sem filtro nem orçamento"""
+    tasks, _ = await TaskService.get_tasks(db, user_id, TaskFilters(limit=100))
+    lines = [
+        f"{PRIORITY_EMOJIS.get(task.priority, '⚪')} {task.title} - {task.description or 'Sem descrição'} "
+        f"(Status: {STATUS_NAMES.get(task.status, task.status)}, Prioridade: {PRIORITY_NAMES.get(task.priority, task.priority)})"
+        for task in tasks
+    ]
+    return AnswerContext(summary="\n".join(lines), included=len(lines), candidates=len(tasks), tokens=0)
+
+
+def populate(user_id: str, count: int) -> None:
+    now = utcnow()
+    priorities = list(Priority)
+    statuses = [TaskStatus.PENDING, TaskStatus.IN_PROGRESS, TaskStatus.COMPLETED]
+    rows = [
+        {
+            "id": str(uuid.uuid4()),
+            "user_id": user_id,
+            "title": f"Atividade {i} do projeto {i % 37}",
+            "description": DESCRIPTION,
+            "priority": priorities[i % 4],
+            "status": statuses[i % 3],
+            "created_at": now - timedelta(minutes=count - i)
+        }
+        for i in range(count)
+    ]
+    # A tarefa da pergunta é antiga: fica fora das 100 mais recentes
+    rows[0].update(title=TARGET_TITLE, description="Prazo do contrato de manutenção da Acme vence em 30/11")
+    with engine.begin() as conn:
+        conn.execute(insert(Task), rows)
+
+
+def make_transport(latency: float, prefill_ms: float, prompts: list) -> httpx.MockTransport:
+    async def handler(request: httpx.Request) -> httpx.Response:
+        body = json.loads(request.content or b"{}")
+        prompt = "\n".join(message.get("content", "") for message in body.get("messages", []))
+        tokens = answer_context_builder.tokens.count(prompt)
+        prompts.append(tokens)
+        await asyncio.sleep(latency + tokens / 1000 * prefill_ms / 1000)
+        return httpx.Response(200, json=completion_payload(default_content(request)))
+
+    return httpx.MockTransport(handler)
+
+
+async def main(count: int, questions: int, latency: float, prefill_ms: float) -> int:
+    Base.metadata.create_all(bind=engine)
+    limiter.enabled = False
+    auth_router.limiter.enabled = False
+    chat_router.limiter.enabled = False
+    answer_context_builder.tokens.load()
+    prompts: list = []
+    llm_client.configure(transport=make_transport(latency, prefill_ms, prompts))
+
+    async with httpx.AsyncClient(app=app, base_url="http://bench", timeout=300) as client:
+        credentials = {"email": "context@leggal.test", "password": "123456", "name": "Bench"}
+        user = (await client.post("/auth/register", json=credentials)).json()
+        populate(user["id"], count)
+        token = (await client.post(
+            "/auth/login", data={"username": credentials["email"], "password": credentials["password"]}
+        )).json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+
+        print(f"\n📊 {count} tarefas, {questions} perguntas (tokenizer: {answer_context_builder.tokens.name})")
+        print(
+            f"   {'contexto':<34} | {'tarefas':>7} | {'tokens prompt':>13} | {'montagem (ms)':>13}"
+            f" | {'resposta p50 (ms)':>17} | alvo"
+        )
+        build = answer_context_builder.build
+        variants = [
+            ("100 mais recentes (antes)", legacy_build),
+            (f"relevantes, {answer_context_builder.token_budget} tokens", build),
+        ]
+        for name, builder in variants:
+            contexts = []
+
+            async def traced(db, user_id, question, builder=builder):
+                start = time.perf_counter()
+                context = await builder(db, user_id, question)
+                contexts.append((context, (time.perf_counter() - start) * 1000))
+                return context
+
+            answer_context_builder.build = traced
+            # Aquecimento: índices em memória do usuário
+            await client.post("/chat/message", json={"message": QUESTION}, headers=headers)
+            contexts.clear()
+            prompts.clear()
+
+            latencies = []
+            for _ in range(questions):
+                start = time.perf_counter()
+                response = await client.post("/chat/message", json={"message": QUESTION}, headers=headers)
+                assert response.status_code == 200, response.text
+                latencies.append((time.perf_counter() - start) * 1000)
+
+            included = statistics.mean(context.included for context, _ in contexts)
+            build_ms = statistics.median(ms for _, ms in contexts)
+            target = "sim" if TARGET_TITLE in contexts[-1][0].summary else "não"
+            print(
+                f"   {name:<34} | {included:>7.0f} | {statistics.mean(prompts):>13.0f} | {build_ms:>13.1f}"
+                f" | {statistics.median(latencies):>17.1f} | {target}"
+            )
+        answer_context_builder.build = build
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark do contexto das respostas do chat")
+    parser.add_argument("--tasks", type=int, default=2000)
+    parser.add_argument("--questions", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.2, help="latência fixa do LLM (s)")
+    parser.add_argument("--prefill-ms", type=float, default=150.0, help="ms por 1000 tokens de prompt")
+    args = parser.parse_args()
+
+    sys.exit(asyncio.run(main(args.tasks, args.questions, args.latency, args.prefill_ms)))
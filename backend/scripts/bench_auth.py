@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Benchmark: custo da autenticação por requisição
+
+Compara três versões da dependency get_current_user em GET /auth/me (via ASGI,
+sem rede) e isoladas:
+
+- anterior: verify_token + AuthService.get_current_user (dois jwt.decode e
+  SELECT por email)
+- sem cache: um jwt.decode e busca pela chave primária (claim `uid`)
+- com cache: acerto no cache de usuários autenticados (sem decode nem banco)
+
+Usa um SQLite temporário com `--users` usuários.
+
+Uso: python scripts/bench_auth.py --requests 2000 --users 1000
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+import uuid
+from typing import Callable
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+os.environ.setdefault("ENVIRONMENT", "benchmark")
+if "DATABASE_URL" not in os.environ:
+    os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/bench_auth.db"
+
+import httpx  # noqa: E402
+import jwt  # noqa: E402
+from fastapi import Depends, HTTPException  # noqa: E402
+from fastapi.security import HTTPAuthorizationCredentials  # noqa: E402
+from sqlalchemy import insert, select  # noqa: E402
+
+from app.core.config import settings  # noqa: E402
+from app.core.database import AsyncSessionLocal, Base, engine  # noqa: E402
+from app.core.dependencies import get_async_db, get_current_user, security  # noqa: E402
+from app.core.security import verify_token  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models.models import User  # noqa: E402
+from app.services.auth_service import AuthService  # noqa: E402
+from app.services.principal_cache import principal_cache  # noqa: E402
+
+
+async def legacy_get_current_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db=Depends(get_async_db)
+) -> User:
+    """Dependency anterior: dois decodes e busca por email"""
+    token = credentials.credentials
+    if not verify_token(token):
+        raise HTTPException(status_code=401)
+    payload = jwt.decode(token, settings.secret_key, algorithms=[settings.algorithm])
+    user = (await db.execute(select(User).where(User.email == payload["sub"]))).scalar_one_or_none()
+    if not user:
+        raise HTTPException(status_code=401)
+    return user
+
+
+async def uncached_get_current_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db=Depends(get_async_db)
+) -> User:
+    principal_cache.clear()
+    return await get_current_user(credentials, db)
+
+
+def populate(users: int) -> tuple:
+    Base.metadata.create_all(bind=engine)
+    rows = [{"id": str(uuid.uuid4()), "email": f"bench-{i}@leggal.test", "password": "-"} for i in range(users)]
+    with engine.begin() as conn:
+        conn.execute(insert(User), rows)
+    user = rows[users // 2]
+    return AuthService.create_access_token(user["email"], user["id"])
+
+
+async def measure_http(client: httpx.AsyncClient, token: str, requests: int) -> float:
+    headers = {"Authorization": f"Bearer {token}"}
+    assert (await client.get("/auth/me", headers=headers)).status_code == 200
+    start = time.perf_counter()
+    for _ in range(requests):
+        await client.get("/auth/me", headers=headers)
+    return (time.perf_counter() - start) / requests * 1e6
+
+
+async def measure_dependency(dependency: Callable, token: str, requests: int) -> float:
+    credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+    start = time.perf_counter()
+    for _ in range(requests):
+        async with AsyncSessionLocal() as db:
+            await dependency(credentials, db)
+    return (time.perf_counter() - start) / requests * 1e6
+
+
+async def main(requests: int, users: int) -> int:
+    print(f"\n📊 Autenticação por requisição ({engine.dialect.name}, {users} usuários, {requests} requisições)")
+    token = populate(users)
+
+    variants = [
+        ("anterior", legacy_get_current_user),
+        ("sem cache", uncached_get_current_user),
+        ("com cache", get_current_user),
+    ]
+
+    print(f"   {'variante':<10} | {'GET /auth/me (µs)':>17} | {'dependency (µs)':>15}")
+    async with httpx.AsyncClient(app=app, base_url="http://bench") as client:
+        for name, dependency in variants:
+            principal_cache.clear()
+            app.dependency_overrides[get_current_user] = dependency
+            http_us = await measure_http(client, token, requests)
+            dependency_us = await measure_dependency(dependency, token, requests)
+            print(f"   {name:<10} | {http_us:>17.0f} | {dependency_us:>15.0f}")
+    app.dependency_overrides.clear()
+
+    print(f"\n   Cache: {principal_cache.entries.stats()}")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark do custo de autenticação")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--users", type=int, default=1000)
+    args = parser.parse_args()
+
+    sys.exit(asyncio.run(main(args.requests, args.users)))
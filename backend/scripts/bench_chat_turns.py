@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Benchmark: turnos do chat por segundo com `--clients` usuários simultâneos
+
+Cada turno é um POST /chat/message que cria uma tarefa (LLM simulado por
+scripts/llm_stub.py). Compara a gravação anterior (três commits por turno e um
+refresh da tarefa), o turno numa única transação e o group commit
+(CHAT_GROUP_COMMIT, padrão no SQLite). Mede turnos/s, latência, commits no
+banco e turnos que falharam: no SQLite, sem group commit, alguns turnos dão
+"database is locked" quando a espera pelo lock de escrita passa do
+busy_timeout. No PostgreSQL os números do README não foram medidos.
+
+Roda no banco de DATABASE_URL (SQLite temporário por padrão):
+    python scripts/bench_chat_turns.py --clients 32 --turns 10
+    DATABASE_URL=postgresql://... python scripts/bench_chat_turns.py
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+os.environ.setdefault("ENVIRONMENT", "benchmark")
+os.environ.setdefault("OPENAI_API_KEY", "sk-stub")
+if "DATABASE_URL" not in os.environ:
+    os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/bench_chat_turns.db"
+
+import httpx  # noqa: E402
+from sqlalchemy import event  # noqa: E402
+
+from llm_stub import make_async_transport  # noqa: E402
+from app.core.config import settings  # noqa: E402
+from app.core.database import async_engine, create_tables  # noqa: E402
+from app.core.group_commit import group_committer  # noqa: E402
+from app.core.llm import llm_client  # noqa: E402
+from app.main import app, limiter  # noqa: E402
+from app.routers import auth as auth_router, chat as chat_router  # noqa: E402
+from app.services.task_service import TaskService  # noqa: E402
+
+commits = 0
+
+
+@event.listens_for(async_engine.sync_engine, "commit")
+def count_commit(conn) -> None:
+    global commits
+    commits += 1
+
+
+async def legacy_save_turn(db, user_message, result, task=None, embedding=None):
+    """Gravação anterior: mensagem do usuário, tarefa (com refresh) e resposta em commits separados"""
+    db.add(user_message)
+    await db.commit()
+    if task is not None:
+        await TaskService.add_task(db, task)
+        await db.commit()
+        await db.refresh(task)
+        TaskService.index_task(task, embedding)
+    ai_message = chat_router.new_chat_message(
+        user_message.user_id, result.content, is_user=False, task_id=task.id if task else None
+    )
+    db.add(ai_message)
+    await db.commit()
+    return ai_message
+
+
+async def run(client: httpx.AsyncClient, tokens: list, turns: int, offset: int) -> tuple:
+    latencies = []
+    errors = []
+
+    async def user_session(position: int, token: str) -> None:
+        headers = {"Authorization": f"Bearer {token}"}
+        for turn in range(turns):
+            message = f"Preciso enviar o relatório {offset + turn} para o cliente {position}"
+            start = time.perf_counter()
+            response = await client.post("/chat/message", json={"message": message}, headers=headers)
+            if response.status_code != 200:
+                errors.append(response.status_code)
+                continue
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(user_session(position, token) for position, token in enumerate(tokens)))
+    return time.perf_counter() - start, latencies, len(errors)
+
+
+async def main(clients: int, turns: int, latency: float) -> int:
+    global commits
+    create_tables()
+    llm_client.configure(transport=make_async_transport(latency, token_interval=0))
+    limiter.enabled = False
+    auth_router.limiter.enabled = False
+    chat_router.limiter.enabled = False
+    save_turn = chat_router.save_turn
+
+    variants = [
+        ("3 commits por turno (antes)", legacy_save_turn, False),
+        ("1 transação por turno", save_turn, False),
+        (f"group commit ({settings.group_commit_window_ms:g} ms)", save_turn, True),
+    ]
+
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=300) as client:
+        tokens = []
+        for position in range(clients):
+            email = f"chat-{position}@leggal.test"
+            await client.post("/auth/register", json={"email": email, "password": "123456", "name": "Bench"})
+            response = await client.post("/auth/login", data={"username": email, "password": "123456"})
+            tokens.append(response.json()["access_token"])
+
+        print(f"\n📊 {clients} usuários x {turns} turnos ({async_engine.dialect.name}, LLM {latency * 1000:.0f} ms)")
+        print(f"   {'gravação':<28} | {'turnos/s':>8} | {'p50 (ms)':>8} | {'p95 (ms)':>8} | {'commits':>7} | erros")
+        for position, (name, writer, group) in enumerate(variants):
+            chat_router.save_turn = writer
+            settings.chat_group_commit = group
+            commits = 0
+            elapsed, latencies, errors = await run(client, tokens, turns, position * turns)
+            latencies.sort()
+            p95 = latencies[max(0, int(len(latencies) * 0.95) - 1)]
+            print(
+                f"   {name:<28} | {len(latencies) / elapsed:>8.1f} | {statistics.median(latencies):>8.1f}"
+                f" | {p95:>8.1f} | {commits:>7} | {errors}"
+            )
+
+    print(f"\n   group commit: {group_committer.stats()}")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark de turnos do chat")
+    parser.add_argument("--clients", type=int, default=32)
+    parser.add_argument("--turns", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=0.02)
+    args = parser.parse_args()
+
+    sys.exit(asyncio.run(main(args.clients, args.turns, args.latency)))
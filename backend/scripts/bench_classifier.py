@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark do classificador de mensagens do chat
+
+Compara app.services.message_classifier com a implementação anterior
+(laços em Python sobre as listas de palavras-chave). A referência anterior,
+o corpus e o teste de paridade ficam em tests/test_message_classifier.py.
+
+Uso: python scripts/bench_classifier.py --messages 20000
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'tests'))
+
+from app.services.message_classifier import classify_messages, is_question  # noqa: E402
+from test_message_classifier import generate_messages, legacy_classify  # noqa: E402
+
+
+def timed(fn, messages: list[str], repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(messages)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(n: int) -> int:
+    messages = generate_messages(n)
+    print(f"\n📊 {len(messages)} mensagens (paridade: pytest tests/test_message_classifier.py)")
+
+    legacy = timed(lambda batch: [legacy_classify(m) for m in batch], messages)
+    compiled = timed(lambda batch: [is_question(m) for m in batch], messages)
+    batched = timed(classify_messages, messages)
+
+    per_message = lambda seconds: seconds / len(messages) * 1e6  # noqa: E731
+    print(f"   anterior:          {per_message(legacy):6.2f} µs/mensagem")
+    print(f"   regex compilada:   {per_message(compiled):6.2f} µs/mensagem ({legacy / compiled:.1f}x)")
+    print(f"   classify_messages: {per_message(batched):6.2f} µs/mensagem ({legacy / batched:.1f}x)")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark do classificador")
+    parser.add_argument("--messages", type=int, default=20000, help="Mensagens sintéticas")
+    args = parser.parse_args()
+
+    sys.exit(main(args.messages))
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Benchmark: vazão de listagem de tarefas com N requisições em voo
+
+Compara o padrão antigo (Session síncrona chamada dentro de handlers async,
+que bloqueia o event loop) com AsyncSession, executando a mesma consulta dos
+dois lados: ILIKE com um termo inexistente, que força a varredura da tabela.
+Só o tipo de sessão muda; a busca textual do TaskService (FTS5/tsvector) é
+medida à parte em scripts/bench_fulltext_search.py. Além da vazão, mede o
+atraso máximo do event loop (o que as outras rotas async sentiriam).
+
+No SQLite a AsyncSession é MAIS LENTA que a sessão síncrona em todos os
+níveis de concorrência: a consulta é CPU-bound e o aiosqlite soma a cada
+chamada a troca com a thread do driver e a conexão nova do NullPool (medido:
+1 em voo 79 vs 162 req/s, 16 em voo 130 vs 213 req/s; numa máquina de 1
+núcleo, 17.8 vs 22.5 e 21.3 vs 25.3). O ganho no SQLite é só o atraso do
+event loop, que cai de segundos para dezenas de ms. A vazão só melhora com
+Postgres (I/O de rede), que não foi medido aqui.
+
+Uso:
+    python scripts/bench_db_concurrency.py --tasks 20000 --requests 64
+    DATABASE_URL=postgresql://... python scripts/bench_db_concurrency.py
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+import uuid
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+_db_dir = tempfile.mkdtemp(prefix="leggal-bench-")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_db_dir}/bench.db")
+os.environ.setdefault("ENVIRONMENT", "benchmark")
+
+from sqlalchemy import or_, select  # noqa: E402
+
+from app.core.database import AsyncSessionLocal, SessionLocal, create_tables, async_engine  # noqa: E402
+from app.models.models import Task, User  # noqa: E402
+
+SEARCH = "termo-inexistente"
+
+
+def seed(n_tasks: int) -> str:
+    db = SessionLocal()
+    user_id = str(uuid.uuid4())
+    db.add(User(id=user_id, email=f"{user_id}@bench.com", password="x", name="Bench"))
+    db.bulk_save_objects([
+        Task(
+            id=str(uuid.uuid4()),
+            user_id=user_id,
+            title=f"Tarefa {i}",
+            description=f"Descrição da tarefa número {i} para o benchmark",
+            raw_message=f"Preciso fazer a tarefa {i} até sexta-feira"
+        )
+        for i in range(n_tasks)
+    ])
+    db.commit()
+    db.close()
+    return user_id
+
+
+def list_query(user_id: str):
+    """A mesma consulta nos dois lados, para comparar só o tipo de sessão"""
+    term = f"%{SEARCH}%"
+    return select(Task).where(Task.user_id == user_id).where(
+        or_(Task.title.ilike(term), Task.description.ilike(term), Task.raw_message.ilike(term))
+    ).limit(50)
+
+
+async def legacy_list(user_id: str) -> int:
+    """Padrão antigo: consulta síncrona dentro de uma corrotina"""
+    db = SessionLocal()
+    try:
+        return len(db.execute(list_query(user_id)).scalars().all())
+    finally:
+        db.close()
+
+
+async def async_list(user_id: str) -> int:
+    async with AsyncSessionLocal() as db:
+        return len((await db.execute(list_query(user_id))).scalars().all())
+
+
+async def measure(fn, user_id: str, concurrency: int, total: int) -> tuple[float, float]:
+    """Retorna (requisições/s, atraso máximo do loop em ms) mantendo `concurrency` requisições em voo"""
+    semaphore = asyncio.Semaphore(concurrency)
+    done = asyncio.Event()
+    max_lag = 0.0
+
+    async def one():
+        async with semaphore:
+            await fn(user_id)
+
+    async def probe():
+        nonlocal max_lag
+        while not done.is_set():
+            start = time.perf_counter()
+            await asyncio.sleep(0.001)
+            max_lag = max(max_lag, time.perf_counter() - start - 0.001)
+
+    probe_task = asyncio.create_task(probe())
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(total)))
+    elapsed = time.perf_counter() - start
+    done.set()
+    await probe_task
+    return total / elapsed, max_lag * 1000
+
+
+async def main(n_tasks: int, total: int) -> None:
+    create_tables()
+    user_id = seed(n_tasks)
+
+    print(f"\n📊 {n_tasks} tarefas, {total} listagens com busca por nível de concorrência")
+    print(
+        f"   {'em voo':>7} | {'sync req/s':>10} | {'lag (ms)':>8} | {'async req/s':>11} | {'lag (ms)':>8} | "
+        f"{'async/sync':>10}"
+    )
+    slower = []
+    for concurrency in (1, 2, 4, 8, 16):
+        legacy, legacy_lag = await measure(legacy_list, user_id, concurrency, total)
+        current, current_lag = await measure(async_list, user_id, concurrency, total)
+        print(
+            f"   {concurrency:>7} | {legacy:>10.1f} | {legacy_lag:>8.1f} | "
+            f"{current:>11.1f} | {current_lag:>8.1f} | {current / legacy:>9.2f}x"
+        )
+        if current < legacy:
+            slower.append(concurrency)
+
+    if slower:
+        print(f"\n   ⚠️  async com vazão menor que sync com {', '.join(map(str, slower))} em voo")
+
+    await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark de concorrência do banco")
+    parser.add_argument("--tasks", type=int, default=20000, help="Tarefas semeadas")
+    parser.add_argument("--requests", type=int, default=64, help="Listagens por nível")
+    args = parser.parse_args()
+
+    asyncio.run(main(args.tasks, args.requests))
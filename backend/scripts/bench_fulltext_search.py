@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Benchmark: filtro `search` de TaskService.get_tasks, ILIKE x busca textual
+
+Popula uma tabela tasks com `--rows` tarefas (padrão: 1 milhão) distribuídas
+entre `--users` usuários e compara, para algumas consultas, o filtro anterior
+(ILIKE '%termo%' em cinco colunas, sem índice possível) com o atual (FTS5 no
+SQLite, tsvector + GIN no PostgreSQL), ambos pelo caminho assíncrono da API.
+
+Por padrão usa um SQLite temporário. Para PostgreSQL, aponte DATABASE_URL para
+um banco descartável: as tabelas são criadas e populadas pelo script.
+
+Uso: python scripts/bench_fulltext_search.py --rows 1000000 --users 100
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+import uuid
+from typing import Optional
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+os.environ.setdefault("ENVIRONMENT", "benchmark")
+if "DATABASE_URL" not in os.environ:
+    os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/bench_fulltext.db"
+
+from sqlalchemy import insert, or_, select, text  # noqa: E402
+
+from app.core.database import AsyncSessionLocal, Base, engine  # noqa: E402
+from app.models.models import Priority, Task, TaskStatus, User  # noqa: E402
+from app.models.schemas import TaskFilters  # noqa: E402
+from app.services.task_service import TaskService  # noqa: E402
+
+VERBS = ["revisar", "enviar", "comprar", "agendar", "preparar", "ligar", "organizar", "pagar", "atualizar", "cancelar"]
+OBJECTS = [
+    "contrato", "relatório", "proposta", "apresentação", "orçamento", "fatura", "planilha", "reunião",
+    "café", "material", "passagem", "documentação", "backup", "servidor", "campanha", "auditoria",
+]
+CONTEXT = ["cliente", "equipe", "fornecedor", "diretoria", "projeto", "escritório", "banco", "jurídico"]
+QUERIES = ["auditoria", "contrato cliente", "backup servidor", "orçamento diretoria", "xyzzy"]
+CHUNK = 10000
+
+
+def task_rows(n: int, user_ids: list, seed: int = 5):
+    rng = random.Random(seed)
+    for i in range(n):
+        verb, obj, ctx = rng.choice(VERBS), rng.choice(OBJECTS), rng.choice(CONTEXT)
+        yield {
+            "id": str(uuid.uuid4()),
+            "user_id": user_ids[i % len(user_ids)],
+            "title": f"{verb.capitalize()} {obj}",
+            "description": f"{verb} o {obj} do {ctx} até sexta",
+            "raw_message": f"preciso {verb} o {obj} do {ctx}",
+            "ai_title": f"{obj.capitalize()} - {ctx}",
+            "ai_summary": f"Tarefa de {verb} {obj} para {ctx}",
+            "priority": rng.choice(list(Priority)),
+            "status": rng.choice(list(TaskStatus)),
+        }
+
+
+def populate(rows: int, users: int) -> list:
+    Base.metadata.create_all(bind=engine)
+    user_ids = [str(uuid.uuid4()) for _ in range(users)]
+    with engine.begin() as conn:
+        conn.execute(insert(User), [
+            {"id": user_id, "email": f"bench-{user_id}@leggal.test", "password": "-"} for user_id in user_ids
+        ])
+
+    start = time.perf_counter()
+    batch = []
+    for row in task_rows(rows, user_ids):
+        batch.append(row)
+        if len(batch) == CHUNK:
+            with engine.begin() as conn:
+                conn.execute(insert(Task), batch)
+            batch = []
+    if batch:
+        with engine.begin() as conn:
+            conn.execute(insert(Task), batch)
+    print(f"   {rows} tarefas inseridas em {time.perf_counter() - start:.1f}s (índice mantido pelos triggers)")
+
+    if engine.dialect.name == "postgresql":
+        with engine.begin() as conn:
+            conn.execute(text("ANALYZE tasks"))
+    return user_ids
+
+
+async def legacy_get_tasks(db, user_id: str, search: str, limit: Optional[int]) -> list:
+    """Filtro anterior de TaskService.get_tasks (sem `limit`, todos os resultados)"""
+    search_term = f"%{search}%"
+    query = (
+        select(Task)
+        .where(Task.user_id == user_id)
+        .where(or_(
+            Task.title.ilike(search_term),
+            Task.description.ilike(search_term),
+            Task.raw_message.ilike(search_term),
+            Task.ai_title.ilike(search_term),
+            Task.ai_summary.ilike(search_term)
+        ))
+        .order_by(Task.created_at.desc())
+        .limit(limit)
+    )
+    return list((await db.execute(query)).scalars().all())
+
+
+async def fts_get_tasks(db, user_id: str, search: str, limit: int) -> list:
+    tasks, _ = await TaskService.get_tasks(db, user_id, TaskFilters(search=search, limit=limit))
+    return tasks
+
+
+async def fts_count(user_id: str, search: str, limit: int) -> int:
+    """Todos os resultados da busca, percorrendo as páginas pelo cursor"""
+    found, cursor = 0, None
+    async with AsyncSessionLocal() as db:
+        while True:
+            tasks, cursor = await TaskService.get_tasks(
+                db, user_id, TaskFilters(search=search, limit=limit, cursor=cursor)
+            )
+            found += len(tasks)
+            if cursor is None:
+                return found
+
+
+async def measure(fn, repeat: int) -> float:
+    """Melhor tempo (ms) da primeira página"""
+    best = float("inf")
+    for _ in range(repeat):
+        async with AsyncSessionLocal() as db:
+            start = time.perf_counter()
+            await fn(db)
+            best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+async def main(rows: int, users: int, limit: int, repeat: int) -> int:
+    print(f"\n📊 Busca textual em {rows} tarefas ({engine.dialect.name}, {users} usuários, limit {limit})")
+    user_ids = populate(rows, users)
+    user_id = user_ids[0]
+
+    print(f"   {'consulta':<22} | {'ILIKE (ms)':>10} | {'FTS (ms)':>9} | {'ganho':>7} | {'resultados':>10}")
+    for query in QUERIES:
+        legacy_ms = await measure(lambda db: legacy_get_tasks(db, user_id, query, limit), repeat)
+        fts_ms = await measure(lambda db: fts_get_tasks(db, user_id, query, limit), repeat)
+        async with AsyncSessionLocal() as db:
+            legacy_found = len(await legacy_get_tasks(db, user_id, query, None))
+        fts_found = await fts_count(user_id, query, limit)
+        print(f"   {query:<22} | {legacy_ms:>10.1f} | {fts_ms:>9.1f} | {legacy_ms / fts_ms:>6.1f}x | "
+              f"{legacy_found:>4} / {fts_found:<4}")
+
+    print("\n   Tempos da primeira página; resultados: total de ILIKE / FTS (todas as páginas).")
+    print("   O FTS casa palavras (com prefixo no SQLite e stemming no PostgreSQL), não")
+    print("   substrings arbitrárias, e ordena por relevância.")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark da busca textual de tarefas")
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    sys.exit(asyncio.run(main(args.rows, args.users, args.limit, args.repeat)))
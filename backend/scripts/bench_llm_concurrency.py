@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Benchmark: N requisições de chat simultâneas contra um modelo com latência fixa
+
+Com o cliente síncrono (comportamento antigo) o event loop serializa as
+chamadas: N requisições levam N latências. O cliente assíncrono roda com os
+limites padrão de core/llm.py (OPENAI_MAX_CONCURRENCY=20 chamadas simultâneas,
+pool de 50 conexões), que não enfileiram nada até 20 requisições; acima disso
+o semáforo forma ondas de 20.
+
+O alvo do cliente assíncrono não é 1 latência: cada requisição também gasta
+CPU na aplicação (JWT, leituras e escritas no banco, histórico, SDK), e essa
+parte é serial no event loop. O script mede esse custo numa rodada com o
+modelo instantâneo e reporta como alvo ondas x latência + esse custo (com mais
+de uma onda o custo se sobrepõe às esperas e o alvo fica pessimista). Com 10
+requisições de 0.3s num núcleo, o custo é ~0.2s e a rodada leva ~0.6s (2x);
+com OPENAI_MAX_CONCURRENCY=100 o tempo é o mesmo: o excesso sobre 1 latência
+é a aplicação, não o limite de concorrência.
+
+Uso: python scripts/bench_llm_concurrency.py --requests 10 --latency 0.5
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+_db_dir = tempfile.mkdtemp(prefix="leggal-bench-")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_db_dir}/bench.db")
+os.environ.setdefault("ENVIRONMENT", "benchmark")
+os.environ.setdefault("OPENAI_API_KEY", "sk-stub")
+# Várias rajadas da mesma pergunta, de um IP: sem cache de respostas e sem rate limit
+os.environ.setdefault("CHAT_ANSWER_CACHE_SIZE", "0")
+os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+
+import httpx  # noqa: E402
+from openai import OpenAI  # noqa: E402
+
+from llm_stub import make_async_transport, make_sync_transport  # noqa: E402
+from app.core.config import settings  # noqa: E402
+from app.core.database import create_tables  # noqa: E402
+from app.core.llm import llm_client  # noqa: E402
+from app.main import app  # noqa: E402
+
+QUESTION = "quais são minhas tarefas urgentes?"
+# Latência do modelo "instantâneo" usado para medir o custo da própria aplicação
+INSTANT = 0.0001
+
+
+async def authenticate(client: httpx.AsyncClient) -> dict:
+    credentials = {"email": "bench@leggal.com", "password": "123456", "name": "Bench"}
+    await client.post("/auth/register", json=credentials)
+    response = await client.post(
+        "/auth/login",
+        data={"username": credentials["email"], "password": credentials["password"]}
+    )
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+async def run_async_client(n: int, latency: float) -> tuple[float, float]:
+    """Dispara N mensagens de chat pela API usando o cliente assíncrono com os limites padrão"""
+    llm_client.configure(
+        api_key="sk-stub", max_concurrency=settings.openai_max_concurrency, transport=make_async_transport(latency)
+    )
+
+    async with httpx.AsyncClient(app=app, base_url="http://bench") as client:
+        headers = await authenticate(client)
+
+        async def health_latency() -> float:
+            await asyncio.sleep(latency / 10)
+            start = time.perf_counter()
+            await client.get("/health")
+            return time.perf_counter() - start
+
+        start = time.perf_counter()
+        results = await asyncio.gather(
+            *(client.post("/chat/message", json={"message": QUESTION}, headers=headers) for _ in range(n)),
+            health_latency()
+        )
+        elapsed = time.perf_counter() - start
+
+    failures = [r for r in results[:-1] if r.status_code != 200]
+    if failures:
+        raise RuntimeError(f"{len(failures)} requisições falharam: {failures[0].text}")
+
+    await llm_client.close()
+    return elapsed, results[-1]
+
+
+async def run_sync_client(n: int, latency: float) -> float:
+    """Reproduz o comportamento antigo: cliente OpenAI síncrono chamado dentro de corrotinas"""
+    client = OpenAI(api_key="sk-stub", http_client=httpx.Client(transport=make_sync_transport(latency)))
+
+    async def legacy_answer() -> str:
+        response = client.chat.completions.create(
+            model="stub-model",
+            messages=[{"role": "user", "content": QUESTION}],
+            max_tokens=800
+        )
+        return response.choices[0].message.content
+
+    start = time.perf_counter()
+    await asyncio.gather(*(legacy_answer() for _ in range(n)))
+    return time.perf_counter() - start
+
+
+async def main(n: int, latency: float) -> None:
+    create_tables()
+
+    sync_elapsed = await run_sync_client(n, latency)
+    # Mesma rajada com o modelo instantâneo: só o custo da aplicação (a primeira também aquece o app)
+    await run_async_client(n, INSTANT)
+    overhead, _ = await run_async_client(n, INSTANT)
+    async_elapsed, health_elapsed = await run_async_client(n, latency)
+
+    waves = -(-n // settings.openai_max_concurrency)
+    target = waves * latency + overhead
+
+    print(f"\n📊 {n} requisições simultâneas, latência do LLM = {latency:.2f}s")
+    print(f"   cliente síncrono (antigo): {sync_elapsed:.2f}s ({sync_elapsed / latency:.1f}x latência)")
+    print(f"   cliente assíncrono:        {async_elapsed:.2f}s ({async_elapsed / latency:.1f}x latência)")
+    print(
+        f"   alvo:                      {target:.2f}s = {waves} x {latency:.2f}s "
+        f"(OPENAI_MAX_CONCURRENCY={settings.openai_max_concurrency}) + {overhead:.2f}s da aplicação"
+    )
+    print(f"   /health durante a rajada:  {health_elapsed * 1000:.1f}ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark de concorrência do cliente LLM")
+    parser.add_argument("--requests", type=int, default=10, help="Requisições simultâneas")
+    parser.add_argument("--latency", type=float, default=0.5, help="Latência simulada do LLM (s)")
+    args = parser.parse_args()
+
+    asyncio.run(main(args.requests, args.latency))
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Benchmark: prazos, circuit breaker e hedging das chamadas ao LLM
+(core.llm_resilience)
+
+1. Provedor travado: `--requests` análises seguidas com o provedor sem
+   responder. Compara o comportamento anterior (espera até o timeout do
+   cliente) com o prazo da operação mais o circuit breaker, que passa a
+   responder com a análise local na hora; depois o provedor volta e a chamada
+   de teste fecha o circuito.
+2. Cauda longa: `--tail` das respostas levam `--tail-latency`; compara
+   p50/p95/p99 sem e com hedging.
+
+Uso: python scripts/bench_llm_resilience.py --deadline 2 --requests 20
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+os.environ.setdefault("ENVIRONMENT", "benchmark")
+os.environ.setdefault("OPENAI_API_KEY", "sk-stub")
+
+import httpx  # noqa: E402
+
+from llm_stub import completion_payload, default_content  # noqa: E402
+from app.core.config import settings  # noqa: E402
+from app.core.llm import llm_client  # noqa: E402
+from app.core.llm_resilience import LLMGuard, llm_guards  # noqa: E402
+from app.services.ai_service import ai_service  # noqa: E402
+from app.services.analysis_cache import analysis_cache  # noqa: E402
+
+
+class Provider:
+    def __init__(self, latency: float, tail: float = 0.0, tail_latency: float = 0.0, hang_after: float = 0.0):
+        self.latency = latency
+        self.tail = tail
+        self.tail_latency = tail_latency
+        self.hang_after = hang_after
+        self.rng = random.Random(7)
+        self.requests = 0
+
+    async def handler(self, request: httpx.Request) -> httpx.Response:
+        self.requests += 1
+        if self.hang_after:
+            # Travado: o timeout de leitura do cliente (o MockTransport não aplica timeouts)
+            await asyncio.sleep(self.hang_after)
+            raise httpx.ReadTimeout("Provedor sem resposta", request=request)
+        slow = self.rng.random() < self.tail
+        await asyncio.sleep(self.tail_latency if slow else self.latency)
+        return httpx.Response(200, json=completion_payload(default_content(request)))
+
+
+def use(provider: Provider) -> None:
+    # Sem novas tentativas do cliente: o travamento aparece como um único timeout
+    llm_client.configure(transport=httpx.MockTransport(provider.handler))
+    llm_client.start()
+    llm_client._client = llm_client._client.with_options(max_retries=0)
+
+
+def percentile(values: list, fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+async def analyze_many(count: int, offset: int, concurrency: int = 1) -> list:
+    latencies = []
+    slots = asyncio.Semaphore(concurrency)
+
+    async def analyze(position: int) -> None:
+        async with slots:
+            start = time.perf_counter()
+            await ai_service.analyze_task(f"Revisar o contrato {offset + position} com o jurídico")
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    await asyncio.gather(*(analyze(position) for position in range(count)))
+    return latencies
+
+
+def guard(deadline: float, slo: float, reset: float, hedging: bool = False, breaker: bool = True) -> LLMGuard:
+    return LLMGuard(
+        "analyze",
+        deadline=deadline,
+        slo=slo,
+        failure_threshold=settings.llm_breaker_failure_threshold if breaker else sys.maxsize,
+        reset_timeout=reset,
+        hedging=hedging,
+        hedge_min_samples=settings.llm_hedge_min_samples
+    )
+
+
+async def outage(args: argparse.Namespace) -> None:
+    print(f"\n📊 Provedor travado: {args.requests} análises seguidas, timeout do cliente {args.client_timeout:g}s")
+    print(f"   {'variante':<32} | {'p50 (ms)':>8} | {'máx (ms)':>8} | {'total (s)':>9} | {'requisições':>11} | circuito")
+
+    variants = [
+        ("antes (só o timeout do cliente)", guard(3600, 3600, args.reset, breaker=False)),
+        (f"prazo {args.deadline:g}s + circuit breaker", guard(args.deadline, args.deadline / 2, args.reset)),
+    ]
+    for position, (name, candidate) in enumerate(variants):
+        llm_guards["analyze"] = candidate
+        provider = Provider(latency=0, hang_after=args.client_timeout)
+        use(provider)
+        analysis_cache.memory.clear()
+        start = time.perf_counter()
+        latencies = await analyze_many(args.requests, position * args.requests)
+        print(
+            f"   {name:<32} | {statistics.median(latencies):>8.1f} | {max(latencies):>8.1f}"
+            f" | {time.perf_counter() - start:>9.2f} | {provider.requests:>11} | {candidate.breaker.state}"
+        )
+
+    # O provedor volta: depois de `reset` segundos uma chamada de teste fecha o circuito
+    use(Provider(latency=0.05))
+    await asyncio.sleep(args.reset)
+    await analyze_many(3, 10_000)
+    print(f"   provedor de volta após {args.reset:g}s: circuito {candidate.breaker.state}; {candidate.stats()}")
+
+
+async def long_tail(args: argparse.Namespace) -> None:
+    print(
+        f"\n📊 Cauda longa: {args.tail:.0%} das respostas em {args.tail_latency * 1000:.0f} ms,"
+        f" as demais em {args.latency * 1000:.0f} ms ({args.tail_requests} análises, 8 simultâneas)"
+    )
+    print(f"   {'variante':<14} | {'p50 (ms)':>8} | {'p95 (ms)':>8} | {'p99 (ms)':>8} | {'requisições':>11} | hedges")
+    for position, hedging in enumerate((False, True)):
+        candidate = guard(settings.openai_analyze_timeout_seconds, settings.openai_analyze_slo_seconds, args.reset, hedging)
+        llm_guards["analyze"] = candidate
+        provider = Provider(args.latency, args.tail, args.tail_latency)
+        use(provider)
+        analysis_cache.memory.clear()
+        latencies = await analyze_many(args.tail_requests, 20_000 + position * args.tail_requests, concurrency=8)
+        print(
+            f"   {'com hedging' if hedging else 'sem hedging':<14} | {percentile(latencies, 0.5):>8.1f}"
+            f" | {percentile(latencies, 0.95):>8.1f} | {percentile(latencies, 0.99):>8.1f}"
+            f" | {provider.requests:>11} | {candidate.hedges} ({candidate.hedge_wins} venceram)"
+        )
+
+
+async def main(args: argparse.Namespace) -> int:
+    await outage(args)
+    await long_tail(args)
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark de prazos, circuit breaker e hedging do LLM")
+    parser.add_argument("--requests", type=int, default=20)
+    parser.add_argument("--deadline", type=float, default=2.0, help="prazo da análise (s)")
+    parser.add_argument("--client-timeout", type=float, default=3.0, help="timeout do cliente OpenAI (s)")
+    parser.add_argument("--reset", type=float, default=1.0, help="tempo com o circuito aberto (s)")
+    parser.add_argument("--latency", type=float, default=0.1)
+    parser.add_argument("--tail", type=float, default=0.05)
+    parser.add_argument("--tail-latency", type=float, default=1.5)
+    parser.add_argument("--tail-requests", type=int, default=400)
+    args = parser.parse_args()
+
+    sys.exit(asyncio.run(main(args)))
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Load test: latência de GET /tasks e de uma rota síncrona durante uma rajada
+de logins
+
+Dispara `--logins` POST /auth/login simultâneos e, enquanto eles rodam, mede
+GET /tasks (rota async) e GET /_bench/sync (rota `def` registrada pelo
+script, que roda no threadpool do AnyIO) em sequência. Compara o hash de senha no threadpool compartilhado (como antes)
+com o executor dedicado (core.password_hasher). Tudo no mesmo processo, via
+ASGI; os limites de taxa são desligados.
+
+Uso: python scripts/bench_login_storm.py --logins 100 --workers 2 [--processes]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+os.environ.setdefault("ENVIRONMENT", "benchmark")
+if "DATABASE_URL" not in os.environ:
+    os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/bench_login_storm.db"
+
+import httpx  # noqa: E402
+from sqlalchemy import insert  # noqa: E402
+from starlette.concurrency import run_in_threadpool  # noqa: E402
+
+from app.core.database import Base, engine  # noqa: E402
+from app.core.password_hasher import PasswordHasher  # noqa: E402
+from app.core.security import get_password_hash  # noqa: E402
+from app.main import app, limiter  # noqa: E402
+from app.models.models import Task, User  # noqa: E402
+from app.routers import auth as auth_router  # noqa: E402
+from app.services import auth_service  # noqa: E402
+from app.services.auth_service import AuthService  # noqa: E402
+
+PASSWORD = "senha-de-benchmark"
+
+# Sonda do threadpool: rotas `def` disputam as mesmas threads que o hash no threadpool compartilhado
+app.add_api_route("/_bench/sync", lambda: {"status": "ok"}, methods=["GET"])
+
+
+class SharedThreadpoolHasher(PasswordHasher):
+    """Comportamento anterior: run_in_threadpool, sem limite próprio"""
+
+    async def _run(self, fn, *args):
+        self.completed += 1
+        return await run_in_threadpool(fn, *args)
+
+
+def populate(logins: int) -> str:
+    Base.metadata.create_all(bind=engine)
+    hashed = get_password_hash(PASSWORD)
+    user_id = str(uuid.uuid4())
+    with engine.begin() as conn:
+        conn.execute(insert(User), [
+            {"id": user_id if i == 0 else str(uuid.uuid4()), "email": f"storm-{i}@leggal.test", "password": hashed}
+            for i in range(logins)
+        ])
+        conn.execute(insert(Task), [
+            {"id": str(uuid.uuid4()), "user_id": user_id, "title": f"Tarefa {i}"} for i in range(50)
+        ])
+    return AuthService.create_access_token("storm-0@leggal.test", user_id)
+
+
+def summary(samples: list) -> str:
+    samples = sorted(samples)
+    p95 = samples[max(0, int(len(samples) * 0.95) - 1)]
+    return f"{statistics.median(samples):>7.1f} {p95:>7.1f} {samples[-1]:>7.1f}"
+
+
+async def probe(client: httpx.AsyncClient, path: str, headers: dict, done: asyncio.Event, samples: list) -> None:
+    while not done.is_set():
+        start = time.perf_counter()
+        response = await client.get(path, headers=headers)
+        assert response.status_code == 200, response.text
+        samples.append((time.perf_counter() - start) * 1000)
+        await asyncio.sleep(0.01)
+
+
+async def run(client: httpx.AsyncClient, token: str, logins: int, storm: bool) -> dict:
+    headers = {"Authorization": f"Bearer {token}"}
+    done = asyncio.Event()
+    tasks_ms, sync_ms = [], []
+    probes = [
+        asyncio.create_task(probe(client, "/tasks/", headers, done, tasks_ms)),
+        asyncio.create_task(probe(client, "/_bench/sync", {}, done, sync_ms)),
+    ]
+
+    start = time.perf_counter()
+    statuses = []
+    if storm:
+        responses = await asyncio.gather(*[
+            client.post("/auth/login", data={"username": f"storm-{i}@leggal.test", "password": PASSWORD})
+            for i in range(logins)
+        ])
+        statuses = [response.status_code for response in responses]
+    else:
+        await asyncio.sleep(2)
+    elapsed = time.perf_counter() - start
+
+    done.set()
+    await asyncio.gather(*probes)
+    return {"tasks": tasks_ms, "sync": sync_ms, "statuses": statuses, "elapsed": elapsed}
+
+
+async def main(logins: int, workers: int, processes: bool) -> int:
+    token = populate(logins)
+    limiter.enabled = False
+    auth_router.limiter.enabled = False
+
+    print(f"\n📊 Rajada de {logins} logins ({engine.dialect.name}, {os.cpu_count()} CPU)")
+    print(f"   {'cenário':<40} | {'/tasks p50/p95/máx (ms)':>23} | {'síncrona p50/p95/máx (ms)':>25} | logins")
+
+    variants = [
+        ("threadpool compartilhado", SharedThreadpoolHasher(workers=0, max_pending=logins)),
+        (
+            f"executor dedicado ({workers} {'processos' if processes else 'threads'})",
+            PasswordHasher(workers=workers, max_pending=logins, use_processes=processes)
+        ),
+    ]
+    async with httpx.AsyncClient(app=app, base_url="http://bench", timeout=300) as client:
+        for name, hasher in variants:
+            auth_service.password_hasher = hasher
+            for storm in (False, True):
+                result = await run(client, token, logins, storm)
+                label = f"{name}{' + rajada' if storm else ''}"
+                if storm:
+                    ok = result["statuses"].count(200)
+                    logins_info = f"{ok}/{logins} em {result['elapsed']:.1f}s"
+                else:
+                    logins_info = "-"
+                print(f"   {label:<40} | {summary(result['tasks']):>23} | {summary(result['sync']):>25} | {logins_info}")
+            hasher.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load test de logins simultâneos")
+    parser.add_argument("--logins", type=int, default=100)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--processes", action="store_true", help="executor dedicado com processos")
+    args = parser.parse_args()
+
+    sys.exit(asyncio.run(main(args.logins, args.workers, args.processes)))
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Benchmark: paginação de GET /tasks com OFFSET x cursor (keyset)
+
+Popula `--rows` tarefas de um único usuário e mede o tempo de buscar a página
+N com OFFSET (como antes) e com o cursor retornado pela página anterior
+(TaskService.get_tasks). Com OFFSET o banco percorre e descarta N * limit
+linhas; com o cursor a busca começa direto no índice (user_id, created_at, id).
+
+Por padrão usa um SQLite temporário; para PostgreSQL, aponte DATABASE_URL para
+um banco descartável.
+
+Uso: python scripts/bench_pagination.py --rows 200000 --pages 1 100 1000 3000
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+os.environ.setdefault("ENVIRONMENT", "benchmark")
+if "DATABASE_URL" not in os.environ:
+    os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/bench_pagination.db"
+
+from sqlalchemy import insert, select  # noqa: E402
+
+from app.core.database import AsyncSessionLocal, Base, engine  # noqa: E402
+from app.models.models import Task, User  # noqa: E402
+from app.models.schemas import TaskFilters  # noqa: E402
+from app.services.task_service import TaskService  # noqa: E402
+from app.utils.pagination import encode_cursor  # noqa: E402
+
+CHUNK = 10000
+
+
+def populate(rows: int) -> str:
+    Base.metadata.create_all(bind=engine)
+    user_id = str(uuid.uuid4())
+    start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    with engine.begin() as conn:
+        conn.execute(insert(User), [{"id": user_id, "email": f"bench-{user_id}@leggal.test", "password": "-"}])
+        for offset in range(0, rows, CHUNK):
+            conn.execute(insert(Task), [
+                {
+                    "id": str(uuid.uuid4()),
+                    "user_id": user_id,
+                    "title": f"Tarefa {i}",
+                    "created_at": start + timedelta(seconds=i),
+                }
+                for i in range(offset, min(offset + CHUNK, rows))
+            ])
+    return user_id
+
+
+async def offset_page(user_id: str, page: int, limit: int) -> float:
+    async with AsyncSessionLocal() as db:
+        start = time.perf_counter()
+        await db.execute(
+            select(Task).where(Task.user_id == user_id)
+            .order_by(Task.created_at.desc(), Task.id.desc())
+            .offset(page * limit).limit(limit)
+        )
+        return time.perf_counter() - start
+
+
+async def cursor_page(user_id: str, page: int, limit: int) -> float:
+    # Cursor equivalente ao retornado pela página anterior
+    cursor = None
+    if page:
+        async with AsyncSessionLocal() as db:
+            last = (await db.execute(
+                select(Task.created_at, Task.id).where(Task.user_id == user_id)
+                .order_by(Task.created_at.desc(), Task.id.desc())
+                .offset(page * limit - 1).limit(1)
+            )).one()
+        cursor = encode_cursor(*last)
+
+    async with AsyncSessionLocal() as db:
+        start = time.perf_counter()
+        await TaskService.get_tasks(db, user_id, TaskFilters(limit=limit, cursor=cursor))
+        return time.perf_counter() - start
+
+
+async def best_of(fn, repeat: int) -> float:
+    return min([await fn() for _ in range(repeat)]) * 1000
+
+
+async def main(rows: int, pages: list, limit: int, repeat: int) -> int:
+    print(f"\n📊 Paginação de {rows} tarefas ({engine.dialect.name}, limit {limit}, melhor de {repeat})")
+    user_id = populate(rows)
+
+    print(f"   {'página':>7} | {'OFFSET (ms)':>11} | {'cursor (ms)':>11}")
+    for page in pages:
+        if page * limit >= rows:
+            continue
+        offset_ms = await best_of(lambda: offset_page(user_id, page, limit), repeat)
+        cursor_ms = await best_of(lambda: cursor_page(user_id, page, limit), repeat)
+        print(f"   {page:>7} | {offset_ms:>11.2f} | {cursor_ms:>11.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark da paginação por cursor")
+    parser.add_argument("--rows", type=int, default=200000)
+    parser.add_argument("--pages", type=int, nargs="+", default=[0, 10, 100, 1000, 3000])
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    sys.exit(asyncio.run(main(args.rows, args.pages, args.limit, args.repeat)))
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Benchmark: busca de tarefas similares com varredura completa x índice invertido
+
+A varredura completa (AIService.search_similar_tasks) re-tokeniza todas as
+tarefas a cada consulta; o índice invertido só percorre as listas dos tokens
+da consulta. Também confere que os scores de Jaccard são idênticos.
+
+Uso: python scripts/bench_search_index.py --sizes 1000 10000 100000
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+os.environ.setdefault("ENVIRONMENT", "benchmark")
+
+from app.services.ai_service import ai_service  # noqa: E402
+from app.services.search_index import UserTaskIndex, task_tokens  # noqa: E402
+
+VERBS = ["revisar", "enviar", "comprar", "agendar", "preparar", "ligar", "organizar", "pagar"]
+OBJECTS = [
+    "contrato", "relatório", "proposta", "apresentação", "orçamento", "fatura",
+    "planilha", "reunião", "café", "material", "passagem", "documentação",
+]
+CONTEXT = ["cliente", "equipe", "fornecedor", "diretoria", "projeto", "escritório", "banco", "time"]
+QUERIES = ["revisar contrato cliente", "comprar café escritório", "agendar reunião diretoria", "pagar fatura banco"]
+
+
+def generate_tasks(n: int, seed: int = 7) -> list:
+    rng = random.Random(seed)
+    tasks = []
+    for i in range(n):
+        verb, obj, ctx = rng.choice(VERBS), rng.choice(OBJECTS), rng.choice(CONTEXT)
+        tasks.append(SimpleNamespace(
+            id=f"task-{i}",
+            title=f"{verb.capitalize()} {obj} {i}",
+            description=f"{verb} o {obj} do {ctx} até {rng.choice(['segunda', 'sexta', 'amanhã'])}",
+            ai_title=f"{obj.capitalize()} do {ctx}",
+            ai_summary=f"Tarefa de {verb} {obj}",
+            raw_message=f"Preciso {verb} o {obj} do {ctx} número {i}"
+        ))
+    return tasks
+
+
+def build_index(tasks: list) -> UserTaskIndex:
+    index = UserTaskIndex()
+    for task in tasks:
+        index.add(task.id, task_tokens(task.title, task.description, task.ai_title, task.ai_summary, task.raw_message))
+    return index
+
+
+async def main(sizes: list[int], top_k: int) -> int:
+    print(f"\n📊 Busca de similares (top {top_k}, média de {len(QUERIES)} consultas)")
+    print(f"   {'tarefas':>8} | {'varredura (ms)':>14} | {'índice (ms)':>11} | {'construção (ms)':>15}")
+
+    for size in sizes:
+        tasks = generate_tasks(size)
+
+        start = time.perf_counter()
+        index = build_index(tasks)
+        build_ms = (time.perf_counter() - start) * 1000
+
+        scan_total = index_total = 0.0
+        for query in QUERIES:
+            start = time.perf_counter()
+            expected = await ai_service.search_similar_tasks(query, tasks, top_k)
+            scan_total += time.perf_counter() - start
+
+            start = time.perf_counter()
+            found = index.search(query, top_k)
+            index_total += time.perf_counter() - start
+
+            expected_scores = sorted(round(item["similarity"], 12) for item in expected)
+            found_scores = sorted(round(similarity, 12) for _, similarity in found)
+            if expected_scores != found_scores:
+                print(f"❌ Scores divergentes para '{query}': {expected_scores} != {found_scores}")
+                return 1
+
+        scan_ms = scan_total / len(QUERIES) * 1000
+        index_ms = index_total / len(QUERIES) * 1000
+        print(f"   {size:>8} | {scan_ms:>14.2f} | {index_ms:>11.2f} | {build_ms:>15.1f}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark do índice invertido de busca")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--top-k", type=int, default=5)
+    args = parser.parse_args()
+
+    sys.exit(asyncio.run(main(args.sizes, args.top_k)))
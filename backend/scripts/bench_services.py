@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+"""
+Microbenchmarks dos caminhos quentes dos serviços, com baseline em JSON e
+verificação de regressão
+
+Para cada tamanho em `--sizes` um usuário sintético recebe N tarefas e N/2
+mensagens de chat; mede TaskService.get_tasks (primeira página, filtros e
+busca), get_task_stats, search_similar_tasks (índice quente e frio) e o
+histórico do chat. classify_message_type e AIService._analyze_simplified não
+dependem do banco e são medidos uma vez.
+
+Por padrão usa um SQLite temporário; para PostgreSQL, aponte DATABASE_URL para
+um banco descartável. Baselines de bancos ou máquinas diferentes não são
+comparáveis.
+
+    python scripts/bench_services.py run --sizes 1000 100000 --save baseline.json
+    python scripts/bench_services.py run --sizes 1000 100000 --baseline baseline.json --threshold 0.2
+    python scripts/bench_services.py compare baseline.json atual.json --threshold 0.2
+
+A comparação usa a mediana de cada caso e sai com código 1 se algum ficar
+mais de `--threshold` acima da baseline (e mais de `--min-delta-ms`, para
+ignorar ruído nos casos de microssegundos).
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, Dict, List
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+os.environ.setdefault("ENVIRONMENT", "benchmark")
+if "DATABASE_URL" not in os.environ:
+    os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/bench_services.db"
+
+from sqlalchemy import insert  # noqa: E402
+
+from app.core.database import AsyncSessionLocal, Base, engine  # noqa: E402
+from app.models.models import ChatMessage, Priority, Task, TaskStatus, User  # noqa: E402
+from app.models.schemas import SearchMode, TaskFilters  # noqa: E402
+from app.routers.chat import classify_message_type, get_chat_history  # noqa: E402
+from app.services.ai_service import ai_service  # noqa: E402
+from app.services.search_index import task_search_index  # noqa: E402
+from app.services.task_service import TaskService  # noqa: E402
+
+VERBS = ["revisar", "enviar", "comprar", "agendar", "preparar", "ligar", "organizar", "pagar", "atualizar", "cancelar"]
+OBJECTS = [
+    "contrato", "relatório", "proposta", "apresentação", "orçamento", "fatura", "planilha", "reunião",
+    "café", "material", "passagem", "documentação", "backup", "servidor", "campanha", "auditoria",
+]
+CONTEXT = ["cliente", "equipe", "fornecedor", "diretoria", "projeto", "escritório", "banco", "jurídico"]
+MESSAGES = [
+    "Quais são minhas tarefas urgentes?",
+    "bom dia!",
+    "Preciso enviar o relatório para o cliente até sexta",
+    "Marcar reunião com o time de vendas amanhã às 10h",
+    "o que tenho pendente?",
+    "Revisar o contrato com o jurídico, é urgente",
+    "valeu",
+    "Comprar material de escritório para o projeto novo",
+]
+CHUNK = 10000
+
+
+def populate(size: int, seed: int) -> User:
+    """Usuário com `size` tarefas e `size // 2` mensagens de chat"""
+    rng = random.Random(seed)
+    user = User(id=str(uuid.uuid4()), email=f"bench-{size}-{uuid.uuid4().hex[:8]}@leggal.test", password="-")
+    start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    with engine.begin() as conn:
+        conn.execute(insert(User), [{"id": user.id, "email": user.email, "password": user.password}])
+
+    for offset in range(0, size, CHUNK):
+        rows = []
+        for i in range(offset, min(offset + CHUNK, size)):
+            verb, obj, ctx = rng.choice(VERBS), rng.choice(OBJECTS), rng.choice(CONTEXT)
+            rows.append({
+                "id": str(uuid.uuid4()),
+                "user_id": user.id,
+                "title": f"{verb.capitalize()} {obj}",
+                "description": f"{verb} o {obj} do {ctx} até sexta",
+                "raw_message": f"preciso {verb} o {obj} do {ctx}",
+                "priority": rng.choice(list(Priority)),
+                "status": rng.choice(list(TaskStatus)),
+                "created_at": start + timedelta(seconds=i),
+            })
+        with engine.begin() as conn:
+            conn.execute(insert(Task), rows)
+
+    for offset in range(0, size // 2, CHUNK):
+        with engine.begin() as conn:
+            conn.execute(insert(ChatMessage), [
+                {
+                    "id": str(uuid.uuid4()),
+                    "user_id": user.id,
+                    "message": rng.choice(MESSAGES),
+                    "is_user": i % 2 == 0,
+                    "created_at": start + timedelta(seconds=i),
+                }
+                for i in range(offset, min(offset + CHUNK, size // 2))
+            ])
+    return user
+
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    ordered = sorted(samples)
+    return {
+        "median_ms": ordered[len(ordered) // 2],
+        "p95_ms": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+        "min_ms": ordered[0],
+        "rounds": len(ordered),
+    }
+
+
+async def measure(fn: Callable[[], Awaitable], rounds: int, number: int = 1) -> Dict[str, float]:
+    """Tempo por chamada (ms) em `rounds` rodadas de `number` chamadas, após uma de aquecimento"""
+    await fn()
+    samples = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for _ in range(number):
+            await fn()
+        samples.append((time.perf_counter() - start) / number * 1000)
+    return summarize(samples)
+
+
+def in_session(call: Callable) -> Callable[[], Awaitable]:
+    """Uma sessão por chamada, como numa requisição"""
+    async def run():
+        async with AsyncSessionLocal() as db:
+            return await call(db)
+    return run
+
+
+def sized_cases(user: User) -> Dict[str, Callable[[], Awaitable]]:
+    async def cold_similar(db):
+        task_search_index._indexes.pop(user.id, None)
+        return await TaskService.search_similar_tasks(db, "contrato do cliente", user.id)
+
+    return {
+        "get_tasks": in_session(lambda db: TaskService.get_tasks(db, user.id, TaskFilters(limit=50))),
+        "get_tasks_filtered": in_session(lambda db: TaskService.get_tasks(
+            db, user.id, TaskFilters(status=TaskStatus.PENDING, priority=Priority.HIGH, limit=50)
+        )),
+        "get_tasks_search": in_session(lambda db: TaskService.get_tasks(
+            db, user.id, TaskFilters(search="contrato cliente", limit=50)
+        )),
+        "get_task_stats": in_session(lambda db: TaskService.get_task_stats(db, user.id)),
+        "search_similar_tasks": in_session(lambda db: TaskService.search_similar_tasks(
+            db, "contrato do cliente", user.id, mode=SearchMode.LEXICAL
+        )),
+        "search_similar_tasks_cold": in_session(cold_similar),
+        "chat_history": in_session(lambda db: get_chat_history(limit=50, cursor=None, current_user=user, db=db)),
+    }
+
+
+async def run(args: argparse.Namespace) -> dict:
+    Base.metadata.create_all(bind=engine)
+    results = {}
+
+    print(f"\n📊 Serviços ({engine.dialect.name}, {args.rounds} rodadas por caso)")
+    print(f"   {'caso':<36} | {'mediana (ms)':>12} | {'p95 (ms)':>9} | {'mín (ms)':>9}")
+
+    def report(name: str, result: dict) -> None:
+        results[name] = result
+        print(f"   {name:<36} | {result['median_ms']:>12.3f} | {result['p95_ms']:>9.3f} | {result['min_ms']:>9.3f}")
+
+    messages = [MESSAGES[i % len(MESSAGES)] + f" {i}" for i in range(1000)]
+    cursor = iter(range(sys.maxsize))
+
+    async def classify():
+        return await classify_message_type(messages[next(cursor) % len(messages)])
+
+    async def simplified():
+        return ai_service._analyze_simplified(messages[next(cursor) % len(messages)])
+
+    report("classify_message_type", await measure(classify, args.rounds, number=len(messages)))
+    report("analyze_simplified", await measure(simplified, args.rounds, number=len(messages)))
+
+    for size in args.sizes:
+        start = time.perf_counter()
+        user = populate(size, args.seed)
+        print(f"   -- {size} tarefas, {size // 2} mensagens (populado em {time.perf_counter() - start:.1f}s)")
+        for name, fn in sized_cases(user).items():
+            # Reconstruir o índice a cada rodada fica caro nos tamanhos grandes
+            rounds = min(args.rounds, 3) if name.endswith("_cold") else args.rounds
+            report(f"{name}[{size}]", await measure(fn, rounds))
+
+    return {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "dialect": engine.dialect.name,
+            "python": platform.python_version(),
+            "machine": f"{platform.system()} {platform.machine()} ({os.cpu_count()} CPUs)",
+            "sizes": args.sizes,
+            "rounds": args.rounds,
+        },
+        "results": results,
+    }
+
+
+def compare(baseline: dict, current: dict, threshold: float, min_delta_ms: float) -> int:
+    """Imprime a comparação caso a caso e retorna o número de regressões"""
+    if baseline["meta"].get("dialect") != current["meta"].get("dialect"):
+        print(f"\n⚠️  Bancos diferentes: {baseline['meta'].get('dialect')} x {current['meta'].get('dialect')}")
+    if baseline["meta"].get("machine") != current["meta"].get("machine"):
+        print(f"\n⚠️  Máquinas diferentes: {baseline['meta'].get('machine')} x {current['meta'].get('machine')}")
+
+    print(f"\n📊 Comparação com a baseline de {baseline['meta'].get('created_at', '?')} (limite +{threshold:.0%})")
+    print(f"   {'caso':<36} | {'baseline (ms)':>13} | {'atual (ms)':>10} | {'variação':>8} |")
+    regressions = 0
+    for name, result in current["results"].items():
+        before = baseline["results"].get(name)
+        after = result["median_ms"]
+        if before is None:
+            print(f"   {name:<36} | {'-':>13} | {after:>10.3f} | {'-':>8} | novo")
+            continue
+        before = before["median_ms"]
+        change = after / before - 1 if before else 0.0
+        regressed = change > threshold and after - before > min_delta_ms
+        regressions += regressed
+        print(
+            f"   {name:<36} | {before:>13.3f} | {after:>10.3f} | {change:>+8.1%} |"
+            f" {'❌ regressão' if regressed else '✅'}"
+        )
+    for name in baseline["results"].keys() - current["results"].keys():
+        print(f"   {name:<36} | não medido nesta execução")
+    return regressions
+
+
+def load(path: str) -> dict:
+    with open(path) as file:
+        return json.load(file)
+
+
+def gate(regressions: int) -> int:
+    if regressions:
+        print(f"\n❌ {regressions} caso(s) acima do limite")
+        return 1
+    print("\n✅ Nenhuma regressão")
+    return 0
+
+
+async def main(args: argparse.Namespace) -> int:
+    if args.command == "compare":
+        return gate(compare(load(args.baseline), load(args.current), args.threshold, args.min_delta_ms))
+
+    current = await run(args)
+    if args.save:
+        with open(args.save, "w") as output:
+            json.dump(current, output, indent=2)
+        print(f"\n   resultado em {args.save}")
+    if args.baseline:
+        return gate(compare(load(args.baseline), current, args.threshold, args.min_delta_ms))
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Microbenchmarks dos serviços com verificação de regressão")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="mede os serviços")
+    run_parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 100000], help="tarefas por usuário")
+    run_parser.add_argument("--rounds", type=int, default=20)
+    run_parser.add_argument("--seed", type=int, default=5)
+    run_parser.add_argument("--save", default=None, help="grava o resultado (JSON) neste arquivo")
+    run_parser.add_argument("--baseline", default=None, help="compara com esta baseline ao final")
+
+    compare_parser = commands.add_parser("compare", help="compara dois resultados salvos")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+
+    for command in (run_parser, compare_parser):
+        command.add_argument("--threshold", type=float, default=0.2, help="regressão máxima da mediana (fração)")
+        command.add_argument("--min-delta-ms", type=float, default=0.05, help="diferença mínima para contar (ms)")
+    args = parser.parse_args()
+
+    sys.exit(asyncio.run(main(args)))
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Benchmark: busca de similares lexical (Jaccard) x vetorial (embeddings)
+
+Gera tarefas sintéticas agrupadas por tema, com as palavras de cada tema em
+flexões diferentes ("revisar"/"revisão"/"revisando"), e consultas que usam a
+última flexão de cada grupo, nunca presente nas tarefas, mais uma palavra
+comum ("para", "hoje"). Mede:
+
+- acerto@k: fração do top-k que pertence ao tema da consulta;
+- latência por consulta do índice invertido (Jaccard), da matriz NumPy
+  (produto matriz-vetor + argpartition) e do FAISS HNSW, se instalado;
+- recall@k do FAISS em relação à busca exata com NumPy, por score (as
+  tarefas sintéticas se repetem, então há muitos empates entre ids).
+
+Usa o backend de embedding configurado (hashing por padrão).
+
+Uso: python scripts/bench_vector_search.py --sizes 1000 10000 100000
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+os.environ.setdefault("ENVIRONMENT", "benchmark")
+
+from app.services.embedding_service import embedding_service  # noqa: E402
+from app.services.search_index import UserTaskIndex, tokenize  # noqa: E402
+from app.services import vector_index  # noqa: E402
+from app.services.vector_index import UserVectorIndex  # noqa: E402
+
+# Cada tema é uma lista de grupos de flexões da mesma palavra
+TOPICS = {
+    "contratos": [["contrato", "contratos", "contratual", "contratação"], ["revisar", "revisão", "revisando", "revise"],
+                  ["cláusula", "cláusulas"], ["assinar", "assinatura", "assinado"]],
+    "compras": [["comprar", "compra", "compras", "comprando"], ["café", "cafés", "cafeteira"],
+                ["material", "materiais"], ["escritório", "escritórios"]],
+    "reuniões": [["reunião", "reuniões", "reunir"], ["agendar", "agenda", "agendamento"],
+                 ["diretoria", "diretor", "diretores"], ["pauta", "pautas"]],
+    "financeiro": [["pagar", "pagamento", "pagamentos", "pago"], ["fatura", "faturas", "faturamento"],
+                   ["boleto", "boletos"], ["banco", "bancário", "bancária"]],
+    "viagens": [["viagem", "viagens", "viajar"], ["passagem", "passagens"],
+                ["hotel", "hotéis", "hospedagem"], ["reservar", "reserva", "reservas"]],
+    "relatórios": [["relatório", "relatórios"], ["enviar", "envio", "enviado"],
+                   ["mensal", "mensais", "mês"], ["indicador", "indicadores"]],
+    "contratações": [["entrevista", "entrevistas", "entrevistar"], ["candidato", "candidatos", "candidata"],
+                     ["vaga", "vagas"], ["currículo", "currículos"]],
+    "suporte": [["ligar", "ligação", "ligações"], ["cliente", "clientes"],
+                ["reclamação", "reclamações", "reclamar"], ["chamado", "chamados"]],
+}
+FILLER = ["o", "a", "do", "da", "para", "com", "hoje", "amanhã", "equipe", "semana", "urgente", "até", "sexta"]
+
+
+def generate_tasks(n: int, seed: int = 11) -> list:
+    rng = random.Random(seed)
+    topics = list(TOPICS)
+    tasks = []
+    for i in range(n):
+        topic = topics[i % len(topics)]
+        words = [rng.choice(group[:-1]) for group in rng.sample(TOPICS[topic], 3)]
+        words += rng.sample(FILLER, 3)
+        rng.shuffle(words)
+        tasks.append((f"task-{i}", topic, " ".join(words)))
+    return tasks
+
+
+def generate_queries(n: int, seed: int = 23) -> list:
+    rng = random.Random(seed)
+    topics = list(TOPICS)
+    queries = []
+    for i in range(n):
+        topic = topics[i % len(topics)]
+        words = [group[-1] for group in rng.sample(TOPICS[topic], 2)] + [rng.choice(FILLER)]
+        queries.append((topic, " ".join(words)))
+    return queries
+
+
+def timed(fn, queries: list) -> tuple:
+    start = time.perf_counter()
+    results = [fn(query) for query in queries]
+    return results, (time.perf_counter() - start) / len(queries) * 1000
+
+
+def hit_rate(results: list, queries: list, topic_of: dict, top_k: int) -> float:
+    hits = sum(sum(1 for task_id, _ in found if topic_of[task_id] == topic) for found, (topic, _) in zip(results, queries))
+    return hits / (len(queries) * top_k)
+
+
+def score_recall(approximate: list, exact: list) -> float:
+    """Fração dos resultados exatos cujo score o FAISS alcançou"""
+    found = expected = 0
+    for approx, ex in zip(approximate, exact):
+        if not ex:
+            continue
+        kth = ex[-1][1] - 1e-5
+        found += min(sum(1 for _, score in approx if score >= kth), len(ex))
+        expected += len(ex)
+    return found / max(expected, 1)
+
+
+def main(sizes: list, top_k: int, n_queries: int, with_faiss: bool) -> int:
+    queries = generate_queries(n_queries)
+    query_vectors = embedding_service.embedder.embed([text for _, text in queries])
+    dimensions = embedding_service.dimensions
+
+    print(f"\n📊 Similares: Jaccard x embeddings ({embedding_service.name}), top {top_k}, {n_queries} consultas")
+    print(f"   {'tarefas':>8} | {'acerto Jaccard':>14} | {'acerto vetor':>12} | {'Jaccard (ms)':>12} | "
+          f"{'NumPy (ms)':>10} | {'FAISS (ms)':>10} | {'recall FAISS':>12} | {'HNSW (s)':>8}")
+
+    for size in sizes:
+        tasks = generate_tasks(size)
+        topic_of = {task_id: topic for task_id, topic, _ in tasks}
+
+        lexical = UserTaskIndex()
+        for task_id, _, text in tasks:
+            lexical.add(task_id, tokenize(text))
+
+        vectors = embedding_service.embedder.embed([text for _, _, text in tasks])
+        exact = UserVectorIndex(dimensions, faiss_min_vectors=size + 1)
+        for (task_id, _, _), vector in zip(tasks, vectors):
+            exact.add(task_id, vector)
+
+        lexical_results, lexical_ms = timed(lambda q: lexical.search(q[1], top_k), queries)
+        exact_results, exact_ms = timed(lambda v: exact.search(v, top_k), list(query_vectors))
+
+        faiss_ms = recall = build_s = None
+        if with_faiss and vector_index.FAISS_AVAILABLE:
+            approximate = UserVectorIndex(dimensions, faiss_min_vectors=1)
+            for (task_id, _, _), vector in zip(tasks, vectors):
+                approximate.add(task_id, vector)
+            start = time.perf_counter()
+            asyncio.run(approximate.build_faiss())
+            build_s = time.perf_counter() - start
+            faiss_results, faiss_ms = timed(lambda v: approximate.search(v, top_k), list(query_vectors))
+            recall = score_recall(faiss_results, exact_results)
+
+        fmt = lambda value, spec: format(value, spec) if value is not None else "-"  # noqa: E731
+        print(f"   {size:>8} | {hit_rate(lexical_results, queries, topic_of, top_k):>14.1%} | "
+              f"{hit_rate(exact_results, queries, topic_of, top_k):>12.1%} | {lexical_ms:>12.2f} | "
+              f"{exact_ms:>10.2f} | {fmt(faiss_ms, '>10.2f'):>10} | {fmt(recall, '>12.1%'):>12} | "
+              f"{fmt(build_s, '>8.1f'):>8}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark da busca vetorial de tarefas")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--no-faiss", action="store_true", help="Não mede o índice FAISS")
+    args = parser.parse_args()
+
+    sys.exit(main(args.sizes, args.top_k, args.queries, not args.no_faiss))
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Benchmark: ingestão de uma rajada do webhook, mensagem a mensagem x em lote
+
+Envia `--messages` mensagens de tarefa pelo POST /webhook/message (fila
+durável, consumida por 1 e por `--concurrency` workers) e pelo
+POST /webhook/messages:batch, contra um LLM simulado com latência fixa
+(scripts/llm_stub.py). Mede o tempo que o gateway espera pelas respostas, o
+tempo até todas as tarefas existirem e o número de commits.
+
+Uso: python scripts/bench_webhook_batch.py --messages 200 --latency 0.05
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+os.environ.setdefault("ENVIRONMENT", "benchmark")
+os.environ.setdefault("OPENAI_API_KEY", "sk-stub")
+if "DATABASE_URL" not in os.environ:
+    os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/bench_webhook.db"
+
+import httpx  # noqa: E402
+from sqlalchemy import event  # noqa: E402
+
+from llm_stub import make_async_transport  # noqa: E402
+from app.core.database import async_engine, create_tables  # noqa: E402
+from app.core.llm import llm_client  # noqa: E402
+from app.main import app  # noqa: E402
+from app.services.webhook_queue import webhook_queue  # noqa: E402
+
+VERBS = ["Enviar", "Revisar", "Preparar", "Agendar", "Pagar"]
+OBJECTS = ["o relatório", "o contrato", "a proposta", "a reunião", "a fatura"]
+
+commits = 0
+
+
+@event.listens_for(async_engine.sync_engine, "commit")
+def count_commit(conn) -> None:
+    global commits
+    commits += 1
+
+
+def messages(n: int, offset: int) -> list:
+    return [
+        {"message": f"Preciso {VERBS[i % 5].lower()} {OBJECTS[(i // 5) % 5]} do cliente {offset + i}"}
+        for i in range(n)
+    ]
+
+
+async def main(n: int, latency: float, concurrency: int) -> int:
+    global commits
+    create_tables()
+    llm_client.configure(transport=make_async_transport(latency, token_interval=0))
+
+    async with httpx.AsyncClient(app=app, base_url="http://bench", timeout=300) as client:
+        credentials = {"email": "bench@leggal.com", "password": "123456", "name": "Bench"}
+        user = (await client.post("/auth/register", json=credentials)).json()
+        headers = {"X-User-Id": user["id"]}
+
+        async def queued(batch: list, workers: int) -> float:
+            """Enfileira uma a uma; retorna o tempo até o gateway ter todas as respostas"""
+            start = time.perf_counter()
+            job_urls = []
+            for payload in batch:
+                response = await client.post("/webhook/message", json=payload, headers=headers)
+                assert response.status_code == 202, response.text
+                job_urls.append(response.headers["location"])
+            accepted = time.perf_counter() - start
+
+            webhook_queue.start(workers)
+            for url in job_urls:
+                while (await client.get(url, headers=headers)).json()["status"] != "DONE":
+                    await asyncio.sleep(0.05)
+            await webhook_queue.stop()
+            return accepted
+
+        async def batched(batch: list) -> float:
+            start = time.perf_counter()
+            response = await client.post("/webhook/messages:batch", json=batch, headers=headers)
+            assert response.status_code == 200 and response.json()["created"] == len(batch), response.text
+            return time.perf_counter() - start
+
+        variants = [
+            ("fila, 1 worker", lambda batch: queued(batch, 1)),
+            (f"fila, {concurrency} workers", lambda batch: queued(batch, concurrency)),
+            ("lote", batched),
+        ]
+
+        print(f"\n📊 Rajada de {n} mensagens (LLM com latência {latency * 1000:.0f} ms)")
+        print(f"   {'envio':<16} | {'gateway (s)':>11} | {'tarefas (s)':>11} | {'commits':>7}")
+        for position, (name, run) in enumerate(variants):
+            commits = 0
+            start = time.perf_counter()
+            gateway = await run(messages(n, position * n))
+            elapsed = time.perf_counter() - start
+            print(f"   {name:<16} | {gateway:>11.2f} | {elapsed:>11.2f} | {commits:>7}")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark do webhook em lote")
+    parser.add_argument("--messages", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+
+    sys.exit(asyncio.run(main(args.messages, args.latency, args.concurrency)))
@@ -0,0 +1,127 @@
+"""
+Modelo OpenAI simulado para benchmarks offline: transportes httpx em processo
+e as peças usadas também pelo servidor HTTP (scripts/llm_stub_server.py)
+"""
+import asyncio
+import json
+import re
+import time
+from typing import Callable, Optional
+
+import httpx
+
+DEFAULT_ANSWER = "Olá! 👋 Você tem 3 tarefas pendentes. Minha missão é otimizar seu tempo!"
+DEFAULT_ANALYSIS = json.dumps({
+    "title": "Revisar contrato",
+    "summary": "Revisar o contrato recebido hoje",
+    "priority": "HIGH",
+    "reasoning": "Contrato com prazo curto"
+})
+
+
+def completion_payload(content: str, model: str = "stub-model") -> dict:
+    """Corpo de resposta no formato de /v1/chat/completions"""
+    return {
+        "id": "chatcmpl-stub",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [{
+            "index": 0,
+            "message": {"role": "assistant", "content": content},
+            "finish_reason": "stop"
+        }],
+        "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}
+    }
+
+
+def chunk_payload(content: str, model: str = "stub-model", finish_reason: Optional[str] = None) -> dict:
+    """Trecho de resposta no formato de /v1/chat/completions com stream=True"""
+    return {
+        "id": "chatcmpl-stub",
+        "object": "chat.completion.chunk",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [{
+            "index": 0,
+            "delta": {"content": content} if content else {},
+            "finish_reason": finish_reason
+        }]
+    }
+
+
+def split_tokens(content: str) -> list[str]:
+    """Quebra o texto em "tokens" (palavras com o espaço à frente)"""
+    words = content.split(" ")
+    return [words[0]] + [f" {word}" for word in words[1:]]
+
+
+def batch_size(prompt: str) -> int:
+    """Número de mensagens num prompt de análise em lote (0 se não for um)"""
+    if "Responda APENAS com um array JSON" not in prompt:
+        return 0
+    return len(re.findall(r"^\[\d+\] ", prompt, re.MULTILINE))
+
+
+def default_content(request: httpx.Request) -> str:
+    return content_for(json.loads(request.content or b"{}"))
+
+
+def content_for(body: dict) -> str:
+    """Responde JSON de análise para prompts de análise (array no lote) e texto livre para perguntas"""
+    prompt = (body.get("messages") or [{}])[-1].get("content", "")
+    size = batch_size(prompt)
+    if size:
+        analysis = json.loads(DEFAULT_ANALYSIS)
+        return json.dumps([{"index": index, **analysis} for index in range(size)], ensure_ascii=False)
+    if "Responda APENAS com um JSON" in prompt:
+        return DEFAULT_ANALYSIS
+    return DEFAULT_ANSWER
+
+
+async def stream_events(content: str, token_interval: float):
+    """Corpo SSE de uma resposta com stream=True, um trecho por token"""
+    for token in split_tokens(content):
+        yield f"data: {json.dumps(chunk_payload(token))}\n\n".encode()
+        await asyncio.sleep(token_interval)
+    yield f"data: {json.dumps(chunk_payload('', finish_reason='stop'))}\n\n".encode()
+    yield b"data: [DONE]\n\n"
+
+
+def make_async_transport(
+    latency: float = 0.5,
+    content_fn: Optional[Callable[[httpx.Request], str]] = None,
+    token_interval: float = 0.01
+) -> httpx.MockTransport:
+    """
+    Transporte assíncrono que simula a latência do modelo sem bloquear o loop;
+    com stream=True, `latency` é o tempo até o primeiro token
+    """
+    content_fn = content_fn or default_content
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(latency)
+        content = content_fn(request)
+        if json.loads(request.content or b"{}").get("stream"):
+            return httpx.Response(
+                200,
+                headers={"content-type": "text/event-stream"},
+                content=stream_events(content, token_interval)
+            )
+        return httpx.Response(200, json=completion_payload(content))
+
+    return httpx.MockTransport(handler)
+
+
+def make_sync_transport(
+    latency: float = 0.5,
+    content_fn: Optional[Callable[[httpx.Request], str]] = None
+) -> httpx.MockTransport:
+    """Transporte síncrono (bloqueante), equivalente ao cliente OpenAI síncrono"""
+    content_fn = content_fn or default_content
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        time.sleep(latency)
+        return httpx.Response(200, json=completion_payload(content_fn(request)))
+
+    return httpx.MockTransport(handler)
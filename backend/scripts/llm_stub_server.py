@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Servidor HTTP compatível com a API da OpenAI (POST /v1/chat/completions),
+para rodar a API e os testes de carga sem rede e sem chave
+
+As respostas vêm de scripts/llm_stub.py (JSON de análise, array nas análises
+em lote, texto livre nas perguntas). Latência por distribuição (fixa,
+uniforme ou lognormal, mais uma cauda opcional), stream token a token e
+injeção de falhas: 500, 429 com Retry-After e requisições que travam.
+
+    python scripts/llm_stub_server.py --port 8100 --latency-ms 300 --distribution lognormal
+    OPENAI_BASE_URL=http://127.0.0.1:8100/v1 OPENAI_API_KEY=sk-stub uvicorn app.main:app
+
+O perfil pode ser trocado com o servidor no ar (PUT /stub/profile, com os
+campos a mudar) e os contadores ficam em GET /stub/stats.
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import sys
+import time
+from dataclasses import asdict, dataclass, fields
+from typing import Optional
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+import uvicorn  # noqa: E402
+from fastapi import FastAPI, Request  # noqa: E402
+from fastapi.responses import JSONResponse, StreamingResponse  # noqa: E402
+
+from llm_stub import completion_payload, content_for, stream_events  # noqa: E402
+
+DISTRIBUTIONS = ("fixed", "uniform", "lognormal")
+
+
+@dataclass
+class Profile:
+    latency_ms: float = 300.0  # mediana até a resposta (ou até o primeiro token, no stream)
+    distribution: str = "lognormal"
+    jitter: float = 0.3  # lognormal: sigma; uniform: ± fração da mediana
+    tail_rate: float = 0.0  # fração das requisições com `tail_ms` de latência
+    tail_ms: float = 2000.0
+    token_interval_ms: float = 10.0
+    error_rate: float = 0.0  # 500
+    rate_limit_rate: float = 0.0  # 429
+    hang_rate: float = 0.0  # não responde por `hang_seconds`
+    hang_seconds: float = 120.0
+
+    def latency(self, rng: random.Random) -> float:
+        if self.tail_rate and rng.random() < self.tail_rate:
+            return self.tail_ms / 1000
+        median = self.latency_ms / 1000
+        if self.distribution == "uniform":
+            return max(0.0, median * (1 + rng.uniform(-self.jitter, self.jitter)))
+        if self.distribution == "lognormal":
+            return median * math.exp(rng.gauss(0, self.jitter))
+        return median
+
+
+class StubState:
+    def __init__(self, profile: Profile, seed: Optional[int]):
+        self.profile = profile
+        self.rng = random.Random(seed)
+        self.started_at = time.time()
+        self.requests = 0
+        self.streams = 0
+        self.errors = 0
+        self.rate_limited = 0
+        self.hung = 0
+        self.in_flight = 0
+
+    def stats(self) -> dict:
+        return {
+            "uptime_seconds": time.time() - self.started_at,
+            "requests": self.requests,
+            "streams": self.streams,
+            "errors": self.errors,
+            "rate_limited": self.rate_limited,
+            "hung": self.hung,
+            "in_flight": self.in_flight,
+            "profile": asdict(self.profile)
+        }
+
+
+def error_body(message: str, kind: str) -> dict:
+    return {"error": {"message": message, "type": kind, "param": None, "code": None}}
+
+
+def create_app(profile: Profile, seed: Optional[int] = None) -> FastAPI:
+    app = FastAPI(title="LLM stub")
+    state = StubState(profile, seed)
+    app.state.stub = state
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        profile = state.profile
+        state.requests += 1
+
+        # Falhas injetadas, por sorteio
+        draw = state.rng.random()
+        if draw < profile.error_rate:
+            state.errors += 1
+            return JSONResponse(error_body("Falha injetada", "server_error"), status_code=500)
+        draw -= profile.error_rate
+        if draw < profile.rate_limit_rate:
+            state.rate_limited += 1
+            return JSONResponse(
+                error_body("Limite de taxa injetado", "rate_limit_exceeded"),
+                status_code=429,
+                headers={"Retry-After": "1"}
+            )
+        draw -= profile.rate_limit_rate
+        delay = profile.hang_seconds if draw < profile.hang_rate else profile.latency(state.rng)
+        if draw < profile.hang_rate:
+            state.hung += 1
+
+        state.in_flight += 1
+        try:
+            await asyncio.sleep(delay)
+        finally:
+            state.in_flight -= 1
+
+        content = content_for(body)
+        model = body.get("model", "stub-model")
+        if body.get("stream"):
+            state.streams += 1
+            return StreamingResponse(
+                stream_events(content, profile.token_interval_ms / 1000),
+                media_type="text/event-stream"
+            )
+        return completion_payload(content, model=model)
+
+    @app.get("/v1/models")
+    async def models():
+        return {"object": "list", "data": [{"id": "stub-model", "object": "model", "owned_by": "stub"}]}
+
+    @app.get("/stub/stats")
+    async def stats():
+        return state.stats()
+
+    @app.put("/stub/profile")
+    async def update_profile(changes: dict):
+        known = {field.name for field in fields(Profile)}
+        unknown = set(changes) - known
+        if unknown:
+            return JSONResponse({"detail": f"Campos desconhecidos: {sorted(unknown)}"}, status_code=422)
+        if changes.get("distribution", state.profile.distribution) not in DISTRIBUTIONS:
+            return JSONResponse({"detail": f"Distribuição deve ser uma de {DISTRIBUTIONS}"}, status_code=422)
+        state.profile = Profile(**{**asdict(state.profile), **changes})
+        return asdict(state.profile)
+
+    return app
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Servidor OpenAI simulado para testes offline")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--latency-ms", type=float, default=Profile.latency_ms)
+    parser.add_argument("--distribution", choices=DISTRIBUTIONS, default=Profile.distribution)
+    parser.add_argument("--jitter", type=float, default=Profile.jitter)
+    parser.add_argument("--tail-rate", type=float, default=Profile.tail_rate)
+    parser.add_argument("--tail-ms", type=float, default=Profile.tail_ms)
+    parser.add_argument("--token-interval-ms", type=float, default=Profile.token_interval_ms)
+    parser.add_argument("--error-rate", type=float, default=Profile.error_rate)
+    parser.add_argument("--rate-limit-rate", type=float, default=Profile.rate_limit_rate)
+    parser.add_argument("--hang-rate", type=float, default=Profile.hang_rate)
+    parser.add_argument("--hang-seconds", type=float, default=Profile.hang_seconds)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    options = vars(args)
+    host, port, seed = options.pop("host"), options.pop("port"), options.pop("seed")
+    print(f"🤖 LLM simulado em http://{host}:{port}/v1 ({json.dumps(options)})")
+    uvicorn.run(create_app(Profile(**options), seed), host=host, port=port, log_level="warning")
@@ -0,0 +1,328 @@
+#!/usr/bin/env python3
+"""
+Teste de carga de ponta a ponta: mistura de chat, webhook e listagem de
+tarefas a uma taxa alvo, com p50/p95/p99, vazão e taxa de erros por cenário
+
+As requisições chegam em malha aberta (intervalos exponenciais a `--rps`):
+uma requisição lenta não atrasa as seguintes, e a latência medida inclui a
+fila do servidor.
+
+Contra um servidor no ar (com o LLM simulado e sem limite de taxa):
+    python scripts/llm_stub_server.py --port 8100 &
+    OPENAI_BASE_URL=http://127.0.0.1:8100/v1 OPENAI_API_KEY=sk-stub RATE_LIMIT_ENABLED=false \\
+        uvicorn app.main:app --port 8000 &
+    python scripts/load_test.py --base-url http://127.0.0.1:8000 --rps 20 --duration 60
+
+Em processo (API via ASGI, SQLite temporário, LLM simulado em processo ou
+`--llm-base-url`), sem rede, para CI:
+    python scripts/load_test.py --in-process --rps 10 --duration 20 --max-error-rate 0.01
+
+Mistura padrão: chat_question=25, chat_task=10, chat_stream=10, webhook=20,
+tasks_list=35 (`--mix chat_question=50,tasks_list=50`).
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import uuid
+from collections import Counter
+from typing import Dict, List, Optional
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.dirname(__file__))
+
+import httpx  # noqa: E402
+
+DEFAULT_MIX = {"chat_question": 25, "chat_task": 10, "chat_stream": 10, "webhook": 20, "tasks_list": 35}
+
+QUESTIONS = [
+    "Quais são minhas tarefas urgentes?",
+    "Bom dia!",
+    "O que tenho pendente para hoje?",
+    "Como organizar minha semana?",
+    "Quantas tarefas eu concluí?",
+    "Qual tarefa devo fazer primeiro?",
+]
+TASKS = [
+    "Preciso enviar o relatório {n} para o cliente até sexta",
+    "Marcar reunião {n} com o time de vendas",
+    "Revisar o contrato {n} com o jurídico, é urgente",
+    "Comprar material de escritório para o projeto {n}",
+]
+
+
+def percentile(values: List[float], fraction: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = {}
+        self.errors: Dict[str, Counter] = {}
+        self.sent: Counter = Counter()
+
+    def record(self, scenario: str, latency: float, outcome: str) -> None:
+        """`outcome`: "ok" ou a causa do erro (status HTTP ou nome da exceção)"""
+        if outcome == "ok":
+            self.latencies.setdefault(scenario, []).append(latency * 1000)
+        else:
+            self.errors.setdefault(scenario, Counter())[outcome] += 1
+
+    def summary(self, elapsed: float) -> dict:
+        scenarios = {}
+        for scenario in sorted(self.sent):
+            latencies = self.latencies.get(scenario, [])
+            errors = self.errors.get(scenario, Counter())
+            completed = len(latencies) + sum(errors.values())
+            scenarios[scenario] = {
+                "sent": self.sent[scenario],
+                "ok": len(latencies),
+                "errors": dict(errors),
+                "error_rate": sum(errors.values()) / completed if completed else 0.0,
+                "throughput": len(latencies) / elapsed,
+                "p50_ms": percentile(latencies, 0.5),
+                "p95_ms": percentile(latencies, 0.95),
+                "p99_ms": percentile(latencies, 0.99),
+            }
+
+        every = [latency for latencies in self.latencies.values() for latency in latencies]
+        failed = sum(sum(errors.values()) for errors in self.errors.values())
+        completed = len(every) + failed
+        return {
+            "elapsed_seconds": elapsed,
+            "scenarios": scenarios,
+            "total": {
+                "sent": sum(self.sent.values()),
+                "ok": len(every),
+                "errors": failed,
+                "error_rate": failed / completed if completed else 0.0,
+                "throughput": len(every) / elapsed,
+                "p50_ms": percentile(every, 0.5),
+                "p95_ms": percentile(every, 0.95),
+                "p99_ms": percentile(every, 0.99),
+            }
+        }
+
+
+class LoadTest:
+    def __init__(self, client: httpx.AsyncClient, args: argparse.Namespace):
+        self.client = client
+        self.args = args
+        self.rng = random.Random(args.seed)
+        self.users: List[dict] = []  # {"id", "headers"}
+        self.recorder = Recorder()
+        self.sequence = 0
+
+    async def setup(self) -> None:
+        run = uuid.uuid4().hex[:8]
+
+        async def create_user(position: int) -> dict:
+            email = f"load-{run}-{position}@leggal.test"
+            credentials = {"email": email, "password": "123456", "name": f"Carga {position}"}
+            response = await self.client.post("/auth/register", json=credentials)
+            response.raise_for_status()
+            user_id = response.json()["id"]
+            response = await self.client.post("/auth/login", data={"username": email, "password": "123456"})
+            response.raise_for_status()
+            return {"id": user_id, "headers": {"Authorization": f"Bearer {response.json()['access_token']}"}}
+
+        self.users = list(await asyncio.gather(*(create_user(position) for position in range(self.args.users))))
+
+        # Tarefas iniciais (sem IA): a listagem e o contexto do chat têm o que ler
+        async def seed(user: dict) -> None:
+            for n in range(self.args.seed_tasks):
+                task = {"title": f"Tarefa inicial {n}", "description": TASKS[n % len(TASKS)].format(n=n)}
+                (await self.client.post("/tasks/", json=task, headers=user["headers"])).raise_for_status()
+
+        await asyncio.gather(*(seed(user) for user in self.users))
+
+    async def chat_question(self, user: dict) -> httpx.Response:
+        message = self.rng.choice(QUESTIONS)
+        return await self.client.post("/chat/message", json={"message": message}, headers=user["headers"])
+
+    async def chat_task(self, user: dict) -> httpx.Response:
+        message = self.rng.choice(TASKS).format(n=self.sequence)
+        return await self.client.post("/chat/message", json={"message": message}, headers=user["headers"])
+
+    async def chat_stream(self, user: dict) -> httpx.Response:
+        message = self.rng.choice(QUESTIONS)
+        async with self.client.stream(
+            "POST", "/chat/message/stream", json={"message": message}, headers=user["headers"]
+        ) as response:
+            async for _ in response.aiter_bytes():
+                pass
+        return response
+
+    async def webhook(self, user: dict) -> httpx.Response:
+        payload = {
+            "message": self.rng.choice(TASKS).format(n=self.sequence),
+            "from": f"+55119{self.sequence:08d}",
+            "timestamp": f"{time.time():.6f}-{self.sequence}"
+        }
+        return await self.client.post("/webhook/message", json=payload, headers={"X-User-Id": user["id"]})
+
+    async def tasks_list(self, user: dict) -> httpx.Response:
+        return await self.client.get("/tasks/", params={"limit": 20}, headers=user["headers"])
+
+    async def fire(self, scenario: str, measure: bool) -> None:
+        self.sequence += 1
+        user = self.rng.choice(self.users)
+        start = time.perf_counter()
+        try:
+            response = await getattr(self, scenario)(user)
+            outcome = "ok" if response.status_code < 400 else str(response.status_code)
+        except Exception as e:
+            outcome = type(e).__name__
+        if measure:
+            self.recorder.record(scenario, time.perf_counter() - start, outcome)
+
+    async def run(self, mix: Dict[str, float]) -> dict:
+        scenarios, weights = list(mix), list(mix.values())
+        in_flight: set = set()
+
+        async def phase(seconds: float, measure: bool) -> None:
+            deadline = time.perf_counter() + seconds
+            next_at = time.perf_counter()
+            while next_at < deadline:
+                await asyncio.sleep(max(0.0, next_at - time.perf_counter()))
+                next_at += self.rng.expovariate(self.args.rps)
+                scenario = self.rng.choices(scenarios, weights)[0]
+                if len(in_flight) >= self.args.max_in_flight:
+                    # O servidor não acompanha: conta como erro em vez de atrasar a chegada
+                    if measure:
+                        self.recorder.sent[scenario] += 1
+                        self.recorder.record(scenario, 0.0, "client_overload")
+                    continue
+                if measure:
+                    self.recorder.sent[scenario] += 1
+                task = asyncio.create_task(self.fire(scenario, measure))
+                in_flight.add(task)
+                task.add_done_callback(in_flight.discard)
+
+        if self.args.warmup:
+            await phase(self.args.warmup, measure=False)
+        start = time.perf_counter()
+        await phase(self.args.duration, measure=True)
+        if in_flight:
+            await asyncio.wait(in_flight, timeout=self.args.timeout)
+        return self.recorder.summary(time.perf_counter() - start)
+
+
+def print_summary(summary: dict, args: argparse.Namespace) -> None:
+    def ms(value: Optional[float]) -> str:
+        return f"{value:>8.1f}" if value is not None else f"{'-':>8}"
+
+    print(f"\n📊 {args.rps:g} req/s alvo por {args.duration:g}s, {args.users} usuários ({args.target})")
+    print(f"   {'cenário':<14} | {'enviadas':>8} | {'ok/s':>6} | {'p50 (ms)':>8} | {'p95 (ms)':>8} | {'p99 (ms)':>8} | erros")
+    rows = list(summary["scenarios"].items()) + [("total", summary["total"])]
+    for name, row in rows:
+        errors = row["errors"]
+        failed = sum(errors.values()) if isinstance(errors, dict) else errors
+        detail = f" {errors}" if isinstance(errors, dict) and errors else ""
+        print(
+            f"   {name:<14} | {row['sent']:>8} | {row['throughput']:>6.1f} | {ms(row['p50_ms'])} | {ms(row['p95_ms'])}"
+            f" | {ms(row['p99_ms'])} | {failed} ({row['error_rate']:.1%}){detail}"
+        )
+
+
+def parse_mix(text: Optional[str]) -> Dict[str, float]:
+    if not text:
+        return dict(DEFAULT_MIX)
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in DEFAULT_MIX:
+            raise SystemExit(f"Cenário desconhecido: {name} (use {', '.join(DEFAULT_MIX)})")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+@contextlib.asynccontextmanager
+async def in_process_client(args: argparse.Namespace):
+    """API no mesmo processo, com o lifespan (workers do webhook, cliente do LLM)"""
+    os.environ.setdefault("ENVIRONMENT", "benchmark")
+    os.environ.setdefault("OPENAI_API_KEY", "sk-stub")
+    os.environ["RATE_LIMIT_ENABLED"] = "false"
+    if "DATABASE_URL" not in os.environ:
+        os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/load_test.db"
+
+    from llm_stub import make_async_transport
+    from app.core.database import Base, engine
+    from app.core.llm import llm_client
+    from app.main import app
+
+    Base.metadata.create_all(bind=engine)
+    if args.llm_base_url:
+        llm_client.configure(base_url=args.llm_base_url)
+    else:
+        llm_client.configure(transport=make_async_transport(args.llm_latency_ms / 1000))
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+        async with httpx.AsyncClient(transport=transport, base_url="http://load-test", timeout=args.timeout) as client:
+            yield client
+
+
+async def main(args: argparse.Namespace) -> int:
+    mix = parse_mix(args.mix)
+    if args.in_process:
+        args.target = "em processo"
+        client_context = in_process_client(args)
+    else:
+        args.target = args.base_url
+        limits = httpx.Limits(max_connections=args.max_in_flight, max_keepalive_connections=args.max_in_flight)
+        client_context = httpx.AsyncClient(base_url=args.base_url, timeout=args.timeout, limits=limits)
+
+    async with client_context as client:
+        load = LoadTest(client, args)
+        await load.setup()
+        summary = await load.run(mix)
+
+    summary["config"] = {
+        "target": args.target,
+        "rps": args.rps,
+        "duration": args.duration,
+        "users": args.users,
+        "mix": mix
+    }
+    print_summary(summary, args)
+    if args.json:
+        with open(args.json, "w") as output:
+            json.dump(summary, output, indent=2, ensure_ascii=False)
+        print(f"\n   resultado em {args.json}")
+
+    if args.max_error_rate is not None and summary["total"]["error_rate"] > args.max_error_rate:
+        print(f"\n❌ Taxa de erros {summary['total']['error_rate']:.1%} acima de {args.max_error_rate:.1%}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Teste de carga de ponta a ponta")
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--in-process", action="store_true", help="sobe a API no próprio processo (sem rede)")
+    parser.add_argument("--llm-base-url", default=None, help="com --in-process: LLM em scripts/llm_stub_server.py")
+    parser.add_argument("--llm-latency-ms", type=float, default=200.0, help="com --in-process: LLM simulado em processo")
+    parser.add_argument("--rps", type=float, default=10.0)
+    parser.add_argument("--duration", type=float, default=30.0, help="segundos medidos")
+    parser.add_argument("--warmup", type=float, default=3.0, help="segundos de carga antes da medição")
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--seed-tasks", type=int, default=20, help="tarefas criadas por usuário antes do teste")
+    parser.add_argument("--mix", default=None, help="pesos por cenário, ex.: chat_question=50,tasks_list=50")
+    parser.add_argument("--max-in-flight", type=int, default=500)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", default=None, help="grava o resultado neste arquivo")
+    parser.add_argument("--max-error-rate", type=float, default=None, help="sai com código 1 se passar disto")
+    args = parser.parse_args()
+
+    sys.exit(asyncio.run(main(args)))
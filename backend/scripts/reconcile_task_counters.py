@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Reconciliação de user_task_counters com a tabela tasks
+
+Recalcula as contagens por usuário a partir de tasks, lista os usuários cujos
+contadores divergem e regrava os contadores deles (a menos de --dry-run).
+Sai com código 1 quando encontra divergência, para uso em cron/monitoramento.
+
+Uso: python scripts/reconcile_task_counters.py [--dry-run]
+"""
+import argparse
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app.core.database import AsyncSessionLocal  # noqa: E402
+from app.services import task_counters  # noqa: E402
+
+
+async def main(dry_run: bool) -> int:
+    async with AsyncSessionLocal() as db:
+        drifts = await task_counters.reconcile(db, fix=not dry_run)
+
+    if not drifts:
+        print("✅ Contadores de tarefas consistentes")
+        return 0
+
+    for drift in drifts:
+        if drift.actual is None:
+            print(f"⚠️  {drift.user_id}: sem linha de contadores (esperado total={drift.expected['total']})")
+            continue
+        details = ", ".join(
+            f"{column} {drift.actual[column]} → {drift.expected[column]}" for column in drift.columns
+        )
+        print(f"⚠️  {drift.user_id}: {details}")
+
+    action = "encontrados (--dry-run, nada alterado)" if dry_run else "corrigidos"
+    print(f"\n{len(drifts)} usuário(s) com contadores divergentes {action}")
+    return 1
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Reconcilia os contadores de tarefas por usuário")
+    parser.add_argument("--dry-run", action="store_true", help="apenas reporta a divergência")
+    args = parser.parse_args()
+
+    sys.exit(asyncio.run(main(args.dry_run)))
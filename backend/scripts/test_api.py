@@ -128,9 +128,9 @@ def test_webhook():
         headers = {"x-user-id": "user_001"}  # ID do usuário de teste
         response = requests.post(f"{BASE_URL}/webhook/message", json=data, headers=headers)
 
-        if response.status_code == 200:
+        if response.status_code == 202:
             result = response.json()
-            print(f"✅ Webhook OK: {result['message']}")
+            print(f"✅ Webhook OK: job {result['id']} ({result['status']})")
             return True
         else:
             print(f"❌ Webhook falhou: {response.status_code} - {response.text}")
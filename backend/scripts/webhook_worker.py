@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Worker da fila do webhook em processo separado
+
+Consome a tabela webhook_jobs com `--workers` workers assíncronos, como os que
+a API inicia no lifespan. Para rodar só aqui, configure WEBHOOK_WORKERS=0 na
+API. Encerra com SIGINT/SIGTERM esperando os jobs em andamento.
+
+Uso: python scripts/webhook_worker.py --workers 4
+"""
+import argparse
+import asyncio
+import logging
+import os
+import signal
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app.core.llm import llm_client  # noqa: E402
+from app.services.webhook_queue import webhook_queue  # noqa: E402
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+
+
+async def main(workers: int) -> int:
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    llm_client.start()
+    webhook_queue.start(workers)
+    print(f"🚀 {workers} worker(s) consumindo webhook_jobs (Ctrl+C para encerrar)")
+
+    await stop.wait()
+    await webhook_queue.stop()
+    await llm_client.close()
+    print(f"✅ Encerrado: {webhook_queue.stats()}")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Worker da fila do webhook")
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    sys.exit(asyncio.run(main(args.workers)))
@@ -0,0 +1,42 @@
+"""
+Configuração dos testes: SQLite temporário e LLM desligado (análise
+simplificada), definidos antes de importar a aplicação
+"""
+import os
+import sys
+import tempfile
+import uuid
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp(prefix='leggal-tests-')}/test.db"
+os.environ["ENVIRONMENT"] = "test"
+os.environ["OPENAI_API_KEY"] = ""
+
+import pytest  # noqa: E402
+
+from app.core.database import AsyncSessionLocal, Base, engine  # noqa: E402
+from app.models.models import User  # noqa: E402
+
+Base.metadata.create_all(bind=engine)
+
+
+def database_path() -> str:
+    """Arquivo do banco de teste, para abrir uma segunda conexão"""
+    return os.environ["DATABASE_URL"].replace("sqlite:///", "", 1)
+
+
+@pytest.fixture
+async def db():
+    async with AsyncSessionLocal() as session:
+        yield session
+
+
+@pytest.fixture
+async def user(db) -> User:
+    """Usuário novo a cada teste: os testes não dependem da ordem nem limpam o banco"""
+    user_id = str(uuid.uuid4())
+    user = User(id=user_id, email=f"{user_id}@leggal.test", password="x", name="Teste")
+    db.add(user)
+    await db.commit()
+    return user
@@ -0,0 +1,43 @@
+import uuid
+
+import pytest
+
+from app.core.config import settings
+from app.core.llm import llm_client
+from app.services.ai_service import AIService
+from app.services.analysis_cache import analysis_cache
+
+
+@pytest.fixture(params=[False, True], ids=["direto", "micro-batching"])
+def model(request, monkeypatch):
+    """LLM falso: responde com o texto de `model.replies`, um por chamada"""
+    calls = []
+
+    async def chat_completion(**kwargs):
+        calls.append(kwargs)
+        return model.replies.pop(0)
+
+    monkeypatch.setattr(AIService, "openai_available", property(lambda self: True))
+    monkeypatch.setattr(llm_client, "chat_completion", chat_completion)
+    monkeypatch.setattr(settings, "ai_analysis_batching", request.param)
+    model.calls = calls
+    return model
+
+
+@pytest.mark.parametrize("reply", ["Não consegui analisar.", '{"title": "sem fechar", }'])
+async def test_unparseable_reply_falls_back_without_caching(model, reply):
+    # O cache é global: cada execução usa uma mensagem nova
+    message = f"Reunião com o cliente amanhã ({uuid.uuid4()})"
+    model.replies = [reply, '{"title": "Reunião", "summary": "Cliente", "priority": "HIGH", "reasoning": "Prazo"}']
+    service = AIService()
+
+    degraded = await service.analyze_task(message)
+
+    assert degraded == service._analyze_simplified(message)
+    assert await analysis_cache.get(analysis_cache.key_for(message, llm_client.model)) is None
+
+    # A mensagem seguinte vai ao modelo de novo e só a resposta válida é guardada
+    analysis = await service.analyze_task(message)
+    assert analysis.title == "Reunião"
+    assert len(model.calls) == 2
+    assert await analysis_cache.get(analysis_cache.key_for(message, llm_client.model)) == analysis
@@ -0,0 +1,64 @@
+import asyncio
+import sqlite3
+
+from sqlalchemy import select
+
+from app.core.group_commit import GroupCommitter
+from app.models.models import ChatMessage
+from app.routers.chat import new_chat_message
+
+from conftest import database_path
+
+
+def count_messages(user_id: str) -> int:
+    """Conta numa conexão à parte: só enxerga o que já foi confirmado"""
+    connection = sqlite3.connect(database_path())
+    try:
+        return connection.execute("SELECT count(*) FROM chat_messages WHERE user_id = ?", (user_id,)).fetchone()[0]
+    finally:
+        connection.close()
+
+
+async def test_batch_is_invisible_until_single_commit(db, user):
+    committer = GroupCommitter(window=0.05, max_batch=10)
+    seen_during_batch = []
+
+    async def first(session):
+        session.add(new_chat_message(user.id, "primeira", is_user=True))
+        await session.flush()
+
+    async def second(session):
+        # A primeira unidade já passou pelo savepoint dela
+        seen_during_batch.append(count_messages(user.id))
+        session.add(new_chat_message(user.id, "segunda", is_user=True))
+        await session.flush()
+
+    await asyncio.gather(committer.submit(first), committer.submit(second))
+
+    assert seen_during_batch == [0]
+    assert count_messages(user.id) == 2
+    assert committer.stats()["commits"] == 1
+    assert committer.stats()["avg_batch"] == 2
+
+
+async def test_failed_unit_is_rolled_back_alone(db, user):
+    committer = GroupCommitter(window=0.05, max_batch=10)
+
+    async def ok(session):
+        session.add(new_chat_message(user.id, "gravada", is_user=True))
+        await session.flush()
+
+    async def broken(session):
+        session.add(new_chat_message(user.id, "desfeita", is_user=True))
+        await session.flush()
+        raise ValueError("falha da unidade")
+
+    results = await asyncio.gather(committer.submit(ok), committer.submit(broken), return_exceptions=True)
+
+    assert results[0] is None
+    assert isinstance(results[1], ValueError)
+    messages = (await db.execute(
+        select(ChatMessage.message).where(ChatMessage.user_id == user.id)
+    )).scalars().all()
+    assert messages == ["gravada"]
+    assert committer.stats()["commits"] == 1
@@ -0,0 +1,106 @@
+"""
+Paridade do classificador de mensagens do chat com a implementação anterior
+(laços em Python sobre as listas de palavras-chave, reproduzida abaixo). O
+corpus é fixo: as mensagens de FIXED_MESSAGES mais as sintéticas geradas com
+semente fixa. scripts/bench_classifier.py mede o tempo sobre o mesmo corpus.
+"""
+import random
+
+import pytest
+
+from app.constants import ACTION_KEYWORDS, CONVERSATION_KEYWORDS, QUESTION_KEYWORDS
+from app.routers.chat import classify_message_type
+from app.services.message_classifier import classify_messages, is_question
+
+
+def legacy_classify(message: str) -> bool:
+    """Implementação original de routers/chat.py:classify_message_type"""
+    message_lower = message.lower().strip()
+
+    conversation_patterns = [
+        'oi', 'olá', 'ola', 'hey', 'e aí', 'eai', 'tudo bem', 'tudo bom',
+        'bom dia', 'boa tarde', 'boa noite', 'obrigad', 'valeu', 'vlw',
+        'legal', 'show', 'massa', 'top', 'maneiro', 'dahora',
+        'vsf', 'pqp', 'cacete', 'caramba', 'nossa', 'mds', 'ai ai',
+        'help', 'ajuda', 'socorro', 'perdid', 'confus',
+        'como funciona', 'o que você faz', 'quem é você', 'como usar'
+    ]
+
+    for pattern in conversation_patterns:
+        if pattern in message_lower:
+            return True
+
+    question_words = ['qual', 'quais', 'como', 'quando', 'onde', 'por que', 'porque',
+                      'quanto', 'quantos', 'quantas', 'o que', 'há', 'existe', 'tem',
+                      'posso', 'pode', 'consegue', 'me mostra', 'me diz', 'me conta',
+                      'vê', 'veja', 'mostra', 'lista']
+
+    if '?' in message:
+        return True
+
+    for word in question_words:
+        if message_lower.startswith(word) or f' {word} ' in message_lower:
+            return True
+
+    if len(message_lower) < 15 and not any(word in message_lower for word in ['preciso', 'fazer', 'criar', 'comprar', 'enviar', 'revisar']):
+        return True
+
+    action_words = ['preciso', 'devo', 'tenho que', 'precisa', 'fazer', 'criar',
+                    'organizar', 'preparar', 'revisar', 'enviar', 'comprar',
+                    'agendar', 'marcar', 'ligar', 'falar com']
+
+    for word in action_words:
+        if word in message_lower:
+            return False
+
+    return True
+
+
+FIXED_MESSAGES = [
+    "oi", "Bom dia!", "quais são minhas tarefas urgentes?", "Preciso revisar o contrato hoje",
+    "comprar pão", "Tenho que ligar para o cliente amanhã", "me mostra as pendentes",
+    "Agendar reunião com a equipe de vendas", "laptop novo para o escritório",
+    "Organizar os arquivos do projeto até sexta", "  PRECISO ENVIAR O RELATÓRIO  ",
+    "dois relatórios para revisar", "lista de compras do mês para o escritório",
+    "quando é a reunião", "Falar com o João sobre o orçamento do trimestre",
+    "", "?", "tem", "   ", "existe alguma tarefa atrasada", "marcar dentista",
+]
+
+FILLER = [
+    "o", "contrato", "cliente", "relatório", "amanhã", "hoje", "reunião", "equipe",
+    "projeto", "sexta", "urgente", "para", "com", "de", "escritório", "orçamento",
+    "dois", "laptop", "topo", "mostrar", "temas", "quantidade",
+]
+
+
+def generate_messages(n: int, seed: int = 42) -> list[str]:
+    rng = random.Random(seed)
+    vocabulary = FILLER + CONVERSATION_KEYWORDS + QUESTION_KEYWORDS + ACTION_KEYWORDS
+    messages = list(FIXED_MESSAGES)
+    while len(messages) < n:
+        words = [rng.choice(vocabulary) for _ in range(rng.randint(1, 12))]
+        message = " ".join(words)
+        if rng.random() < 0.3:
+            message = message.capitalize()
+        if rng.random() < 0.1:
+            message += "?"
+        messages.append(message)
+    return messages
+
+
+CORPUS = generate_messages(5000)
+
+
+@pytest.mark.parametrize("message", FIXED_MESSAGES)
+async def test_classify_message_type_matches_legacy_on_fixed_messages(message):
+    assert await classify_message_type(message) == legacy_classify(message)
+
+
+async def test_classify_message_type_matches_legacy_on_corpus():
+    mismatches = [message for message in CORPUS if await classify_message_type(message) != legacy_classify(message)]
+    assert mismatches == []
+
+
+def test_batch_api_matches_legacy_on_corpus():
+    assert classify_messages(CORPUS) == [legacy_classify(message) for message in CORPUS]
+    assert classify_messages(iter(CORPUS)) == [is_question(message) for message in CORPUS]
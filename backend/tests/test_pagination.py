@@ -0,0 +1,68 @@
+from sqlalchemy import text
+
+from app.models.schemas import TaskFilters
+from app.routers.chat import get_chat_history
+from app.services.task_service import TaskService
+
+# Texto gravado no SQLite: sem fração (CURRENT_TIMESTAMP, linhas antigas) e com
+# microssegundos (aplicação), no mesmo segundo e em segundos vizinhos
+CREATED_AT = [
+    "2026-01-01 10:00:01",
+    "2026-01-01 10:00:00.500000",
+    "2026-01-01 10:00:00",
+    "2026-01-01 10:00:00",
+    "2026-01-01 10:00:00",
+    "2026-01-01 10:00:00.000000",
+    "2026-01-01 09:59:59.999999",
+    "2026-01-01 09:59:59",
+]
+
+
+async def insert_rows(db, table: str, user_id: str) -> list:
+    """Grava direto em SQL, como o server_default gravava; retorna os ids na ordem esperada"""
+    ids = [f"{user_id}-{index}" for index in range(len(CREATED_AT))]
+    for row_id, created_at in zip(ids, CREATED_AT):
+        if table == "tasks":
+            statement = text(
+                "INSERT INTO tasks (id, user_id, title, status, priority, created_at) "
+                "VALUES (:id, :user_id, :id, 'PENDING', 'MEDIUM', :created_at)"
+            )
+        else:
+            statement = text(
+                "INSERT INTO chat_messages (id, user_id, message, is_user, created_at) "
+                "VALUES (:id, :user_id, :id, 1, :created_at)"
+            )
+        await db.execute(statement, {"id": row_id, "user_id": user_id, "created_at": created_at})
+    await db.commit()
+    # Ordem da listagem: texto gravado desc, id desc
+    return [row_id for row_id, _ in sorted(zip(ids, CREATED_AT), key=lambda item: (item[1], item[0]), reverse=True)]
+
+
+async def test_task_pages_cover_mixed_precision_rows_once(db, user):
+    expected = await insert_rows(db, "tasks", user.id)
+
+    seen, cursor = [], None
+    for _ in range(len(expected)):
+        tasks, cursor = await TaskService.get_tasks(db, user.id, TaskFilters(limit=2, cursor=cursor))
+        seen.extend(task.id for task in tasks)
+        if cursor is None:
+            break
+
+    assert cursor is None
+    assert seen == expected
+
+
+async def test_chat_history_pages_cover_mixed_precision_rows_once(db, user):
+    expected = await insert_rows(db, "chat_messages", user.id)
+
+    seen, cursor = [], None
+    for _ in range(len(expected)):
+        page = await get_chat_history(limit=3, cursor=cursor, current_user=user, db=db)
+        # Cada página vem em ordem cronológica
+        seen.extend(item.id for item in reversed(page.items))
+        cursor = page.next_cursor
+        if cursor is None:
+            break
+
+    assert cursor is None
+    assert seen == expected
@@ -0,0 +1,128 @@
+import sqlite3
+import uuid
+
+import pytest
+from sqlalchemy import delete, update
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.models.models import Priority, Task, UserTaskCounters
+from app.models.schemas import AIAnalysisResult, TaskCreate
+from app.services import task_counters
+from app.services.task_service import TaskService
+
+from conftest import database_path
+
+
+def committed(user_id: str) -> tuple:
+    """(tarefas, total dos contadores) vistos por outra conexão: só o que já foi confirmado"""
+    connection = sqlite3.connect(database_path())
+    try:
+        tasks = connection.execute("SELECT count(*) FROM tasks WHERE user_id = ?", (user_id,)).fetchone()[0]
+        row = connection.execute("SELECT total FROM user_task_counters WHERE user_id = ?", (user_id,)).fetchone()
+        return tasks, row[0] if row else None
+    finally:
+        connection.close()
+
+
+def items(count: int) -> list:
+    analysis = AIAnalysisResult(
+        title="Tarefa", summary="Resumo", suggested_priority=Priority.HIGH, reasoning="Teste", confidence=0.9
+    )
+    return [(TaskCreate(title=f"Tarefa {index}", raw_message=f"Tarefa {index}"), analysis) for index in range(count)]
+
+
+@pytest.fixture
+async def counters(db, user):
+    """Usuário com a linha de contadores já criada e confirmada"""
+    await task_counters.get_counters(db, user.id)
+    await db.commit()
+    return await task_counters.get_counters(db, user.id)
+
+
+@pytest.fixture
+def seen_before_counters(monkeypatch):
+    """Registra o que outra conexão enxerga quando os contadores vão ser atualizados"""
+    seen = []
+    apply_many = task_counters.apply_many
+
+    async def spy(db, user_id, removed, added):
+        seen.append(committed(user_id))
+        await apply_many(db, user_id, removed, added)
+
+    monkeypatch.setattr(task_counters, "apply_many", spy)
+    return seen
+
+
+async def test_bulk_insert_and_counters_commit_together(db, user, counters, seen_before_counters):
+    results = await TaskService.create_tasks_bulk(db, user.id, items(3))
+
+    assert all(not isinstance(result, Exception) for result in results)
+    assert seen_before_counters == [(0, 0)]
+    assert committed(user.id) == (3, 3)
+    after = await task_counters.get_counters(db, user.id)
+    assert after["version"] == counters["version"] + 1
+
+
+async def test_bulk_fallback_rows_commit_with_counters(db, user, counters, seen_before_counters):
+    existing = (await TaskService.create_tasks_bulk(db, user.id, items(1)))[0]
+    seen_before_counters.clear()
+
+    # O id repetido derruba o INSERT em lote; as outras linhas entram uma a uma
+    results = await TaskService.create_tasks_bulk(
+        db, user.id, items(3), task_ids=[str(uuid.uuid4()), existing.id, str(uuid.uuid4())]
+    )
+
+    assert isinstance(results[1], SQLAlchemyError)
+    assert seen_before_counters == [(1, 1)]
+    assert committed(user.id) == (3, 3)
+
+
+async def test_counter_failure_discards_the_bulk_insert(db, user, counters, monkeypatch):
+    async def broken(*args, **kwargs):
+        raise RuntimeError("falha nos contadores")
+
+    monkeypatch.setattr(task_counters, "apply_many", broken)
+    user_id = user.id  # o rollback expira o usuário da sessão
+
+    with pytest.raises(RuntimeError):
+        await TaskService.create_tasks_bulk(db, user_id, items(2))
+    await db.rollback()
+
+    assert committed(user_id) == (0, 0)
+
+
+async def test_get_counters_initializes_inside_the_callers_transaction(db, user):
+    user_id = user.id  # o rollback expira o usuário da sessão
+    pending = await TaskService.create_tasks_bulk(db, user_id, items(1))
+    await db.commit()
+    # Sem linha de contadores, como um usuário criado fora da API
+    await db.execute(delete(UserTaskCounters).where(UserTaskCounters.user_id == user_id))
+    await db.commit()
+
+    # Escrita do chamador ainda não confirmada
+    await db.execute(update(Task).where(Task.id == pending[0].id).values(title="Não confirmado"))
+    counts = await task_counters.get_counters(db, user_id)
+
+    assert counts["total"] == 1
+    assert committed(user_id) == (1, None)
+    await db.rollback()
+    assert committed(user_id) == (1, None)
+    title = sqlite3.connect(database_path()).execute("SELECT title FROM tasks WHERE id = ?", (pending[0].id,)).fetchone()
+    assert title == ("Tarefa 0",)
+
+    await task_counters.get_counters(db, user_id)
+    await db.commit()
+    assert committed(user_id) == (1, 1)
+
+
+async def test_get_counters_after_reads_only_commits_with_the_caller(db, user):
+    user_id = user.id  # o rollback expira o usuário da sessão
+    await TaskService.create_tasks_bulk(db, user_id, items(2))
+    await db.execute(delete(UserTaskCounters).where(UserTaskCounters.user_id == user_id))
+    await db.commit()
+
+    # Só leituras antes: o savepoint é o primeiro comando da transação
+    assert (await task_counters.get_counters(db, user_id))["total"] == 2
+    assert committed(user_id) == (2, None)
+    await db.rollback()
+    assert committed(user_id) == (2, None)
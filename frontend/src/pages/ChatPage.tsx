@@ -26,6 +26,7 @@ export function ChatPage() {
   const { data: history } = useQuery({
     queryKey: ['chatHistory'],
     queryFn: () => chatService.getHistory(),
+    select: (page) => page.items,
   })
 
   // Carregar histórico quando disponível
@@ -11,6 +11,7 @@ export function ProfilePage() {
   const { data: tasks } = useQuery({
     queryKey: ['tasks'],
     queryFn: () => taskService.getTasks(),
+    select: (page) => page.items,
   })
 
   const totalTasks = tasks?.length || 0
@@ -18,6 +18,7 @@ export default function TasksPage() {
   const { data: allTasks, isLoading } = useQuery({
     queryKey: ['tasks'],
     queryFn: () => taskService.getTasks(),
+    select: (page) => page.items,
   })
 
   // Mutation para atualizar status
@@ -5,6 +5,7 @@ import {
   TaskCreate,
   TaskUpdate,
   TaskFilters,
+  Page,
   AIAnalysisResult,
   SearchResult,
   AuthResponse,
@@ -62,16 +63,16 @@ export const authService = {
 
 // Serviço de tarefas
 export const taskService = {
-  async getTasks(filters?: TaskFilters): Promise<Task[]> {
+  async getTasks(filters?: TaskFilters): Promise<Page<Task>> {
     const params = new URLSearchParams()
 
     if (filters?.status) params.append('status', filters.status)
     if (filters?.priority) params.append('priority', filters.priority)
     if (filters?.search) params.append('search', filters.search)
     if (filters?.limit) params.append('limit', filters.limit.toString())
-    if (filters?.offset) params.append('offset', filters.offset.toString())
+    if (filters?.cursor) params.append('cursor', filters.cursor)
 
-    const response = await api.get<Task[]>(`/tasks?${params}`)
+    const response = await api.get<Page<Task>>(`/tasks?${params}`)
     return response.data
   },
 
@@ -134,8 +135,11 @@ export const chatService = {
     return response.data
   },
   
-  async getHistory(limit: number = 50): Promise<ChatHistoryMessage[]> {
-    const response = await api.get<ChatHistoryMessage[]>(`/chat/history?limit=${limit}`)
+  async getHistory(limit: number = 50, cursor?: string): Promise<Page<ChatHistoryMessage>> {
+    const params = new URLSearchParams({ limit: limit.toString() })
+    if (cursor) params.append('cursor', cursor)
+
+    const response = await api.get<Page<ChatHistoryMessage>>(`/chat/history?${params}`)
     return response.data
   },
 }
@@ -42,7 +42,13 @@ export interface TaskFilters {
   priority?: 'LOW' | 'MEDIUM' | 'HIGH' | 'URGENT'
   search?: string
   limit?: number
-  offset?: number
+  cursor?: string
+}
+
+// Página de resultados paginados por cursor
+export interface Page<T> {
+  items: T[]
+  next_cursor: string | null
 }
 
 export interface AIAnalysisResult {